@@ -0,0 +1,150 @@
+"""
+Resized derivatives of uploaded images (avatars, news illustrations).
+
+Pages show avatars at 40px and news cards at half the screen width, so
+instead of the original upload they get WebP (with a JPEG fallback)
+variants at the widths of a preset, via the ``srcset``/``picture`` template
+tags. A variant is generated on its first request and kept in storage
+under ``derivatives/<source name>-<width>w.<format>``; the
+``generate_image_derivatives`` command creates the missing ones ahead of
+time.
+
+New uploads are stored under a hash of their content (``avatars/<sha256>.jpg``)
+and storage never overwrites a name, so a source name - and every URL
+derived from it - always stands for the same bytes. Derivatives are
+therefore served with a one-year ``immutable`` Cache-Control.
+"""
+import hashlib
+import io
+import os
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import models
+from django.db.models.fields.files import ImageFieldFile
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+DERIVATIVES_DIR = 'derivatives'
+CACHE_SECONDS = 365 * 24 * 60 * 60
+
+# Preset -> (widths, sizes attribute)
+PRESETS = {
+    'avatar': ((40, 80), '40px'),
+    'avatar_xl': ((120, 240), '120px'),
+    'news_card': ((480, 960), '(max-width: 768px) 100vw, 50vw'),
+    'news_full': ((960, 1440), '100vw'),
+}
+WIDTHS = frozenset(width for widths, _sizes in PRESETS.values() for width in widths)
+
+FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpg': ('JPEG', 'image/jpeg'),
+}
+
+# Image fields with derivatives -> presets they are shown at
+SOURCES = {
+    ('employees.Employee', 'avatar'): ('avatar', 'avatar_xl'),
+    ('news.News', 'image'): ('news_card', 'news_full'),
+}
+# Upload directories derivatives may be made from
+SOURCE_DIRS = ('avatars/', 'news/')
+
+
+class ContentHashedFieldFile(ImageFieldFile):
+    """Image file saved under the SHA-256 of the content being saved."""
+
+    def save(self, name, content, save=True):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        extension = os.path.splitext(name)[1].lower()
+        super().save(digest.hexdigest()[:32] + extension, content, save)
+
+
+class ContentHashedImageField(models.ImageField):
+    """ImageField naming its files ``<upload_to>/<sha256><ext>`` (form uploads and ``.save()`` alike)."""
+
+    attr_class = ContentHashedFieldFile
+
+
+def quality():
+    return getattr(settings, 'IMAGE_DERIVATIVE_QUALITY', 80)
+
+
+def derivative_name(name, width, fmt):
+    return posixpath.join(DERIVATIVES_DIR, f'{name}-{width}w.{fmt}')
+
+
+def derivative_url(name, width, fmt):
+    return reverse('image_derivative', kwargs={'name': name, 'width': width, 'fmt': fmt})
+
+
+def is_source(name):
+    return name.startswith(SOURCE_DIRS) and '..' not in name.split('/')
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+
+
+def _flatten(image):
+    """RGB copy of ``image`` with transparent areas on white (JPEG has no alpha)."""
+    if not _has_alpha(image):
+        return image.convert('RGB')
+    rgba = image.convert('RGBA')
+    flat = Image.new('RGB', rgba.size, 'white')
+    flat.paste(rgba, mask=rgba.getchannel('A'))
+    return flat
+
+
+def render(name, width, fmt):
+    """Bytes of ``name`` scaled down to ``width`` pixels in format ``fmt``."""
+    with default_storage.open(name, 'rb') as source, Image.open(source) as image:
+        # Let the JPEG decoder skip detail that would be thrown away (both sides: EXIF may rotate)
+        image.draft('RGB', (width, width))
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            image = image.resize(
+                (width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS
+            )
+        pil_format, _content_type = FORMATS[fmt]
+        output = io.BytesIO()
+        if pil_format == 'JPEG':
+            _flatten(image).save(output, pil_format, quality=quality(), optimize=True, progressive=True)
+        else:
+            image.convert('RGBA' if _has_alpha(image) else 'RGB').save(
+                output, pil_format, quality=quality(), method=4
+            )
+    return output.getvalue()
+
+
+def ensure(name, width, fmt):
+    """Storage name of the derivative, generating it if it does not exist yet."""
+    target = derivative_name(name, width, fmt)
+    if not default_storage.exists(target):
+        saved = default_storage.save(target, ContentFile(render(name, width, fmt)))
+        if saved != target:
+            # Another request made it first
+            default_storage.delete(saved)
+    return target
+
+
+def ensure_all(name, presets):
+    """Generate every missing variant of a source for ``presets``. Returns how many were made."""
+    made = 0
+    for preset in presets:
+        for width in PRESETS[preset][0]:
+            for fmt in FORMATS:
+                if not default_storage.exists(derivative_name(name, width, fmt)):
+                    ensure(name, width, fmt)
+                    made += 1
+    return made
+
+
+def srcset(name, preset, fmt):
+    widths, _sizes = PRESETS[preset]
+    return ', '.join(f'{derivative_url(name, width, fmt)} {width}w' for width in widths)
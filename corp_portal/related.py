@@ -0,0 +1,301 @@
+"""
+Related content for wiki articles and news.
+
+Every published article and news item is reduced to counts of stemmed
+terms (Snowball stemmers for Russian and English, ё folded to е, stop words
+dropped, title words counted TITLE_WEIGHT times) and stored in
+ContentVector. Similarity is the cosine of TF-IDF weights.
+
+When a document is saved, its vector is refreshed and the document
+frequencies of its terms (TermFrequency) are adjusted. It is then scored
+only against the candidates sharing one of its CANDIDATE_TERMS heaviest
+terms (a JSON key lookup, GIN-indexed on PostgreSQL), with IDF taken from
+the stored frequencies. Its own top WIKI_RELATED_LIMIT neighbours are
+replaced, and it is offered to the other documents: it enters the list
+of every document whose weakest neighbour it beats. Detail pages then read
+related links with one indexed lookup on RelatedContent. Stored lists and
+frequencies drift as documents change, so ``rebuild_related_content``
+recomputes everything exactly from scratch (nightly) using an inverted
+index.
+
+The vectors and lists are stored by the wiki app and looked up through the
+app registry, so neither app imports the other.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+import snowballstemmer
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+
+# Model label -> kind: the ContentVector/RelatedContent field naming the document
+KINDS = {
+    'wiki.wikiarticle': 'article',
+    'news.news': 'news',
+}
+VECTOR_MODEL = 'wiki.ContentVector'
+FREQUENCY_MODEL = 'wiki.TermFrequency'
+RELATED_MODEL = 'wiki.RelatedContent'
+
+TITLE_WEIGHT = 3
+# Neighbours scoring lower are not worth a link
+MIN_SCORE = 0.05
+# A saved document is compared with the documents sharing one of its heaviest terms
+CANDIDATE_TERMS = 20
+MAX_CANDIDATES = 500
+# Longer "words" are hashes, tokens and glued URLs
+MAX_WORD_LENGTH = 50
+
+WORD_RE = re.compile(r'[а-яёa-z0-9]+')
+STOP_WORDS = frozenset("""
+    а без более бы был была были было быть в вам вас весь во вот все всего всех вы где да даже для до его ее её если
+    есть еще ещё же за здесь и из или им их к как ко когда кто ли либо между меня мне может мы на над надо наш не
+    него нее неё нет ни них но ну о об однако он она они оно от очень по под после при про с со так также такой там
+    те тем то того тоже той только том ты у уже хотя чем что чтобы эта эти это этого этой этом я
+    a an and are as at be by for from has have in is it its of on or that the this to was were will with
+""".split())
+
+_stemmers = {}
+
+
+def _stem(word):
+    language = 'english' if word.isascii() else 'russian'
+    if language not in _stemmers:
+        _stemmers[language] = snowballstemmer.stemmer(language)
+    return _stemmers[language].stemWord(word)
+
+
+def terms(text, weight=1):
+    """Stemmed term counts of ``text``."""
+    counts = Counter()
+    for word in WORD_RE.findall((text or '').lower().replace('ё', 'е')):
+        if 2 < len(word) <= MAX_WORD_LENGTH and word not in STOP_WORDS and not word.isdigit():
+            counts[_stem(word)] += weight
+    return counts
+
+
+def related_limit():
+    return getattr(settings, 'WIKI_RELATED_LIMIT', 5)
+
+
+def _key(instance):
+    return (KINDS[instance._meta.label_lower], instance.pk)
+
+
+def _document_terms(instance):
+    counts = terms(instance.title, TITLE_WEIGHT) + terms(instance.excerpt) + terms(instance.content)
+    return dict(counts)
+
+
+def _idf(total, documents):
+    return math.log((1 + total) / (1 + documents)) + 1
+
+
+def _unit(vector_terms, idf):
+    """Unit-length TF-IDF weights of one vector; ``idf`` maps term -> weight."""
+    weights = {term: (1 + math.log(count)) * idf[term] for term, count in vector_terms.items()}
+    norm = math.sqrt(sum(value * value for value in weights.values())) or 1.0
+    return {term: value / norm for term, value in weights.items()}
+
+
+def _weighted(vectors, df):
+    """Unit-length TF-IDF weights of every vector, ``df`` counting the documents per term."""
+    total = len(vectors)
+    idf = {term: _idf(total, count) for term, count in df.items()}
+    return {key: _unit(vector_terms, idf) for key, vector_terms in vectors.items()}
+
+
+def _count_terms(added, removed):
+    """Adjust the stored document frequencies for a vector gaining/losing terms."""
+    TermFrequency = apps.get_model(FREQUENCY_MODEL)
+    if added:
+        TermFrequency.objects.bulk_create(
+            [TermFrequency(term=term) for term in added], batch_size=500, ignore_conflicts=True
+        )
+        TermFrequency.objects.filter(term__in=added).update(documents=F('documents') + 1)
+    if removed:
+        TermFrequency.objects.filter(term__in=removed, documents__gt=0).update(documents=F('documents') - 1)
+
+
+def _stored_idf(total, vocabulary):
+    """IDF of ``vocabulary`` from the stored document frequencies."""
+    TermFrequency = apps.get_model(FREQUENCY_MODEL)
+    vocabulary = list(vocabulary)
+    df = {}
+    for start in range(0, len(vocabulary), 500):
+        df.update(
+            TermFrequency.objects.filter(term__in=vocabulary[start:start + 500]).values_list('term', 'documents')
+        )
+    return {term: _idf(total, df.get(term, 1)) for term in vocabulary}
+
+
+def _candidates(key, own):
+    """{(kind, pk): terms} of the stored documents sharing one of the heaviest terms of ``own``."""
+    ContentVector = apps.get_model(VECTOR_MODEL)
+    heaviest = sorted(own, key=own.get, reverse=True)[:CANDIDATE_TERMS]
+    if not heaviest:
+        return {}
+    rows = ContentVector.objects.filter(terms__has_any_keys=heaviest).exclude(
+        **{f'{key[0]}_id': key[1]}
+    ).values_list('article_id', 'news_id', 'terms')[:MAX_CANDIDATES]
+    return {
+        ('article', article_id) if article_id else ('news', news_id): vector_terms
+        for article_id, news_id, vector_terms in rows
+    }
+
+
+def _top(scores, limit):
+    ranked = sorted(((score, key) for key, score in scores.items() if score >= MIN_SCORE), reverse=True)
+    return [(key, score) for score, key in ranked[:limit]]
+
+
+def _link(source, target, score):
+    RelatedContent = apps.get_model(RELATED_MODEL)
+    return RelatedContent(**{source[0] + '_id': source[1], f'related_{target[0]}_id': target[1]}, score=score)
+
+
+def _source_q(keys):
+    q = Q(pk__in=[])
+    for kind in ('article', 'news'):
+        ids = [pk for key_kind, pk in keys if key_kind == kind]
+        if ids:
+            q |= Q(**{f'{kind}_id__in': ids})
+    return q
+
+
+def _unlink(key):
+    """Delete the document's own list and its entries in other lists."""
+    RelatedContent = apps.get_model(RELATED_MODEL)
+    RelatedContent.objects.filter(Q(**{f'{key[0]}_id': key[1]}) | Q(**{f'related_{key[0]}_id': key[1]})).delete()
+
+
+def update(instance):
+    """Refresh the vector and neighbour lists of a saved article or news item."""
+    ContentVector, RelatedContent = apps.get_model(VECTOR_MODEL), apps.get_model(RELATED_MODEL)
+    key = _key(instance)
+    with transaction.atomic():
+        vector = ContentVector.objects.select_for_update().filter(**{f'{key[0]}_id': key[1]}).first()
+        if not instance.is_published:
+            _unlink(key)
+            if vector is not None:
+                _count_terms((), list(vector.terms))
+                vector.delete()
+            return
+        vector_terms = _document_terms(instance)
+        if vector is None:
+            ContentVector.objects.create(**{key[0]: instance}, terms=vector_terms)
+            _count_terms(list(vector_terms), ())
+        elif vector.terms == vector_terms:
+            return
+        else:
+            _count_terms(
+                list(vector_terms.keys() - vector.terms.keys()), list(vector.terms.keys() - vector_terms.keys())
+            )
+            vector.terms = vector_terms
+            vector.save(update_fields=['terms', 'updated_at'])
+
+        total = ContentVector.objects.count()
+        idf = _stored_idf(total, vector_terms)
+        own = _unit(vector_terms, idf)
+        candidates = _candidates(key, own)
+        idf.update(_stored_idf(total, set().union(*candidates.values()) - idf.keys()))
+        scores = {}
+        for other, other_terms in candidates.items():
+            other_weights = _unit(other_terms, idf)
+            scores[other] = sum(weight * other_weights[term] for term, weight in own.items() if term in other_weights)
+        scores = {other: score for other, score in scores.items() if score >= MIN_SCORE}
+        limit = related_limit()
+
+        _unlink(key)
+        links = [_link(key, other, score) for other, score in _top(scores, limit)]
+
+        # Offer the document to the lists it now belongs in
+        lists = {
+            ('article', row['article_id']) if row['article_id'] else ('news', row['news_id']): row
+            for row in RelatedContent.objects.filter(_source_q(scores)).values('article_id', 'news_id').annotate(
+                size=Count('pk'), weakest=Min('score')
+            ).order_by()
+        }
+        crowded = []
+        for other, score in scores.items():
+            current = lists.get(other)
+            if current is None or current['size'] < limit:
+                links.append(_link(other, key, score))
+            elif score > current['weakest']:
+                links.append(_link(other, key, score))
+                crowded.append(other)
+        RelatedContent.objects.bulk_create(links, batch_size=500)
+
+        if crowded:
+            excess, seen = [], Counter()
+            for row in RelatedContent.objects.filter(_source_q(crowded)).order_by('-score').values(
+                'pk', 'article_id', 'news_id'
+            ):
+                source = ('article', row['article_id']) if row['article_id'] else ('news', row['news_id'])
+                seen[source] += 1
+                if seen[source] > limit:
+                    excess.append(row['pk'])
+            RelatedContent.objects.filter(pk__in=excess).delete()
+
+
+def rebuild():
+    """Recompute all vectors and neighbour lists. Returns the number of documents."""
+    ContentVector, RelatedContent = apps.get_model(VECTOR_MODEL), apps.get_model(RELATED_MODEL)
+    TermFrequency = apps.get_model(FREQUENCY_MODEL)
+    documents = [
+        document for label in KINDS
+        for document in apps.get_model(label).objects.filter(is_published=True).only('title', 'excerpt', 'content')
+    ]
+    vectors = {_key(document): _document_terms(document) for document in documents}
+    df = Counter(term for vector_terms in vectors.values() for term in vector_terms)
+    weighted = _weighted(vectors, df)
+
+    postings = defaultdict(list)
+    for key, weights in weighted.items():
+        for term, weight in weights.items():
+            postings[term].append((key, weight))
+
+    limit = related_limit()
+    links = []
+    for key, weights in weighted.items():
+        scores = defaultdict(float)
+        for term, weight in weights.items():
+            for other, other_weight in postings[term]:
+                scores[other] += weight * other_weight
+        scores.pop(key, None)
+        links.extend(_link(key, other, score) for other, score in _top(scores, limit))
+
+    with transaction.atomic():
+        ContentVector.objects.all().delete()
+        ContentVector.objects.bulk_create([
+            ContentVector(**{kind + '_id': pk}, terms=vectors[(kind, pk)]) for kind, pk in vectors
+        ], batch_size=500)
+        TermFrequency.objects.all().delete()
+        TermFrequency.objects.bulk_create(
+            [TermFrequency(term=term, documents=count) for term, count in df.items()], batch_size=500
+        )
+        RelatedContent.objects.all().delete()
+        RelatedContent.objects.bulk_create(links, batch_size=500)
+    return len(documents)
+
+
+def related_items(instance, limit=None, kind=None):
+    """
+    Most similar published articles and news, best first (one query);
+    only articles or only news with ``kind``.
+    """
+    RelatedContent = apps.get_model(RELATED_MODEL)
+    kinds = [kind] if kind else list(KINDS.values())
+    published = Q(pk__in=[])
+    for related_kind in kinds:
+        published |= Q(**{f'related_{related_kind}__is_published': True})
+    links = RelatedContent.objects.filter(**{_key(instance)[0]: instance}).filter(published).select_related(
+        *(f'related_{related_kind}' for related_kind in kinds)
+    )[:limit or related_limit()]
+    return [
+        getattr(link, f'related_{related_kind}') for link in links for related_kind in kinds
+        if getattr(link, f'related_{related_kind}_id')
+    ]
@@ -0,0 +1,95 @@
+"""
+Rendered-content cache for wiki articles and news.
+
+Bodies are rendered once per version instead of on every view: wiki
+articles from Markdown (with heading anchors and a table of contents),
+news from plain text with paragraphs and line breaks. The HTML is
+sanitized with nh3 and kept in the bounded ``rendered`` cache (LRU, see
+RENDER_CACHE_MAX_ENTRIES) under (model, pk, version) - the article version
+for wiki, ``updated_at`` for news - so a save makes the old entry
+unreachable without any explicit invalidation. The save path renders the
+new version right after commit, so readers normally never render; hot
+pages stay at the recent end of the LRU.
+"""
+import markdown
+import nh3
+from markdown.extensions.toc import slugify_unicode
+from django.core.cache import caches
+from django.utils.html import linebreaks
+from django.utils.safestring import mark_safe
+
+RENDER_CACHE = 'rendered'
+
+HEADINGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+ALLOWED_ATTRIBUTES = {
+    **nh3.ALLOWED_ATTRIBUTES,
+    **{tag: nh3.ALLOWED_ATTRIBUTES.get(tag, set()) | {'id'} for tag in HEADINGS},
+    'code': {'class'},
+}
+
+MARKDOWN_EXTENSIONS = ['extra', 'sane_lists', 'toc']
+MARKDOWN_CONFIG = {
+    # Keeps Cyrillic headings readable in anchors
+    'toc': {'slugify': slugify_unicode, 'permalink': False},
+}
+
+
+def sanitize(html):
+    return nh3.clean(html, attributes=ALLOWED_ATTRIBUTES)
+
+
+def _flatten_toc(tokens):
+    for token in tokens:
+        yield {'level': token['level'], 'id': token['id'], 'name': token['name']}
+        yield from _flatten_toc(token['children'])
+
+
+def render_markdown(text):
+    """Sanitized HTML and a flat table of contents of Markdown ``text``."""
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS, extension_configs=MARKDOWN_CONFIG)
+    html = md.convert(text or '')
+    return {'html': sanitize(html), 'toc': list(_flatten_toc(md.toc_tokens))}
+
+
+def render_text(text):
+    """Plain text as escaped paragraphs and line breaks."""
+    return {'html': linebreaks(text or '', autoescape=True), 'toc': []}
+
+
+# Model label -> (renderer, source field, version attribute)
+SOURCES = {
+    'wiki.wikiarticle': (render_markdown, 'content', 'version'),
+    'news.news': (render_text, 'content', 'updated_at'),
+}
+
+
+def _key(instance):
+    _renderer, _field, version_attr = SOURCES[instance._meta.label_lower]
+    version = getattr(instance, version_attr)
+    if hasattr(version, 'timestamp'):
+        version = int(version.timestamp() * 1_000_000)
+    return f'render:{instance._meta.label_lower}:{instance.pk}:{version}'
+
+
+def _render(instance):
+    renderer, field, _version_attr = SOURCES[instance._meta.label_lower]
+    return renderer(getattr(instance, field))
+
+
+def refresh(instance):
+    """Render the current version into the cache (the save path)."""
+    result = _render(instance)
+    caches[RENDER_CACHE].set(_key(instance), result, None)
+    return result
+
+
+def forget(instance):
+    caches[RENDER_CACHE].delete(_key(instance))
+
+
+def rendered(instance):
+    """{'html': safe HTML, 'toc': [{'level', 'id', 'name'}]} of the instance's body."""
+    result = caches[RENDER_CACHE].get(_key(instance))
+    if result is None:
+        result = refresh(instance)
+    return {'html': mark_safe(result['html']), 'toc': result['toc']}
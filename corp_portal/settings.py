@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'meetings',
     'mattermost_integration',
     'settings',
+    'exports',
 ]
 
 MIDDLEWARE = [
@@ -65,6 +66,9 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'libraries': {
+                'images': 'corp_portal.templatetags.images',
+            },
         },
     },
 ]
@@ -123,6 +127,8 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# JPEG/WebP quality of resized image variants
+IMAGE_DERIVATIVE_QUALITY = int(os.getenv('IMAGE_DERIVATIVE_QUALITY', '80'))
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -155,9 +161,22 @@ CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
-    }
+    },
+    # Rendered wiki/news bodies; entries never expire, the LRU bound evicts cold ones
+    'rendered': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'rendered-content',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('RENDER_CACHE_MAX_ENTRIES', '2000'))},
+    },
 }
 
+# News feed: pages kept cached per category and their lifetime in seconds
+NEWS_FEED_PAGES = int(os.getenv('NEWS_FEED_PAGES', '3'))
+NEWS_FEED_CACHE_TIMEOUT = int(os.getenv('NEWS_FEED_CACHE_TIMEOUT', '600'))
+# Items in the RSS/Atom feeds of news and wiki
+FEED_ITEM_LIMIT = int(os.getenv('FEED_ITEM_LIMIT', '50'))
+
 # Mattermost integration settings
 MATTERMOST_URL = os.getenv('MATTERMOST_URL', '')
 MATTERMOST_TOKEN = os.getenv('MATTERMOST_TOKEN', '')
@@ -174,6 +193,40 @@ MATTERMOST_ICON_URL = os.getenv('MATTERMOST_ICON_URL', '')
 # Site URL for generating absolute links
 SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
 
+# Task analytics
+TASK_ANALYTICS_CACHE_TIMEOUT = int(os.getenv('TASK_ANALYTICS_CACHE_TIMEOUT', '600'))
+TASK_EVENT_RETENTION_DAYS = int(os.getenv('TASK_EVENT_RETENTION_DAYS', '730'))
+
+# Meetings
+MEETING_MAX_DURATION_HOURS = int(os.getenv('MEETING_MAX_DURATION_HOURS', '24'))  # Bounds room overlap checks
+MEETING_WORKDAY_START = int(os.getenv('MEETING_WORKDAY_START', '9'))
+MEETING_WORKDAY_END = int(os.getenv('MEETING_WORKDAY_END', '18'))
+MEETING_OCCURRENCE_HORIZON_DAYS = int(os.getenv('MEETING_OCCURRENCE_HORIZON_DAYS', '90'))
+MEETING_FEED_PAST_DAYS = int(os.getenv('MEETING_FEED_PAST_DAYS', '90'))
+MEETING_FEED_CACHE_TIMEOUT = int(os.getenv('MEETING_FEED_CACHE_TIMEOUT', str(24 * 60 * 60)))
+# Minutes before the start, comma-separated
+MEETING_REMINDER_OFFSETS = [int(value) for value in os.getenv('MEETING_REMINDER_OFFSETS', '1440,15').split(',') if value.strip()]
+MEETING_REMINDER_RELOAD = int(os.getenv('MEETING_REMINDER_RELOAD', '60'))
+MEETING_UTILIZATION_DAYS = int(os.getenv('MEETING_UTILIZATION_DAYS', '28'))
+MEETING_STATUS_INTERVAL = int(os.getenv('MEETING_STATUS_INTERVAL', '60'))
+
+# CalDAV synchronization
+CALDAV_SYNC_INTERVAL = int(os.getenv('CALDAV_SYNC_INTERVAL', '300'))
+CALDAV_CONFLICT_POLICY = os.getenv('CALDAV_CONFLICT_POLICY', 'newest')  # newest | server | local
+CALDAV_TIMEOUT = int(os.getenv('CALDAV_TIMEOUT', '30'))
+CALDAV_MULTIGET_BATCH = int(os.getenv('CALDAV_MULTIGET_BATCH', '100'))
+
+# List exports (XLSX/PDF)
+EXPORT_SYNC_MAX_ROWS = int(os.getenv('EXPORT_SYNC_MAX_ROWS', '5000'))  # Larger exports run in background
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+EXPORT_RETENTION_DAYS = int(os.getenv('EXPORT_RETENTION_DAYS', '7'))
+EXPORT_PDF_MAX_ROWS = int(os.getenv('EXPORT_PDF_MAX_ROWS', '20000'))
+EXPORT_PDF_FONT = os.getenv('EXPORT_PDF_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+
+# Wiki
+WIKI_SNAPSHOT_INTERVAL = int(os.getenv('WIKI_SNAPSHOT_INTERVAL', '20'))  # Full copy every N versions
+WIKI_RELATED_LIMIT = int(os.getenv('WIKI_RELATED_LIMIT', '5'))  # Precomputed similar documents per page
+
 # OnlyOffice settings
 ONLYOFFICE_URL = os.getenv('ONLYOFFICE_URL', 'http://onlyoffice:80')
 ONLYOFFICE_JWT_ENABLED = os.getenv('ONLYOFFICE_JWT_ENABLED', 'False').lower() in ('true', '1', 'yes')
@@ -0,0 +1,87 @@
+"""
+Base class of the RSS and Atom feeds (news, wiki).
+
+Feeds are read by logged-in users or, for scripts and feed readers, with
+the user's secret token (``?token=``, see news.models.FeedToken). Pollers
+mostly get a 304: the ETag and Last-Modified come from one indexed query
+over the ids and dates of the FEED_ITEM_LIMIT newest items, and a changed
+feed is rendered once and cached under its ETag, which changes with any of
+them.
+"""
+import hashlib
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+# Bump when the rendered output changes, to invalidate cached feeds
+FEED_VERSION = 1
+CACHE_TIMEOUT = 24 * 60 * 60
+# Personal tokens of the feed URLs, issued on the news page
+TOKEN_MODEL = 'news.FeedToken'
+
+
+def item_limit():
+    return getattr(settings, 'FEED_ITEM_LIMIT', 50)
+
+
+class SubscriptionFeed(Feed):
+    """
+    Feed with token access, conditional GET and a cached body.
+
+    Subclasses define ``feed_items(obj)``: the published items, newest
+    first, as a queryset the feed and its validators are cut from, and
+    ``validator_fields``: the date fields the items change with.
+    """
+
+    validator_fields = ('updated_at',)
+
+    def feed_items(self, obj):
+        raise NotImplementedError
+
+    def items(self, obj):
+        return self.feed_items(obj)[:item_limit()]
+
+    def validators(self, request, obj):
+        """(etag, last_modified) of the feed, from one query over the item ids and dates."""
+        rows = list(self.feed_items(obj).values_list('pk', *self.validator_fields)[:item_limit()])
+        dates = [date for row in rows for date in row[1:] if date]
+        last_modified = max(dates) if dates else None
+        items = ','.join(
+            f"{row[0]}@{'/'.join(str(date.timestamp()) if date else '' for date in row[1:])}" for row in rows
+        )
+        # Links in the body are absolute, hence the host
+        key = f"{FEED_VERSION}:{request.get_host()}{request.path}:{request.GET.get('category', '')}:{items}"
+        return f'"{hashlib.md5(key.encode()).hexdigest()}"', last_modified
+
+    def __call__(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponse(status=405, headers={'Allow': 'GET, HEAD'})
+        if not request.user.is_authenticated:
+            token = request.GET.get('token')
+            if not token:
+                return redirect_to_login(request.get_full_path())
+            if not apps.get_model(TOKEN_MODEL).objects.filter(token=token, user__is_active=True).exists():
+                raise Http404('Feed not found')
+
+        obj = self.get_object(request, *args, **kwargs)
+        etag, last_modified = self.validators(request, obj)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            body_key = f'feeds:{etag}'
+            body = cache.get(body_key)
+            if body is None:
+                body = self.get_feed(obj, request).writeString('utf-8').encode()
+                cache.set(body_key, body, CACHE_TIMEOUT)
+            response = HttpResponse(body, content_type=self.feed_type.content_type)
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(timestamp)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
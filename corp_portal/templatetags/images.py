@@ -0,0 +1,49 @@
+"""
+Template helpers for responsive images.
+
+    {% load images %}
+    {% picture employee.avatar 'avatar' alt=employee.get_full_name class='avatar' %}
+    <img src="..." srcset="{% srcset news_item.image 'news_card' %}" sizes="{% sizes 'news_card' %}">
+"""
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from corp_portal import images
+
+register = template.Library()
+
+
+@register.simple_tag
+def srcset(image, preset, fmt='webp'):
+    """``srcset`` value listing the preset's variants of an image field."""
+    if not image:
+        return ''
+    return images.srcset(image.name, preset, fmt)
+
+
+@register.simple_tag
+def sizes(preset):
+    return images.PRESETS[preset][1]
+
+
+@register.simple_tag
+def picture(image, preset, **attrs):
+    """
+    ``<picture>`` with WebP variants and a JPEG fallback; extra keyword
+    arguments become attributes of the ``<img>``.
+    """
+    if not image:
+        return ''
+    widths, preset_sizes = images.PRESETS[preset]
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        images.srcset(image.name, preset, 'webp'),
+        preset_sizes,
+        images.derivative_url(image.name, widths[-1], 'jpg'),
+        images.srcset(image.name, preset, 'jpg'),
+        preset_sizes,
+        format_html_join('', ' {}="{}"', sorted(attrs.items())),
+    )
@@ -5,12 +5,14 @@ The `urlpatterns` list routes URLs to views. For more information please see:
     https://docs.djangoproject.com/en/5.0/topics/http/urls/
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
 from django.views.generic.base import RedirectView
 
+from . import views
+
 urlpatterns = [
     # Admin
     path('admin/', admin.site.urls),
@@ -28,6 +30,14 @@ urlpatterns = [
     path('meetings/', include('meetings.urls')),
     path('mattermost/', include('mattermost_integration.urls')),
     path('settings/', include('settings.urls')),
+    path('exports/', include('exports.urls')),
+
+    # Resized variants of uploaded images
+    re_path(
+        r'^images/(?P<name>.+)-(?P<width>\d+)w\.(?P<fmt>webp|jpg)$',
+        views.image_derivative,
+        name='image_derivative',
+    ),
 ]
 
 # Serve media files in development
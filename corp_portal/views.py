@@ -0,0 +1,26 @@
+"""Project-level views shared by the apps."""
+from django.contrib.auth.decorators import login_required
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_http_methods
+from PIL import UnidentifiedImageError
+
+from . import images
+
+
+@login_required
+@require_http_methods(["GET", "HEAD"])
+def image_derivative(request, name, width, fmt):
+    """Resized variant of an uploaded image, generated on first request."""
+    width = int(width)
+    if width not in images.WIDTHS or not images.is_source(name) or not default_storage.exists(name):
+        raise Http404('Image not found')
+    try:
+        derivative = images.ensure(name, width, fmt)
+    except (UnidentifiedImageError, OSError) as e:
+        raise Http404('Image not found') from e
+    response = FileResponse(default_storage.open(derivative, 'rb'), content_type=images.FORMATS[fmt][1])
+    # The URL changes whenever the source does
+    patch_cache_control(response, private=True, max_age=images.CACHE_SECONDS, immutable=True)
+    return response
@@ -0,0 +1,43 @@
+"""Employee directory export definition."""
+from django.utils.translation import gettext_lazy as _
+
+from exports.datasets import ExportDataset, full_name
+from .filters import filter_employees
+from .models import Employee
+
+
+def _queryset(params, user):
+    return filter_employees(Employee.objects.filter(is_active=True), params)
+
+
+def _row(values):
+    (last_name, first_name, email, phone, position, department,
+     supervisor_last, supervisor_first, hire_date) = values
+    return [
+        full_name(last_name, first_name),
+        email,
+        phone,
+        position,
+        department,
+        full_name(supervisor_last, supervisor_first),
+        hire_date,
+    ]
+
+
+EMPLOYEES = ExportDataset(
+    name='employees',
+    title=_('Сотрудники'),
+    headers=[
+        _('ФИО'), 'Email', _('Телефон'), _('Должность'), _('Отдел'),
+        _('Руководитель'), _('Дата приема на работу'),
+    ],
+    fields=[
+        'user__last_name', 'user__first_name', 'user__email', 'phone',
+        'position__name', 'position__department__name',
+        'supervisor__user__last_name', 'supervisor__user__first_name',
+        'hire_date',
+    ],
+    get_queryset=_queryset,
+    format_row=_row,
+    widths=[4, 4, 2, 3, 3, 4, 2],
+)
@@ -0,0 +1,22 @@
+"""Query-string filters shared by the employee list and exports."""
+from django.db.models import Q
+
+
+def filter_employees(queryset, params):
+    """Apply the employee list filters from ``params`` (request.GET) to a queryset."""
+    # Search functionality
+    search_query = params.get('search', '')
+    if search_query:
+        queryset = queryset.filter(
+            Q(user__first_name__icontains=search_query) |
+            Q(user__last_name__icontains=search_query) |
+            Q(user__email__icontains=search_query) |
+            Q(position__name__icontains=search_query)
+        )
+
+    # Filter by department
+    department_id = params.get('department')
+    if department_id:
+        queryset = queryset.filter(position__department_id=department_id)
+
+    return queryset
@@ -0,0 +1,22 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from corp_portal import images
+
+
+class Command(BaseCommand):
+    help = 'Создаёт недостающие уменьшенные копии аватаров и изображений новостей'
+
+    def handle(self, *args, **options):
+        made = failed = 0
+        for (model_label, field_name), presets in images.SOURCES.items():
+            names = apps.get_model(model_label).objects.filter(
+                **{f'{field_name}__gt': ''}
+            ).values_list(field_name, flat=True).distinct()
+            for name in names.iterator():
+                try:
+                    made += images.ensure_all(name, presets)
+                except OSError as e:
+                    failed += 1
+                    self.stderr.write(f'{name}: {e}')
+        self.stdout.write(self.style.SUCCESS(f'Создано копий: {made}, ошибок: {failed}'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:48
+
+import corp_portal.images
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='avatar',
+            field=corp_portal.images.ContentHashedImageField(blank=True, null=True, upload_to='avatars/', verbose_name='Аватар'),
+        ),
+    ]
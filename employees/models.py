@@ -7,6 +7,8 @@ from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import EmailValidator, RegexValidator
 
+from corp_portal.images import ContentHashedImageField
+
 
 class Department(models.Model):
     """Department model for organizational structure."""
@@ -120,7 +122,7 @@ class Employee(models.Model):
         validators=[RegexValidator(r'^[\d\+\-\(\)\s]+$', _('Введите корректный номер телефона'))],
         verbose_name=_('Телефон')
     )
-    avatar = models.ImageField(
+    avatar = ContentHashedImageField(
         upload_to='avatars/',
         null=True,
         blank=True,
@@ -3,13 +3,14 @@ Employees app views with optimized queries and modern Django patterns.
 """
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.db.models import Prefetch, Q, Count
+from django.db.models import Prefetch, Count
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 import json
 
 from .models import Employee, Department, Position
+from .filters import filter_employees
 
 
 @login_required
@@ -52,20 +53,9 @@ def employee_list(request):
         'user', 'position', 'position__department', 'supervisor'
     ).filter(is_active=True)
     
-    # Search functionality
+    queryset = filter_employees(queryset, request.GET)
     search_query = request.GET.get('search', '')
-    if search_query:
-        queryset = queryset.filter(
-            Q(user__first_name__icontains=search_query) |
-            Q(user__last_name__icontains=search_query) |
-            Q(user__email__icontains=search_query) |
-            Q(position__name__icontains=search_query)
-        )
-    
-    # Filter by department
     department_id = request.GET.get('department')
-    if department_id:
-        queryset = queryset.filter(position__department_id=department_id)
     
     # Pagination
     paginator = Paginator(queryset, 20)
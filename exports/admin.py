@@ -0,0 +1,12 @@
+"""Exports app admin configuration."""
+from django.contrib import admin
+from .models import ExportJob
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('dataset', 'format', 'user', 'status', 'row_count', 'created_at', 'started_at', 'finished_at')
+    list_filter = ('status', 'format', 'dataset')
+    raw_id_fields = ('user',)
+    date_hierarchy = 'created_at'
+    ordering = ('-created_at',)
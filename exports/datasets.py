@@ -0,0 +1,55 @@
+"""
+Export datasets.
+
+Each app describes its exportable list in its own ``exports`` module as an
+ExportDataset; the registry below maps public dataset names to them. Rows are
+read with ``values_list(...).iterator(chunk_size=...)`` so memory use does not
+grow with the size of the export.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Sequence
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DATASETS = {
+    'tasks': 'tasks.exports.TASKS',
+    'employees': 'employees.exports.EMPLOYEES',
+    'meetings': 'meetings.exports.MEETINGS',
+}
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    """A filtered list that can be exported row by row."""
+    name: str
+    title: str
+    headers: Sequence[str]
+    fields: Sequence[str]
+    get_queryset: Callable
+    format_row: Callable = list
+    widths: Sequence[int] = field(default_factory=tuple)
+
+    def queryset(self, params, user):
+        return self.get_queryset(params, user)
+
+    def count(self, params, user):
+        return self.queryset(params, user).count()
+
+    def rows(self, params, user, chunk_size=None):
+        """Yield formatted rows without loading the whole result set."""
+        chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+        values = self.queryset(params, user).values_list(*self.fields)
+        for row in values.iterator(chunk_size=chunk_size):
+            yield self.format_row(row)
+
+
+def get_dataset(name) -> Optional[ExportDataset]:
+    """Return the registered dataset called ``name`` or None."""
+    path = DATASETS.get(name)
+    return import_string(path) if path else None
+
+
+def full_name(last_name, first_name):
+    """Join name parts coming from a values_list() row."""
+    return ' '.join(part for part in (last_name, first_name) if part)
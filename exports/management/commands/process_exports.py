@@ -0,0 +1,99 @@
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils import timezone
+
+from exports.datasets import get_dataset
+from exports.models import ExportJob, ExportStatus
+from exports.writers import build_export, export_filename
+
+# A job running longer than this lost its worker and is run again
+RUN_TIMEOUT = timedelta(hours=1)
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи экспорта и удаляет устаревшие файлы экспорта'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, опрашивая очередь')
+        parser.add_argument('--interval', type=int, default=5, help='Интервал опроса очереди в секундах')
+
+    def handle(self, *args, **options):
+        while True:
+            self.purge_expired()
+            self.requeue_stale()
+            processed = 0
+            for job_id in ExportJob.objects.filter(
+                status=ExportStatus.PENDING
+            ).order_by('created_at').values_list('pk', flat=True):
+                if self.claim(job_id):
+                    self.run(ExportJob.objects.select_related('user').get(pk=job_id))
+                    processed += 1
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f'Выполнено задач экспорта: {processed}'))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def requeue_stale(self):
+        """Return jobs stuck in RUNNING (their worker died) to the queue."""
+        requeued = ExportJob.objects.filter(
+            status=ExportStatus.RUNNING, started_at__lt=timezone.now() - RUN_TIMEOUT
+        ).update(status=ExportStatus.PENDING, started_at=None)
+        if requeued:
+            self.stderr.write(self.style.WARNING(f'Возвращено в очередь зависших экспортов: {requeued}'))
+
+    def claim(self, job_id):
+        """Take a pending job; the conditional UPDATE keeps concurrent workers apart."""
+        return ExportJob.objects.filter(
+            pk=job_id, status=ExportStatus.PENDING
+        ).update(status=ExportStatus.RUNNING, started_at=timezone.now()) == 1
+
+    def run(self, job):
+        dataset = get_dataset(job.dataset)
+        try:
+            with tempfile.TemporaryFile() as output:
+                job.row_count = build_export(
+                    dataset, job.format, QueryDict(job.params), job.user, output
+                )
+                output.seek(0)
+                job.file.save(export_filename(dataset, job.format), File(output), save=False)
+            job.status = ExportStatus.DONE
+        except Exception as e:
+            job.status = ExportStatus.FAILED
+            job.error = str(e)
+            self.stderr.write(self.style.ERROR(f'Экспорт #{job.pk} завершился ошибкой: {e}'))
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'row_count', 'file', 'error', 'finished_at'])
+
+        if job.status == ExportStatus.DONE:
+            self.notify(job)
+
+    def notify(self, job):
+        from mattermost_integration.models import send_notification_to_user
+
+        site_url = getattr(settings, 'SITE_URL', 'http://localhost:8000')
+        download_url = reverse('exports:job_download', args=[job.pk])
+        send_notification_to_user(
+            job.user,
+            f"📦 Экспорт «{job.dataset}» готов ({job.row_count} строк): "
+            f"[скачать]({site_url}{download_url})"
+        )
+
+    def purge_expired(self):
+        """Delete finished jobs and their files after EXPORT_RETENTION_DAYS."""
+        cutoff = timezone.now() - timedelta(days=settings.EXPORT_RETENTION_DAYS)
+        expired = ExportJob.objects.filter(
+            status__in=[ExportStatus.DONE, ExportStatus.FAILED],
+            finished_at__lt=cutoff,
+        )
+        for job in expired.iterator():
+            if job.file:
+                job.file.delete(save=False)
+        expired.delete()
@@ -0,0 +1,66 @@
+"""
+Exports app models - Background export jobs for large list exports.
+"""
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils.translation import gettext_lazy as _
+
+
+class ExportFormat(models.TextChoices):
+    """Supported export file formats."""
+    XLSX = 'xlsx', _('Excel (XLSX)')
+    PDF = 'pdf', _('PDF')
+
+
+class ExportStatus(models.TextChoices):
+    """Export job status choices."""
+    PENDING = 'pending', _('В очереди')
+    RUNNING = 'running', _('Выполняется')
+    DONE = 'done', _('Готово')
+    FAILED = 'failed', _('Ошибка')
+
+
+class ExportJob(models.Model):
+    """Export that is too large to build within a request."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='export_jobs',
+        verbose_name=_('Пользователь')
+    )
+    dataset = models.CharField(max_length=50, verbose_name=_('Набор данных'))
+    format = models.CharField(
+        max_length=10,
+        choices=ExportFormat.choices,
+        verbose_name=_('Формат')
+    )
+    params = models.TextField(
+        blank=True,
+        help_text=_('Параметры фильтрации списка (query string)'),
+        verbose_name=_('Параметры')
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=ExportStatus.choices,
+        default=ExportStatus.PENDING,
+        verbose_name=_('Статус')
+    )
+    row_count = models.PositiveIntegerField(default=0, verbose_name=_('Количество строк'))
+    file = models.FileField(upload_to='exports/', blank=True, verbose_name=_('Файл'))
+    error = models.TextField(blank=True, verbose_name=_('Ошибка'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Дата создания'))
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Дата запуска'))
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Дата завершения'))
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('Экспорт')
+        verbose_name_plural = _('Экспорты')
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.dataset}.{self.format} ({self.get_status_display()})"
@@ -0,0 +1,11 @@
+"""Exports app URLs."""
+from django.urls import path
+from . import views
+
+app_name = 'exports'
+
+urlpatterns = [
+    path('jobs/<int:pk>/', views.job_status, name='job_status'),
+    path('jobs/<int:pk>/download/', views.job_download, name='job_download'),
+    path('<slug:dataset>/<str:fmt>/', views.export, name='export'),
+]
@@ -0,0 +1,95 @@
+"""Exports app views - list exports and background export jobs."""
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
+
+from .datasets import get_dataset
+from .models import ExportFormat, ExportJob, ExportStatus
+from .writers import WRITERS, build_export, export_filename
+
+
+@login_required
+@require_http_methods(["GET"])
+def export(request, dataset, fmt):
+    """
+    Export a filtered list as XLSX or PDF.
+
+    The list filters are taken from the query string, exactly as on the list
+    page. Small exports are streamed back from a temporary file; larger ones
+    are queued as an ExportJob and a status URL is returned instead.
+    """
+    export_dataset = get_dataset(dataset)
+    if export_dataset is None or fmt not in WRITERS:
+        raise Http404
+
+    total = export_dataset.count(request.GET, request.user)
+    if fmt == ExportFormat.PDF and total > settings.EXPORT_PDF_MAX_ROWS:
+        # reportlab keeps finished pages in memory until the document is saved
+        return JsonResponse({
+            'success': False,
+            'error': f'PDF ограничен {settings.EXPORT_PDF_MAX_ROWS} строками, используйте XLSX',
+        }, status=400)
+
+    if total > settings.EXPORT_SYNC_MAX_ROWS:
+        job = ExportJob.objects.create(
+            user=request.user,
+            dataset=dataset,
+            format=fmt,
+            params=request.GET.urlencode(),
+            row_count=total,
+        )
+        return JsonResponse({
+            'success': True,
+            'job_id': job.pk,
+            'status': job.status,
+            'status_url': reverse('exports:job_status', args=[job.pk]),
+        }, status=202)
+
+    output = tempfile.TemporaryFile()
+    build_export(export_dataset, fmt, request.GET, request.user, output)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=export_filename(export_dataset, fmt),
+        content_type=WRITERS[fmt][1],
+    )
+
+
+@login_required
+@require_http_methods(["GET"])
+def job_status(request, pk):
+    """Status of a background export job."""
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user)
+    data = {
+        'job_id': job.pk,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'row_count': job.row_count,
+        'download_url': None,
+        'error': job.error,
+    }
+    if job.status == ExportStatus.DONE and job.file:
+        data['download_url'] = reverse('exports:job_download', args=[job.pk])
+    return JsonResponse(data)
+
+
+@login_required
+@require_http_methods(["GET"])
+def job_download(request, pk):
+    """Download the file produced by a finished export job."""
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user, status=ExportStatus.DONE)
+    if not job.file:
+        raise Http404
+    return FileResponse(
+        job.file.open('rb'),
+        as_attachment=True,
+        filename=os.path.basename(job.file.name),
+        content_type=WRITERS[job.format][1],
+    )
@@ -0,0 +1,159 @@
+"""
+Streaming XLSX and PDF writers.
+
+Rows are consumed one at a time: openpyxl write-only worksheets flush rows
+to disk as they are appended, and the PDF is drawn straight onto a reportlab
+canvas page by page instead of building a platypus Table in memory.
+"""
+import logging
+import os
+from datetime import date, datetime
+
+from django.conf import settings
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen.canvas import Canvas
+
+logger = logging.getLogger(__name__)
+
+PDF_FONT_NAME = 'ExportSans'
+PDF_FONT_SIZE = 8
+PDF_ROW_HEIGHT = 12
+PDF_MARGIN = 28
+
+
+def _local_naive(value):
+    """Excel has no time zones: store datetimes as naive local time."""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.replace(tzinfo=None)
+
+
+def _xlsx_value(value):
+    if isinstance(value, datetime):
+        return _local_naive(value)
+    if value is None or isinstance(value, (int, float, date)):
+        return value
+    return str(value)
+
+
+def _text_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return _local_naive(value).strftime('%d.%m.%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d.%m.%Y')
+    return str(value)
+
+
+def write_xlsx(dataset, rows, fileobj):
+    """Write rows into a write-only workbook. Returns the number of rows."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=str(dataset.title)[:31])
+
+    header = []
+    for title in dataset.headers:
+        cell = WriteOnlyCell(sheet, value=str(title))
+        cell.font = Font(bold=True)
+        header.append(cell)
+    sheet.append(header)
+
+    count = 0
+    for row in rows:
+        sheet.append([_xlsx_value(value) for value in row])
+        count += 1
+
+    workbook.save(fileobj)
+    return count
+
+
+def _pdf_font():
+    """Register a TTF font with Cyrillic glyphs, falling back to Helvetica."""
+    if PDF_FONT_NAME in pdfmetrics.getRegisteredFontNames():
+        return PDF_FONT_NAME
+
+    font_path = getattr(settings, 'EXPORT_PDF_FONT', '')
+    if font_path and os.path.exists(font_path):
+        pdfmetrics.registerFont(TTFont(PDF_FONT_NAME, font_path))
+        return PDF_FONT_NAME
+
+    logger.warning("PDF export font %r not found, Cyrillic text will not render", font_path)
+    return 'Helvetica'
+
+
+def _fit(text, width, font, size):
+    """Truncate text so that it fits into a table cell."""
+    if pdfmetrics.stringWidth(text, font, size) <= width:
+        return text
+    while text and pdfmetrics.stringWidth(text + '…', font, size) > width:
+        text = text[:-1]
+    return text + '…'
+
+
+def write_pdf(dataset, rows, fileobj):
+    """Draw rows as a paginated table on a landscape A4 canvas. Returns the number of rows."""
+    font = _pdf_font()
+    page_width, page_height = landscape(A4)
+    canvas = Canvas(fileobj, pagesize=(page_width, page_height), pageCompression=1)
+    canvas.setTitle(str(dataset.title))
+
+    weights = dataset.widths or [1] * len(dataset.headers)
+    usable = page_width - 2 * PDF_MARGIN
+    widths = [usable * weight / sum(weights) for weight in weights]
+    offsets = [PDF_MARGIN + sum(widths[:i]) for i in range(len(widths))]
+
+    def draw_row(values, y, bold=False):
+        canvas.setFont(font, PDF_FONT_SIZE + (1 if bold else 0))
+        for value, x, width in zip(values, offsets, widths):
+            canvas.drawString(x + 2, y, _fit(value, width - 4, font, PDF_FONT_SIZE))
+
+    def start_page(number):
+        canvas.setFont(font, 12)
+        canvas.drawString(PDF_MARGIN, page_height - PDF_MARGIN, str(dataset.title))
+        canvas.setFont(font, PDF_FONT_SIZE)
+        canvas.drawRightString(page_width - PDF_MARGIN, PDF_MARGIN / 2, str(number))
+        y = page_height - PDF_MARGIN - 2 * PDF_ROW_HEIGHT
+        draw_row([str(title) for title in dataset.headers], y, bold=True)
+        canvas.line(PDF_MARGIN, y - 3, page_width - PDF_MARGIN, y - 3)
+        return y - PDF_ROW_HEIGHT
+
+    page = 1
+    y = start_page(page)
+    count = 0
+    for row in rows:
+        if y < PDF_MARGIN:
+            canvas.showPage()
+            page += 1
+            y = start_page(page)
+        draw_row([_text_value(value) for value in row], y)
+        y -= PDF_ROW_HEIGHT
+        count += 1
+
+    canvas.save()
+    return count
+
+
+WRITERS = {
+    'xlsx': (
+        write_xlsx,
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    ),
+    'pdf': (write_pdf, 'application/pdf'),
+}
+
+
+def export_filename(dataset, fmt):
+    """Build a download file name such as ``tasks_20240131_1530.xlsx``."""
+    return f"{dataset.name}_{timezone.localtime():%Y%m%d_%H%M}.{fmt}"
+
+
+def build_export(dataset, fmt, params, user, fileobj):
+    """Write the filtered dataset into ``fileobj`` in the given format."""
+    writer, _content_type = WRITERS[fmt]
+    return writer(dataset, dataset.rows(params, user), fileobj)
@@ -8,6 +8,7 @@ from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.core.cache import cache
+from django.utils import timezone
 import logging
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
@@ -226,16 +227,23 @@ class MattermostClient:
         
         return self.send_message(message, channel=self.config.tasks_channel)
     
-    def send_meeting_reminder(self, meeting) -> bool:
-        """Send meeting reminder to participants."""
-        participants = meeting.participants.filter(response='accepted')
+    def send_meeting_reminder(self, meeting, participants=None, start_time=None, end_time=None) -> bool:
+        """
+        Send meeting reminder to participants.
+        
+        ``participants`` may be passed preloaded (with their users); the
+        start and end default to the meeting's, occurrences pass their own.
+        """
+        if participants is None:
+            participants = meeting.participants.filter(response='accepted').select_related('user')
         participant_mentions = ' '.join([f"@{p.user.username}" for p in participants if p.user])
         
-        site_url = getattr(settings, 'SITE_URL', 'http://localhost:8000')
+        start_time = timezone.localtime(start_time or meeting.start_time)
+        end_time = timezone.localtime(end_time or meeting.end_time)
         message = (
             f"📅 **Напоминание о встрече: {meeting.title}**\n\n"
-            f"*Начало:* {meeting.start_time.strftime('%d.%m.%Y %H:%M')}\n"
-            f"*Окончание:* {meeting.end_time.strftime('%H:%M')}\n"
+            f"*Начало:* {start_time.strftime('%d.%m.%Y %H:%M')}\n"
+            f"*Окончание:* {end_time.strftime('%H:%M')}\n"
         )
         
         if hasattr(meeting, 'room') and meeting.room:
@@ -249,6 +257,37 @@ class MattermostClient:
         
         return self.send_message(message, channel=self.config.meetings_channel)
     
+    def send_meeting_invitation(self, meeting, users: List[User]) -> bool:
+        """Invite users to a meeting with a single channel message mentioning all of them."""
+        site_url = getattr(settings, 'SITE_URL', 'http://localhost:8000')
+        message = f"✉️ **Приглашение на встречу: {meeting.title}**\n\n"
+        if meeting.organizer:
+            message += f"*Организатор:* @{meeting.organizer.username}\n"
+        message += (
+            f"*Начало:* {timezone.localtime(meeting.start_time).strftime('%d.%m.%Y %H:%M')}\n"
+            f"*Окончание:* {timezone.localtime(meeting.end_time).strftime('%H:%M')}\n"
+        )
+        
+        if meeting.room:
+            message += f"*Место:* {meeting.room.name}\n"
+        
+        message += f"\n[Ответить на приглашение]({site_url}/meetings/{meeting.pk}/)\n\n"
+        message += ' '.join(f"@{user.username}" for user in users)
+        
+        return self.send_message(message, channel=self.config.meetings_channel, use_cache=False)
+    
+    def send_meeting_cancellation(self, meeting, users: List[User]) -> bool:
+        """Tell the participants of a meeting that it was cancelled."""
+        message = (
+            f"❌ **Встреча отменена: {meeting.title}**\n\n"
+            f"*Начало:* {timezone.localtime(meeting.start_time).strftime('%d.%m.%Y %H:%M')}\n"
+        )
+        if meeting.room:
+            message += f"*Место:* {meeting.room.name}\n"
+        if users:
+            message += '\n' + ' '.join(f"@{user.username}" for user in users)
+        return self.send_message(message, channel=self.config.meetings_channel, use_cache=False)
+    
     def test_connection(self) -> Dict[str, Any]:
         """Test Mattermost connection and return status."""
         result = {
@@ -321,10 +360,12 @@ def send_task_notification(task, notify_users=None):
     client = get_mattermost_client()
     return client.send_task_notification(task, notify_users=notify_users)
 
-def send_meeting_reminder(meeting):
+def send_meeting_reminder(meeting, participants=None, start_time=None, end_time=None):
     """Legacy wrapper for backward compatibility."""
     client = get_mattermost_client()
-    return client.send_meeting_reminder(meeting)
+    return client.send_meeting_reminder(
+        meeting, participants=participants, start_time=start_time, end_time=end_time
+    )
 
 
 class MattermostMessage(models.Model):
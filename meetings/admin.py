@@ -1,6 +1,10 @@
 """Meetings app admin configuration."""
 from django.contrib import admin
-from .models import Meeting, MeetingRoom, MeetingParticipant, MeetingAttachment
+from .models import (
+    Meeting, MeetingRoom, MeetingParticipant, MeetingAttachment, MeetingOccurrenceException,
+    CalDAVCalendar, CalDAVEvent, CalendarFeed, MeetingInvitationBatch, MeetingReminder,
+    RoomUtilization,
+)
 
 
 @admin.register(MeetingRoom)
@@ -21,6 +25,14 @@ class MeetingAdmin(admin.ModelAdmin):
     ordering = ('-start_time',)
 
 
+@admin.register(MeetingOccurrenceException)
+class MeetingOccurrenceExceptionAdmin(admin.ModelAdmin):
+    list_display = ('meeting', 'original_start', 'is_cancelled', 'start_time', 'end_time')
+    list_filter = ('is_cancelled',)
+    raw_id_fields = ('meeting',)
+    ordering = ('-original_start',)
+
+
 @admin.register(MeetingParticipant)
 class MeetingParticipantAdmin(admin.ModelAdmin):
     list_display = ('meeting', 'user', 'email', 'response', 'joined_at')
@@ -36,3 +48,50 @@ class MeetingAttachmentAdmin(admin.ModelAdmin):
     list_filter = ('uploaded_at',)
     raw_id_fields = ('meeting', 'uploaded_by')
     date_hierarchy = 'uploaded_at'
+
+
+@admin.register(CalDAVCalendar)
+class CalDAVCalendarAdmin(admin.ModelAdmin):
+    list_display = ('name', 'owner', 'room', 'is_active', 'last_synced_at', 'last_error')
+    list_filter = ('is_active',)
+    search_fields = ('name', 'url')
+    raw_id_fields = ('owner', 'room')
+    readonly_fields = ('sync_token', 'local_watermark', 'last_synced_at', 'last_error')
+
+
+@admin.register(CalDAVEvent)
+class CalDAVEventAdmin(admin.ModelAdmin):
+    list_display = ('href', 'calendar', 'meeting', 'etag', 'local_updated_at')
+    list_filter = ('calendar',)
+    raw_id_fields = ('calendar', 'meeting')
+    search_fields = ('href', 'uid')
+
+
+@admin.register(CalendarFeed)
+class CalendarFeedAdmin(admin.ModelAdmin):
+    list_display = ('user', 'created_at')
+    search_fields = ('user__username', 'user__last_name')
+    raw_id_fields = ('user',)
+    readonly_fields = ('token', 'created_at')
+
+
+@admin.register(MeetingInvitationBatch)
+class MeetingInvitationBatchAdmin(admin.ModelAdmin):
+    list_display = ('meeting', 'status', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    raw_id_fields = ('meeting',)
+    readonly_fields = ('user_ids', 'error', 'created_at', 'sent_at')
+
+
+@admin.register(MeetingReminder)
+class MeetingReminderAdmin(admin.ModelAdmin):
+    list_display = ('meeting', 'original_start', 'offset_minutes', 'sent_at')
+    list_filter = ('offset_minutes',)
+    raw_id_fields = ('meeting',)
+
+
+@admin.register(RoomUtilization)
+class RoomUtilizationAdmin(admin.ModelAdmin):
+    list_display = ('room', 'period_start', 'period_end', 'meetings', 'utilization', 'no_show_ratio', 'fill_ratio')
+    list_filter = ('period_end',)
+    readonly_fields = ('computed_at',)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class MeetingsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'meetings'
+    verbose_name = 'Встречи'
+
+    def ready(self):
+        from . import signals  # noqa: F401
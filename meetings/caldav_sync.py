@@ -0,0 +1,465 @@
+"""
+Incremental two-way CalDAV synchronization of meetings.
+
+Pull: a sync-collection REPORT (RFC 6578) with the stored sync token lists
+only the resources changed since the previous run together with their
+ETags. Resources whose ETag differs from the stored one are fetched with
+calendar-multiget REPORTs in batches, and all resulting database writes of a
+run are applied with bulk operations in one transaction.
+
+Push: meetings changed after the calendar's local watermark are written
+with conditional PUTs (If-Match / If-None-Match), so a concurrent remote
+edit surfaces as 412 Precondition Failed instead of being overwritten; it is
+then pulled on the next run.
+
+When both sides changed since the last sync, CALDAV_CONFLICT_POLICY decides:
+'newest' compares the remote LAST-MODIFIED with Meeting.updated_at,
+'server' and 'local' always prefer one side.
+"""
+import logging
+import xml.etree.ElementTree as ET
+from collections import Counter
+from datetime import timedelta
+from urllib.parse import quote, unquote, urljoin, urlparse
+from xml.sax.saxutils import escape
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import ical
+from .models import CalDAVCalendar, CalDAVEvent, Meeting, MeetingOccurrenceException, MeetingStatus
+
+logger = logging.getLogger(__name__)
+
+NS = {'d': 'DAV:', 'c': 'urn:ietf:params:xml:ns:caldav'}
+
+# Local edits committed while the push query runs are caught by the next run
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+SYNC_FIELDS = [
+    'title', 'description', 'start_time', 'end_time', 'status',
+    'is_recurring', 'recurrence_pattern', 'recurrence_until', 'caldav_uid',
+]
+
+SYNC_COLLECTION = """<?xml version="1.0" encoding="utf-8"?>
+<d:sync-collection xmlns:d="DAV:">
+  <d:sync-token>{token}</d:sync-token>
+  <d:sync-level>1</d:sync-level>
+  <d:prop><d:getetag/></d:prop>
+</d:sync-collection>"""
+
+CALENDAR_MULTIGET = """<?xml version="1.0" encoding="utf-8"?>
+<c:calendar-multiget xmlns:d="DAV:" xmlns:c="urn:ietf:params:xml:ns:caldav">
+  <d:prop><d:getetag/><c:calendar-data/></d:prop>
+  {hrefs}
+</c:calendar-multiget>"""
+
+
+class CalDAVError(Exception):
+    """Unexpected response from the CalDAV server."""
+
+
+class InvalidSyncToken(CalDAVError):
+    """The server no longer accepts the stored sync token."""
+
+
+class PreconditionFailed(CalDAVError):
+    """The resource changed on the server after its ETag was read."""
+
+
+def _chunks(items, size):
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+class CalDAVClient:
+    """Minimal WebDAV/CalDAV client for one calendar collection."""
+
+    def __init__(self, calendar, session=None):
+        self.url = calendar.url if calendar.url.endswith('/') else calendar.url + '/'
+        self.path = unquote(urlparse(self.url).path)
+        self.session = session or requests.Session()
+        if calendar.username:
+            self.session.auth = (calendar.username, calendar.password)
+        self.timeout = getattr(settings, 'CALDAV_TIMEOUT', 30)
+
+    @staticmethod
+    def normalize(href):
+        """Canonical form of an href: the unquoted path."""
+        return unquote(urlparse(href).path)
+
+    def resource_href(self, uid):
+        """Href for a new resource created from the portal."""
+        return f"{self.path}{uid.replace('/', '_')}.ics"
+
+    def _request(self, method, href, body=None, headers=None):
+        try:
+            return self.session.request(
+                method,
+                urljoin(self.url, quote(href)),
+                data=body,
+                headers=headers or {},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise CalDAVError(f"{method} {href}: {e}") from e
+
+    def _report(self, body, depth):
+        return self._request('REPORT', self.path, body.encode('utf-8'), {
+            'Content-Type': 'application/xml; charset=utf-8',
+            'Depth': depth,
+        })
+
+    def sync_collection(self, token):
+        """
+        Resources changed since ``token``.
+
+        Returns ([(href, etag)], new_token); ``etag`` is None for deleted
+        resources. An empty token lists the whole collection.
+        """
+        response = self._report(SYNC_COLLECTION.format(token=escape(token)), '0')
+        if response.status_code in (403, 409) and b'valid-sync-token' in response.content:
+            raise InvalidSyncToken(f"Sync token rejected: {token}")
+        if response.status_code != 207:
+            raise CalDAVError(f"sync-collection: HTTP {response.status_code}")
+
+        root = ET.fromstring(response.content)
+        changes = []
+        for item in root.findall('d:response', NS):
+            href = self.normalize(item.findtext('d:href', default='', namespaces=NS))
+            if href.rstrip('/') == self.path.rstrip('/'):
+                continue
+            if ' 404' in item.findtext('d:status', default='', namespaces=NS):
+                changes.append((href, None))
+                continue
+            etag = item.findtext('d:propstat/d:prop/d:getetag', namespaces=NS)
+            if etag:
+                changes.append((href, etag))
+        return changes, root.findtext('d:sync-token', default='', namespaces=NS)
+
+    def multiget(self, hrefs):
+        """Fetch resources by href. Returns [(href, etag, ical_data)]."""
+        body = CALENDAR_MULTIGET.format(hrefs=''.join(
+            f"<d:href>{escape(quote(href))}</d:href>" for href in hrefs
+        ))
+        response = self._report(body, '1')
+        if response.status_code != 207:
+            raise CalDAVError(f"calendar-multiget: HTTP {response.status_code}")
+
+        resources = []
+        for item in ET.fromstring(response.content).findall('d:response', NS):
+            data = item.findtext('d:propstat/d:prop/c:calendar-data', namespaces=NS)
+            if not data:
+                continue
+            resources.append((
+                self.normalize(item.findtext('d:href', default='', namespaces=NS)),
+                item.findtext('d:propstat/d:prop/d:getetag', default='', namespaces=NS),
+                data,
+            ))
+        return resources
+
+    def put(self, href, data, etag=None):
+        """Create or replace a resource unless it changed remotely. Returns the new ETag."""
+        headers = {'Content-Type': 'text/calendar; charset=utf-8'}
+        if etag:
+            headers['If-Match'] = etag
+        else:
+            headers['If-None-Match'] = '*'
+        response = self._request('PUT', href, data, headers)
+        if response.status_code == 412:
+            raise PreconditionFailed(f"PUT {href}: remote resource changed")
+        if response.status_code not in (200, 201, 204):
+            raise CalDAVError(f"PUT {href}: HTTP {response.status_code}")
+        return response.headers.get('ETag', '')
+
+    def delete(self, href, etag=None):
+        """Delete a resource unless it changed remotely."""
+        response = self._request('DELETE', href, headers={'If-Match': etag} if etag else {})
+        if response.status_code == 412:
+            raise PreconditionFailed(f"DELETE {href}: remote resource changed")
+        if response.status_code not in (200, 204, 404):
+            raise CalDAVError(f"DELETE {href}: HTTP {response.status_code}")
+
+
+def local_wins(meeting, remote):
+    """Resolve a meeting changed on both sides according to CALDAV_CONFLICT_POLICY."""
+    policy = getattr(settings, 'CALDAV_CONFLICT_POLICY', 'newest')
+    if policy == 'local':
+        return True
+    if policy == 'server':
+        return False
+    return bool(remote.last_modified) and meeting.updated_at > remote.last_modified
+
+
+class CalendarSync:
+    """One synchronization run of a CalDAVCalendar."""
+
+    def __init__(self, calendar, client=None):
+        self.calendar = calendar
+        self.client = client or CalDAVClient(calendar)
+        self.batch_size = getattr(settings, 'CALDAV_MULTIGET_BATCH', 100)
+        self.stats = Counter()
+
+    def run(self, full=False):
+        """Pull remote changes, then push local ones. Returns counters of the run."""
+        started = timezone.now()
+        self.pull(full)
+        self.push()
+        if not self.stats['failed']:
+            # After failed writes the watermark stays, so those meetings are retried;
+            # the ones already written are skipped by their local_updated_at
+            self.calendar.local_watermark = started - WATERMARK_OVERLAP
+        self.calendar.last_synced_at = timezone.now()
+        self.calendar.last_error = ''
+        self.calendar.save(update_fields=['local_watermark', 'last_synced_at', 'last_error'])
+        return self.stats
+
+    # Pull
+
+    def pull(self, full=False):
+        token = '' if full else self.calendar.sync_token
+        try:
+            changes, new_token = self.client.sync_collection(token)
+        except InvalidSyncToken:
+            logger.info("CalDAV calendar %s: sync token expired, full resync", self.calendar.pk)
+            token = ''
+            changes, new_token = self.client.sync_collection(token)
+
+        if token:
+            states = self.calendar.events.filter(href__in=[href for href, _etag in changes])
+            states = {state.href: state for state in states}
+            deleted = [states[href] for href, etag in changes if etag is None and href in states]
+        else:
+            # A full listing: everything not listed is gone
+            states = {state.href: state for state in self.calendar.events.all()}
+            listed = {href for href, etag in changes if etag}
+            deleted = [state for href, state in states.items() if href not in listed]
+
+        stale = [
+            href for href, etag in changes
+            if etag and (href not in states or states[href].etag != etag)
+        ]
+        fetched = []
+        for batch in _chunks(stale, self.batch_size):
+            fetched.extend(self.client.multiget(batch))
+
+        with transaction.atomic():
+            self.apply_remote(fetched, states)
+            self.apply_deletions(deleted)
+            self.calendar.sync_token = new_token
+            CalDAVCalendar.objects.filter(pk=self.calendar.pk).update(sync_token=new_token)
+
+    def _copy(self, meeting, remote):
+        meeting.title = remote.title[:300]
+        meeting.description = remote.description
+        meeting.start_time = remote.start_time
+        meeting.end_time = remote.end_time
+        meeting.caldav_uid = remote.uid
+        meeting.is_recurring = bool(remote.recurrence_pattern)
+        meeting.recurrence_pattern = remote.recurrence_pattern
+        meeting.recurrence_until = remote.recurrence_until
+        if remote.cancelled:
+            meeting.status = MeetingStatus.CANCELLED
+        elif meeting.status in (MeetingStatus.DRAFT, MeetingStatus.CANCELLED):
+            meeting.status = MeetingStatus.SCHEDULED
+
+    def _room_is_free(self, meeting):
+        """
+        Remote changes must not double-book a room: whatever the calendar, a
+        meeting with a room is checked against that room's local bookings.
+        """
+        return not meeting.find_room_conflicts()
+
+    def apply_remote(self, fetched, states):
+        """Create or update meetings from fetched resources with bulk writes."""
+        parsed = []
+        for href, etag, data in fetched:
+            try:
+                remote = ical.parse_ical(data)
+            except ValueError as e:
+                logger.warning("CalDAV calendar %s: cannot parse %s: %s", self.calendar.pk, href, e)
+                self.stats['invalid'] += 1
+                continue
+            if remote and remote.uid:
+                parsed.append((href, etag, remote))
+        if not parsed:
+            return
+
+        meetings = Meeting.objects.in_bulk([
+            states[href].meeting_id for href, _etag, _remote in parsed
+            if href in states and states[href].meeting_id
+        ])
+        by_uid = {
+            meeting.caldav_uid: meeting
+            for meeting in Meeting.objects.filter(caldav_uid__in=[remote.uid for _h, _e, remote in parsed])
+        }
+
+        now = timezone.now()
+        created, updated, exceptions = [], [], {}
+        new_states, changed_states, kept_local = [], [], set()
+        for href, etag, remote in parsed:
+            state = states.get(href)
+            meeting = meetings.get(state.meeting_id) if state and state.meeting_id else by_uid.get(remote.uid)
+
+            if meeting is None:
+                meeting = Meeting(
+                    organizer_id=self.calendar.owner_id,
+                    room_id=self.calendar.room_id,
+                    status=MeetingStatus.SCHEDULED,
+                )
+                self._copy(meeting, remote)
+                if not self._room_is_free(meeting):
+                    self.stats['rejected'] += 1
+                    continue
+                created.append(meeting)
+            else:
+                changed_locally = state is None or not state.local_updated_at \
+                    or meeting.updated_at > state.local_updated_at
+                if changed_locally and local_wins(meeting, remote):
+                    # Keep the local version; the push overwrites the remote one
+                    self.stats['conflicts'] += 1
+                    kept_local.add(href)
+                else:
+                    self._copy(meeting, remote)
+                    if not self._room_is_free(meeting):
+                        self.stats['rejected'] += 1
+                        continue
+                    meeting.updated_at = now
+                    updated.append(meeting)
+            if remote.recurrence_pattern and href not in kept_local:
+                exceptions[id(meeting)] = (meeting, remote.exceptions)
+
+            if state is None:
+                state = CalDAVEvent(calendar=self.calendar, href=href)
+                new_states.append(state)
+            else:
+                changed_states.append(state)
+            state.meeting = meeting
+            state.uid = remote.uid
+            state.etag = etag
+
+        Meeting.objects.bulk_create(created, batch_size=500)
+        Meeting.objects.bulk_update(updated, SYNC_FIELDS + ['updated_at'], batch_size=500)
+
+        if exceptions:
+            series = [meeting for meeting, _items in exceptions.values()]
+            # A queryset delete: the signal handlers leave rebuilding to us
+            MeetingOccurrenceException.objects.filter(meeting__in=series).delete()
+            MeetingOccurrenceException.objects.bulk_create([
+                MeetingOccurrenceException(
+                    meeting=meeting,
+                    original_start=item.original_start,
+                    is_cancelled=item.is_cancelled,
+                    start_time=item.start_time,
+                    end_time=item.end_time,
+                )
+                for meeting, items in exceptions.values()
+                for item in {item.original_start: item for item in items}.values()
+            ], batch_size=500)
+
+        for state in new_states + changed_states:
+            state.local_updated_at = None if state.href in kept_local else state.meeting.updated_at
+        CalDAVEvent.objects.bulk_create(new_states, batch_size=500)
+        CalDAVEvent.objects.bulk_update(
+            changed_states, ['meeting', 'uid', 'etag', 'local_updated_at'], batch_size=500
+        )
+
+        for meeting in created + updated:
+            meeting.materialize_occurrences()
+        self.stats['created'] += len(created)
+        self.stats['updated'] += len(updated)
+
+    def apply_deletions(self, deleted):
+        """Cancel meetings deleted remotely, unless they changed locally since."""
+        cancelled = []
+        for state in deleted:
+            meeting = state.meeting
+            if meeting is None:
+                continue
+            if state.local_updated_at and meeting.updated_at > state.local_updated_at \
+                    and getattr(settings, 'CALDAV_CONFLICT_POLICY', 'newest') != 'server':
+                # Recreated remotely by the push
+                self.stats['conflicts'] += 1
+                continue
+            cancelled.append(meeting.pk)
+
+        Meeting.objects.filter(pk__in=cancelled).exclude(
+            status=MeetingStatus.CANCELLED
+        ).update(status=MeetingStatus.CANCELLED, updated_at=timezone.now())
+        CalDAVEvent.objects.filter(pk__in=[state.pk for state in deleted]).delete()
+        self.stats['deleted'] += len(cancelled)
+
+    # Push
+
+    def push(self):
+        """Write meetings changed after the local watermark, delete removed ones."""
+        queryset = self.calendar.local_meetings().select_related('room').prefetch_related('occurrence_exceptions')
+        if self.calendar.local_watermark:
+            queryset = queryset.filter(updated_at__gt=self.calendar.local_watermark)
+        meetings = list(queryset)
+
+        states = {}
+        for batch in _chunks([meeting.pk for meeting in meetings], 500):
+            states.update(
+                (state.meeting_id, state)
+                for state in self.calendar.events.filter(meeting_id__in=batch)
+            )
+
+        new_states, changed_states, new_uids = [], [], []
+        try:
+            for meeting in meetings:
+                state = states.get(meeting.pk)
+                if state and state.local_updated_at and meeting.updated_at <= state.local_updated_at:
+                    continue
+                if state is None and meeting.status in (MeetingStatus.DRAFT, MeetingStatus.CANCELLED):
+                    continue
+                if not meeting.caldav_uid:
+                    meeting.caldav_uid = ical.new_uid()
+                    new_uids.append(meeting)
+
+                href = state.href if state else self.client.resource_href(meeting.caldav_uid)
+                data = ical.meeting_to_ical(meeting, meeting.occurrence_exceptions.all())
+                try:
+                    etag = self.client.put(href, data, state.etag if state else None)
+                except PreconditionFailed:
+                    # Changed remotely in the meantime: the next pull resolves it
+                    self.stats['conflicts'] += 1
+                    continue
+                except CalDAVError as e:
+                    # Retried on the next run: run() keeps the watermark
+                    logger.warning('CalDAV PUT of meeting %s to %s failed: %s', meeting.pk, href, e)
+                    self.stats['failed'] += 1
+                    continue
+
+                if state is None:
+                    state = CalDAVEvent(calendar=self.calendar, meeting=meeting, href=href, uid=meeting.caldav_uid)
+                    new_states.append(state)
+                else:
+                    changed_states.append(state)
+                state.etag = etag
+                state.local_updated_at = meeting.updated_at
+        finally:
+            # Whatever was written remotely is recorded, even if the loop is cut short:
+            # otherwise the next pull could not match those events by UID and would duplicate them
+            with transaction.atomic():
+                Meeting.objects.bulk_update(new_uids, ['caldav_uid'], batch_size=500)
+                CalDAVEvent.objects.bulk_create(new_states)
+                CalDAVEvent.objects.bulk_update(changed_states, ['etag', 'local_updated_at'], batch_size=500)
+            self.stats['pushed'] += len(new_states) + len(changed_states)
+
+        removed = []
+        for state in self.calendar.events.filter(meeting__isnull=True):
+            try:
+                self.client.delete(state.href, state.etag)
+            except PreconditionFailed:
+                self.stats['conflicts'] += 1
+                continue
+            except CalDAVError as e:
+                logger.warning('CalDAV DELETE of %s failed: %s', state.href, e)
+                self.stats['failed'] += 1
+                continue
+            removed.append(state.pk)
+        CalDAVEvent.objects.filter(pk__in=removed).delete()
+        self.stats['removed'] += len(removed)
@@ -0,0 +1,47 @@
+"""Meeting list export definition."""
+from django.db.models import Count
+from django.utils.translation import gettext_lazy as _
+
+from exports.datasets import ExportDataset, full_name
+from .filters import filter_meetings
+from .models import Meeting, MeetingStatus
+
+STATUS_LABELS = dict(MeetingStatus.choices)
+
+
+def _queryset(params, user):
+    return filter_meetings(Meeting.objects.all(), params).annotate(
+        participant_count=Count('participants')
+    )
+
+
+def _row(values):
+    (title, start_time, end_time, room, organizer_last, organizer_first,
+     status, participant_count) = values
+    return [
+        title,
+        start_time,
+        end_time,
+        room,
+        full_name(organizer_last, organizer_first),
+        str(STATUS_LABELS.get(status, status)),
+        participant_count,
+    ]
+
+
+MEETINGS = ExportDataset(
+    name='meetings',
+    title=_('Встречи'),
+    headers=[
+        _('Название'), _('Начало'), _('Окончание'), _('Переговорная'),
+        _('Организатор'), _('Статус'), _('Участники'),
+    ],
+    fields=[
+        'title', 'start_time', 'end_time', 'room__name',
+        'organizer__last_name', 'organizer__first_name',
+        'status', 'participant_count',
+    ],
+    get_queryset=_queryset,
+    format_row=_row,
+    widths=[6, 2, 2, 3, 3, 2, 1],
+)
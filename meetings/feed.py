@@ -0,0 +1,86 @@
+"""
+Per-user iCalendar subscription feed.
+
+Calendar apps poll subscriptions every few minutes, so the common case is
+answered from one aggregate query: the ETag and Last-Modified validators
+are derived from the number, ids and latest ``updated_at`` of the user's
+meetings, and an unchanged feed is a 304.
+
+A changed feed is assembled from per-meeting VEVENT chunks cached by
+(meeting, updated_at), so only meetings edited since the last poll are
+rendered again. The assembled body is cached under its ETag, which changes
+whenever a relevant meeting does.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q, Sum
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+
+from . import ical
+from .models import Meeting, MeetingParticipant, MeetingStatus
+
+# Bump when the rendered output changes, to invalidate cached feeds
+FEED_VERSION = 1
+
+
+def _timeout():
+    return getattr(settings, 'MEETING_FEED_CACHE_TIMEOUT', 24 * 60 * 60)
+
+
+def feed_meetings(user):
+    """
+    Meetings in the user's feed: organized or attended (not declined), except drafts.
+
+    Meetings that ended more than MEETING_FEED_PAST_DAYS ago are left out
+    unless they are series still running after that date.
+    """
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'MEETING_FEED_PAST_DAYS', 90))
+    invited = MeetingParticipant.objects.filter(user=user).exclude(response='declined')
+    return Meeting.objects.filter(
+        Q(organizer=user) | Q(pk__in=invited.values('meeting_id')),
+        Q(end_time__gte=cutoff) | Q(
+            Q(recurrence_until__isnull=True) | Q(recurrence_until__gte=cutoff.date()),
+            is_recurring=True,
+        ),
+    ).exclude(status=MeetingStatus.DRAFT)
+
+
+def feed_validators(user):
+    """(etag, last_modified) of the user's feed, from a single aggregate query."""
+    state = feed_meetings(user).aggregate(count=Count('pk'), ids=Sum('pk'), last=Max('updated_at'))
+    last_modified = state['last'] or timezone.now().replace(year=2000, month=1, day=1)
+    key = f"{FEED_VERSION}:{user.pk}:{state['count']}:{state['ids']}:{last_modified.timestamp()}"
+    return f'"{hashlib.md5(key.encode()).hexdigest()}"', last_modified
+
+
+def _chunk_key(meeting):
+    return f"meetings:vevent:{FEED_VERSION}:{meeting.pk}:{meeting.updated_at.timestamp()}"
+
+
+def render_feed(user, etag):
+    """The feed body, reusing the cached body or cached per-meeting chunks."""
+    body_key = f"meetings:feed:{user.pk}:{etag}"
+    body = cache.get(body_key)
+    if body is not None:
+        return body
+
+    meetings = list(feed_meetings(user).select_related('room').order_by('start_time'))
+    chunks = cache.get_many([_chunk_key(meeting) for meeting in meetings])
+    missing = [meeting for meeting in meetings if _chunk_key(meeting) not in chunks]
+    if missing:
+        prefetch_related_objects(missing, 'occurrence_exceptions')
+        rendered = {
+            _chunk_key(meeting): ical.meeting_to_vevents(meeting, meeting.occurrence_exceptions.all())
+            for meeting in missing
+        }
+        cache.set_many(rendered, _timeout())
+        chunks.update(rendered)
+
+    header, footer = ical.calendar_envelope(user.get_full_name() or user.get_username())
+    body = b''.join([header, *(chunks[_chunk_key(meeting)] for meeting in meetings), footer])
+    cache.set(body_key, body, _timeout())
+    return body
@@ -0,0 +1,63 @@
+"""Query-string filters shared by the meeting list and exports."""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import MeetingOccurrence
+
+
+def period_q(date_filter, now=None):
+    """
+    Date filter as a Q over ``start_time``/``end_time`` of occurrences.
+
+    Recurring meetings are matched by their materialized occurrences, so
+    every period stays a plain range scan on the occurrence table. Days
+    are local (TIME_ZONE) days; "month" runs up to the first day of the
+    next month.
+    """
+    now = now or timezone.now()
+    today = datetime.combine(timezone.localdate(now), time(0), tzinfo=timezone.get_current_timezone())
+    if date_filter == 'today':
+        return Q(start_time__gte=today, start_time__lt=today + timedelta(days=1))
+    if date_filter == 'week':
+        return Q(start_time__gte=today, start_time__lt=today + timedelta(days=7))
+    if date_filter == 'month':
+        next_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+        return Q(start_time__gte=today, start_time__lt=next_month)
+    if date_filter == 'past':
+        return Q(end_time__lt=now)
+    # Default: upcoming meetings
+    return Q(start_time__gte=now)
+
+
+def _meeting_q(params, prefix=''):
+    """Status and search filters on Meeting fields, optionally via a relation."""
+    q = Q()
+
+    # Filter by status
+    status = params.get('status')
+    if status:
+        q &= Q(**{f'{prefix}status': status})
+
+    # Search
+    search_query = params.get('search', '')
+    if search_query:
+        q &= (
+            Q(**{f'{prefix}title__icontains': search_query}) |
+            Q(**{f'{prefix}description__icontains': search_query}) |
+            Q(**{f'{prefix}organizer__last_name__icontains': search_query})
+        )
+
+    return q
+
+
+def filter_occurrences(queryset, params):
+    """Apply the meeting list filters from ``params`` to a MeetingOccurrence queryset."""
+    return queryset.filter(period_q(params.get('date')), _meeting_q(params, prefix='meeting__'))
+
+
+def filter_meetings(queryset, params):
+    """Apply the meeting list filters from ``params`` (request.GET) to a Meeting queryset."""
+    occurrences = MeetingOccurrence.objects.filter(period_q(params.get('date')))
+    return queryset.filter(_meeting_q(params), pk__in=occurrences.values('meeting_id'))
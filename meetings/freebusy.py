@@ -0,0 +1,146 @@
+"""
+Free/busy lookup for scheduling meetings with several participants.
+
+Busy intervals of all requested users (and optionally a room) are loaded
+with one range query over the (start_time, end_time) index of the
+materialized occurrences, so recurring meetings count as well. Non-working
+hours are added as extra busy intervals, everything is merged with a
+sorted sweep in NumPy, and the gaps between merged blocks are the common
+free time.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import MeetingOccurrence
+
+BUSY_RESPONSES = ['accepted', 'tentative']
+SLOT_STEP = 15 * 60
+MAX_RANGE_DAYS = 31
+MAX_SLOTS = 50
+
+
+def load_busy(user_ids, start, end, room_id=None):
+    """
+    Busy intervals of ``user_ids`` (and ``room_id``) overlapping [start, end).
+
+    A user is busy during booked meetings they organize or have accepted
+    or tentatively accepted. Returns (starts, ends) arrays of Unix seconds.
+    """
+    who = Q(
+        meeting__participants__user_id__in=user_ids,
+        meeting__participants__response__in=BUSY_RESPONSES,
+    )
+    who |= Q(meeting__organizer_id__in=user_ids)
+    if room_id:
+        who |= Q(room_id=room_id)
+    rows = list(
+        MeetingOccurrence.overlapping(start, end).filter(who).order_by().values_list(
+            'pk', 'start_time', 'end_time'
+        ).distinct()
+    )
+    starts = np.fromiter((row[1].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+    ends = np.fromiter((row[2].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+    return starts, ends
+
+
+def off_hours(start, end):
+    """
+    Intervals outside working hours (and weekends) within [start, end).
+
+    Working hours are MEETING_WORKDAY_START..MEETING_WORKDAY_END in the
+    local time zone.
+    """
+    day_start = time(getattr(settings, 'MEETING_WORKDAY_START', 9))
+    day_end = time(getattr(settings, 'MEETING_WORKDAY_END', 18))
+    tz = timezone.get_current_timezone()
+
+    starts, ends = [], []
+    cursor = start
+    day = timezone.localtime(start).date()
+    while cursor < end:
+        if day.weekday() < 5:
+            work_start = datetime.combine(day, day_start, tzinfo=tz)
+            work_end = datetime.combine(day, day_end, tzinfo=tz)
+            if work_start > cursor:
+                starts.append(cursor.timestamp())
+                ends.append(work_start.timestamp())
+            cursor = max(cursor, work_end)
+        day += timedelta(days=1)
+        next_day = datetime.combine(day, time(0), tzinfo=tz)
+        if next_day > cursor:
+            starts.append(cursor.timestamp())
+            ends.append(min(next_day, end).timestamp())
+            cursor = next_day
+    return np.array(starts, dtype=np.float64), np.array(ends, dtype=np.float64)
+
+
+def merge_intervals(starts, ends):
+    """
+    Merge overlapping or touching intervals.
+
+    Intervals are sorted by start; a new block begins wherever a start lies
+    beyond the running maximum of all previous ends.
+    """
+    if not starts.size:
+        return starts, ends
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    new_block = np.r_[True, starts[1:] > reach[:-1]]
+    block_ends = np.r_[np.flatnonzero(new_block)[1:] - 1, starts.size - 1]
+    return starts[new_block], reach[block_ends]
+
+
+def free_gaps(busy_starts, busy_ends, start_ts, end_ts):
+    """Complement of merged busy intervals within [start_ts, end_ts)."""
+    busy_starts, busy_ends = merge_intervals(busy_starts, busy_ends)
+    gap_starts = np.r_[start_ts, busy_ends]
+    gap_ends = np.r_[busy_starts, end_ts]
+    gap_starts = np.maximum(gap_starts, start_ts)
+    gap_ends = np.minimum(gap_ends, end_ts)
+    keep = gap_ends > gap_starts
+    return gap_starts[keep], gap_ends[keep]
+
+
+def find_slots(gap_starts, gap_ends, duration, limit):
+    """
+    First ``limit`` slots of ``duration`` seconds, one per free gap.
+
+    Slots start on a SLOT_STEP boundary at the beginning of each gap.
+    """
+    aligned = np.ceil(gap_starts / SLOT_STEP) * SLOT_STEP
+    fits = aligned + duration <= gap_ends
+    return list(zip(aligned[fits][:limit], gap_ends[fits][:limit]))
+
+
+def _iso(timestamp):
+    return timezone.localtime(datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)).isoformat()
+
+
+def common_free_slots(user_ids, start, end, duration, room_id=None, limit=5, working_hours=True):
+    """
+    Earliest common free slots for ``user_ids`` between ``start`` and ``end``.
+
+    ``duration`` is a timedelta. With ``room_id`` the room must be free too.
+    """
+    start_ts, end_ts = start.timestamp(), end.timestamp()
+    busy_starts, busy_ends = load_busy(user_ids, start, end, room_id)
+    if working_hours:
+        closed_starts, closed_ends = off_hours(start, end)
+        busy_starts = np.r_[busy_starts, closed_starts]
+        busy_ends = np.r_[busy_ends, closed_ends]
+
+    gap_starts, gap_ends = free_gaps(busy_starts, busy_ends, start_ts, end_ts)
+    seconds = duration.total_seconds()
+    return [
+        {
+            'start': _iso(slot_start),
+            'end': _iso(slot_start + seconds),
+            'free_until': _iso(free_until),
+        }
+        for slot_start, free_until in find_slots(gap_starts, gap_ends, seconds, limit)
+    ]
@@ -0,0 +1,87 @@
+"""
+Calendar grid data: occurrences of a date range bucketed by local day.
+
+All occurrences overlapping the range are read with one range query over
+the occurrence index, as flat value rows. An occurrence is listed on every
+local (TIME_ZONE) day it overlaps, so a meeting running past midnight
+shows up on both days. The JSON shape is compact for week and month grids:
+meeting attributes are sent once, occurrences once, and days refer to
+occurrences by index.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import MeetingOccurrence, MeetingParticipant, MeetingStatus
+
+# A six-week month grid plus some slack
+MAX_RANGE_DAYS = 62
+
+
+def local_midnight(day):
+    return datetime.combine(day, time(0), tzinfo=timezone.get_current_timezone())
+
+
+def local_days(start, end):
+    """Local dates overlapped by [start, end)."""
+    day = timezone.localtime(start).date()
+    last = timezone.localtime(end - timedelta(microseconds=1)).date()
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+def calendar_data(start, end, room_id=None, user_ids=None, statuses=None):
+    """
+    Occurrences overlapping [start, end) as a compact, day-bucketed dict.
+
+    ``user_ids`` keeps meetings organized or attended by any of the users;
+    ``statuses`` defaults to every status but cancelled.
+    """
+    queryset = MeetingOccurrence.in_range(start, end, room_id)
+    if statuses:
+        queryset = queryset.filter(meeting__status__in=statuses)
+    else:
+        queryset = queryset.exclude(meeting__status=MeetingStatus.CANCELLED)
+    if user_ids:
+        invited = MeetingParticipant.objects.filter(user_id__in=user_ids).values('meeting_id')
+        queryset = queryset.filter(Q(meeting__organizer_id__in=user_ids) | Q(meeting_id__in=invited))
+
+    rows = queryset.order_by('start_time', 'end_time').values_list(
+        'meeting_id', 'start_time', 'end_time', 'is_exception',
+        'meeting__title', 'meeting__status', 'meeting__is_recurring',
+        'meeting__room_id', 'meeting__room__name',
+        'meeting__organizer__username', 'meeting__organizer__first_name', 'meeting__organizer__last_name',
+    )
+
+    meetings, rooms, occurrences = {}, {}, []
+    days = {day.isoformat(): [] for day in local_days(start, end)}
+    for (meeting_id, occ_start, occ_end, moved, title, status, recurring,
+         room, room_name, username, first_name, last_name) in rows:
+        if meeting_id not in meetings:
+            meetings[meeting_id] = {
+                'title': title,
+                'status': status,
+                'recurring': recurring,
+                'room': room,
+                'organizer': f"{first_name} {last_name}".strip() or username,
+            }
+        if room:
+            rooms[room] = room_name
+        index = len(occurrences)
+        occurrence = [meeting_id, timezone.localtime(occ_start).isoformat(), timezone.localtime(occ_end).isoformat()]
+        if moved:
+            occurrence.append(1)
+        occurrences.append(occurrence)
+        for day in local_days(max(occ_start, start), min(occ_end, end)):
+            days[day.isoformat()].append(index)
+
+    return {
+        'start': timezone.localtime(start).isoformat(),
+        'end': timezone.localtime(end).isoformat(),
+        'meetings': meetings,
+        'rooms': rooms,
+        'occurrences': occurrences,
+        'days': days,
+    }
@@ -0,0 +1,246 @@
+"""
+iCalendar (RFC 5545) conversion of meetings.
+
+Used by CalDAV synchronization in both directions. Recurring meetings are
+written as an RRULE with EXDATEs for cancelled occurrences and separate
+RECURRENCE-ID components for moved ones; only the simple rules the portal
+itself supports (daily/weekly/monthly, optionally with UNTIL or COUNT) are
+read back as series.
+"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.utils import timezone
+from icalendar import Calendar, Event
+
+from . import recurrence
+
+PRODID = '-//Corporate Portal//Meetings//RU'
+FREQUENCIES = {'daily': 'DAILY', 'weekly': 'WEEKLY', 'monthly': 'MONTHLY'}
+PATTERNS = {freq: pattern for pattern, freq in FREQUENCIES.items()}
+
+
+def _host():
+    return urlparse(getattr(settings, 'SITE_URL', '')).hostname or 'corp-portal'
+
+
+def new_uid():
+    """A globally unique UID for a meeting created in the portal."""
+    return f"{uuid.uuid4()}@{_host()}"
+
+
+def meeting_uid(meeting):
+    """UID of a meeting: its CalDAV UID, or a stable one derived from the pk."""
+    return meeting.caldav_uid or f"meeting-{meeting.pk}@{_host()}"
+
+
+def _event_status(meeting):
+    from .models import MeetingStatus
+
+    if meeting.status == MeetingStatus.CANCELLED:
+        return 'CANCELLED'
+    if meeting.status == MeetingStatus.DRAFT:
+        return 'TENTATIVE'
+    return 'CONFIRMED'
+
+
+def _base_event(meeting, uid):
+    event = Event()
+    event.add('uid', uid)
+    event.add('dtstamp', timezone.now())
+    event.add('summary', meeting.title)
+    if meeting.description:
+        event.add('description', meeting.description)
+    if meeting.room_id:
+        event.add('location', meeting.room.name)
+    if meeting.meeting_link:
+        event.add('url', meeting.meeting_link)
+    event.add('status', _event_status(meeting))
+    if meeting.updated_at:
+        event.add('last-modified', meeting.updated_at)
+    return event
+
+
+def meeting_events(meeting, exceptions=()):
+    """VEVENT components of a meeting: the master event plus moved occurrences."""
+    uid = meeting_uid(meeting)
+    master = _base_event(meeting, uid)
+    master.add('dtstart', meeting.start_time)
+    master.add('dtend', meeting.end_time)
+    events = [master]
+    if not recurrence.is_series(meeting):
+        return events
+
+    rule = {'freq': FREQUENCIES[meeting.recurrence_pattern]}
+    if meeting.recurrence_until:
+        rule['until'] = datetime.combine(
+            meeting.recurrence_until, time.max, tzinfo=timezone.get_current_timezone()
+        ).replace(microsecond=0)
+    master.add('rrule', rule)
+
+    cancelled = [exception.original_start for exception in exceptions if exception.is_cancelled]
+    if cancelled:
+        master.add('exdate', cancelled)
+
+    duration = meeting.end_time - meeting.start_time
+    for exception in exceptions:
+        if exception.is_cancelled:
+            continue
+        moved = _base_event(meeting, uid)
+        moved.add('recurrence-id', exception.original_start)
+        start = exception.start_time or exception.original_start
+        moved.add('dtstart', start)
+        moved.add('dtend', exception.end_time or start + duration)
+        events.append(moved)
+    return events
+
+
+def _calendar(name=None):
+    cal = Calendar()
+    cal.add('prodid', PRODID)
+    cal.add('version', '2.0')
+    if name:
+        cal.add('x-wr-calname', name)
+    return cal
+
+
+def meeting_to_ical(meeting, exceptions=()):
+    """Serialize one meeting as a calendar object resource (bytes)."""
+    cal = _calendar()
+    for event in meeting_events(meeting, exceptions):
+        cal.add_component(event)
+    return cal.to_ical()
+
+
+def meeting_to_vevents(meeting, exceptions=()):
+    """The VEVENT components of a meeting as bytes, for assembling feeds."""
+    return b''.join(event.to_ical() for event in meeting_events(meeting, exceptions))
+
+
+def calendar_envelope(name):
+    """Opening and closing lines of a VCALENDAR wrapped around VEVENT chunks."""
+    body = _calendar(name).to_ical()
+    footer = b'END:VCALENDAR\r\n'
+    return body[:-len(footer)], footer
+
+
+@dataclass
+class RemoteException:
+    original_start: datetime
+    is_cancelled: bool = False
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+
+@dataclass
+class RemoteEvent:
+    uid: str
+    title: str
+    description: str
+    start_time: datetime
+    end_time: datetime
+    cancelled: bool
+    recurrence_pattern: str = ''
+    recurrence_until: Optional[date] = None
+    last_modified: Optional[datetime] = None
+    exceptions: List[RemoteException] = field(default_factory=list)
+
+
+def _aware(value):
+    """DATE values start at local midnight; floating times are local time."""
+    if isinstance(value, datetime):
+        return timezone.make_aware(value) if timezone.is_naive(value) else value
+    return datetime.combine(value, time(0), tzinfo=timezone.get_current_timezone())
+
+
+def _times(component):
+    start = _aware(component.decoded('dtstart'))
+    if component.get('dtend') is not None:
+        end = _aware(component.decoded('dtend'))
+    elif component.get('duration') is not None:
+        end = start + component.decoded('duration')
+    elif not isinstance(component.decoded('dtstart'), datetime):
+        end = start + timedelta(days=1)
+    else:
+        end = start + timedelta(hours=1)
+    return start, end
+
+
+def _rule(component, start):
+    """Map an RRULE onto (pattern, until); unsupported rules yield ('', None)."""
+    rule = component.get('rrule')
+    if rule is None:
+        return '', None
+    pattern = PATTERNS.get((rule.get('FREQ') or [''])[0])
+    supported = {'FREQ', 'UNTIL', 'COUNT', 'INTERVAL', 'WKST'}
+    if not pattern or set(rule) - supported or (rule.get('INTERVAL') or [1])[0] != 1:
+        return '', None
+    if rule.get('UNTIL'):
+        return pattern, timezone.localtime(_aware(rule['UNTIL'][0])).date()
+    if rule.get('COUNT'):
+        series = SimpleNamespace(
+            start_time=start, is_recurring=True, recurrence_pattern=pattern, recurrence_until=None
+        )
+        for index, occurrence in enumerate(recurrence.iter_starts(series)):
+            if index + 1 == rule['COUNT'][0]:
+                return pattern, timezone.localtime(occurrence).date()
+    return pattern, None
+
+
+def _exdates(component):
+    values = component.get('exdate')
+    if values is None:
+        return []
+    if not isinstance(values, list):
+        values = [values]
+    return [_aware(item.dt) for value in values for item in value.dts]
+
+
+def parse_ical(data):
+    """
+    Parse a calendar object resource into a RemoteEvent.
+
+    Returns None if the resource contains no VEVENT.
+    """
+    cal = Calendar.from_ical(data)
+    master, overrides = None, []
+    for component in cal.walk('VEVENT'):
+        if component.get('recurrence-id') is None:
+            master = master or component
+        else:
+            overrides.append(component)
+    if master is None:
+        return None
+
+    start, end = _times(master)
+    pattern, until = _rule(master, start)
+    last_modified = master.get('last-modified')
+    event = RemoteEvent(
+        uid=str(master.get('uid', '')),
+        title=str(master.get('summary', '')),
+        description=str(master.get('description', '')),
+        start_time=start,
+        end_time=end,
+        cancelled=str(master.get('status', '')).upper() == 'CANCELLED',
+        recurrence_pattern=pattern,
+        recurrence_until=until,
+        last_modified=_aware(last_modified.dt) if last_modified is not None else None,
+    )
+    if pattern:
+        event.exceptions = [
+            RemoteException(original_start, is_cancelled=True) for original_start in _exdates(master)
+        ]
+        for override in overrides:
+            moved_start, moved_end = _times(override)
+            event.exceptions.append(RemoteException(
+                original_start=_aware(override.decoded('recurrence-id')),
+                is_cancelled=str(override.get('status', '')).upper() == 'CANCELLED',
+                start_time=moved_start,
+                end_time=moved_end,
+            ))
+    return event
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from meetings.models import BOOKING_STATUSES, Meeting, MeetingStatus
+
+# Fields of the first schema: the command runs before the meetings migrations
+FIELDS = ('title', 'room_id', 'start_time', 'end_time', 'created_at')
+
+
+class Command(BaseCommand):
+    help = (
+        'Отменяет пересекающиеся бронирования переговорных: из двух встреч отменяется '
+        'забронированная позже (запускать перед миграцией meetings 0002)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, что будет отменено')
+
+    def handle(self, *args, **options):
+        booked = Meeting.objects.filter(room__isnull=False, status__in=BOOKING_STATUSES)
+        conflicting = booked.filter(Exists(booked.filter(
+            room=OuterRef('room'), start_time__lt=OuterRef('end_time'), end_time__gt=OuterRef('start_time'),
+        ).exclude(pk=OuterRef('pk'))))
+
+        kept, cancelled = {}, []
+        for meeting in conflicting.only(*FIELDS).order_by('created_at', 'pk'):
+            room_bookings = kept.setdefault(meeting.room_id, [])
+            if any(start < meeting.end_time and meeting.start_time < end for start, end in room_bookings):
+                cancelled.append(meeting)
+            else:
+                room_bookings.append((meeting.start_time, meeting.end_time))
+
+        for meeting in cancelled:
+            self.stdout.write(
+                f'#{meeting.pk} «{meeting.title}»: переговорная {meeting.room_id}, '
+                f'{timezone.localtime(meeting.start_time):%d.%m.%Y %H:%M} – '
+                f'{timezone.localtime(meeting.end_time):%H:%M}'
+            )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Будет отменено встреч: {len(cancelled)}'))
+            return
+        Meeting.objects.filter(pk__in=[meeting.pk for meeting in cancelled]).update(status=MeetingStatus.CANCELLED)
+        self.stdout.write(self.style.SUCCESS(f'Отменено встреч: {len(cancelled)}'))
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from meetings import utilization
+
+
+class Command(BaseCommand):
+    help = 'Рассчитывает загрузку переговорных за прошедший период (запускать еженощно)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'MEETING_UTILIZATION_DAYS', 28),
+            help='Длина периода в днях, заканчивающегося вчерашним днём',
+        )
+
+    def handle(self, *args, **options):
+        results = utilization.compute(max(1, options['days']))
+        utilization.store(results)
+        self.stdout.write(self.style.SUCCESS(f'Рассчитана загрузка переговорных: {len(results)}'))
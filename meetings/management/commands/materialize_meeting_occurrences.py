@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from meetings.models import Meeting
+
+
+class Command(BaseCommand):
+    help = 'Продлевает окно материализованных повторений встреч (запускать ежедневно)'
+
+    def handle(self, *args, **options):
+        series = Meeting.objects.filter(
+            is_recurring=True,
+            recurrence_pattern__in=['daily', 'weekly', 'monthly'],
+        ).filter(
+            Q(recurrence_until__isnull=True) | Q(recurrence_until__gte=timezone.localdate())
+        )
+        count = 0
+        for meeting in series.iterator(chunk_size=500):
+            meeting.materialize_occurrences()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Обновлено повторяющихся встреч: {count}'))
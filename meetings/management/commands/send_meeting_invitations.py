@@ -0,0 +1,97 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from meetings.models import InvitationStatus, MeetingInvitationBatch, MeetingParticipant, MeetingStatus
+
+# Batches of a worker that died while sending go back to the queue after this long
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+class Command(BaseCommand):
+    help = 'Рассылает приглашения новым участникам встреч (одно сообщение на встречу)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, опрашивая очередь')
+        parser.add_argument('--interval', type=int, default=10, help='Интервал опроса очереди в секундах')
+
+    def handle(self, *args, **options):
+        while True:
+            self.requeue_stale()
+            batch_ids = [
+                batch_id for batch_id in MeetingInvitationBatch.objects.filter(
+                    status=InvitationStatus.PENDING
+                ).order_by('created_at').values_list('pk', flat=True)[:500]
+                if self.claim(batch_id)
+            ]
+            if batch_ids:
+                sent = self.send(batch_ids)
+                self.stdout.write(self.style.SUCCESS(f'Отправлено приглашений: {sent}'))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def requeue_stale(self):
+        """Return batches stuck in SENDING (their worker died) to the queue."""
+        requeued = MeetingInvitationBatch.objects.filter(
+            status=InvitationStatus.SENDING, claimed_at__lt=timezone.now() - CLAIM_TIMEOUT
+        ).update(status=InvitationStatus.PENDING, claimed_at=None)
+        if requeued:
+            self.stderr.write(self.style.WARNING(f'Возвращено в очередь зависших рассылок: {requeued}'))
+
+    def claim(self, batch_id):
+        """Take a pending batch; the conditional UPDATE keeps concurrent workers apart."""
+        return MeetingInvitationBatch.objects.filter(
+            pk=batch_id, status=InvitationStatus.PENDING
+        ).update(status=InvitationStatus.SENDING, claimed_at=timezone.now()) == 1
+
+    def send(self, batch_ids):
+        """Send claimed batches, merging all batches of one meeting into one message."""
+        from mattermost_integration.models import get_mattermost_client
+
+        batches = defaultdict(list)
+        for batch in MeetingInvitationBatch.objects.filter(pk__in=batch_ids).select_related(
+            'meeting__organizer', 'meeting__room'
+        ):
+            batches[batch.meeting_id].append(batch)
+
+        # Only users still invited; one query for all meetings
+        invited = defaultdict(list)
+        for participant in MeetingParticipant.objects.filter(
+            meeting_id__in=batches,
+            user_id__in={user_id for group in batches.values() for batch in group for user_id in batch.user_ids},
+        ).select_related('user').order_by('user__last_name', 'user__first_name'):
+            invited[participant.meeting_id].append(participant)
+
+        client = get_mattermost_client()
+        sent, failed, invitations = [], defaultdict(list), 0
+        for meeting_id, group in batches.items():
+            meeting = group[0].meeting
+            user_ids = {user_id for batch in group for user_id in batch.user_ids}
+            users = [p.user for p in invited[meeting_id] if p.user_id in user_ids]
+            try:
+                delivered = meeting.status == MeetingStatus.CANCELLED or not users \
+                    or client.send_meeting_invitation(meeting, users)
+                error = '' if delivered else 'Mattermost не принял сообщение'
+            except Exception as e:
+                # One broken meeting must not leave the other claimed batches in SENDING
+                error = f'{type(e).__name__}: {e}'
+            if not error:
+                sent.extend(batch.pk for batch in group)
+                invitations += len(users) if meeting.status != MeetingStatus.CANCELLED else 0
+            else:
+                failed[error].extend(batch.pk for batch in group)
+                self.stderr.write(self.style.ERROR(
+                    f'Не удалось отправить приглашения на встречу #{meeting_id}: {error}'
+                ))
+
+        now = timezone.now()
+        MeetingInvitationBatch.objects.filter(pk__in=sent).update(status=InvitationStatus.SENT, sent_at=now)
+        for error, batch_ids in failed.items():
+            MeetingInvitationBatch.objects.filter(pk__in=batch_ids).update(
+                status=InvitationStatus.FAILED, error=error
+            )
+        return invitations
@@ -0,0 +1,48 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from meetings.reminders import TimingWheel, deliver, load_reminders
+
+
+class Command(BaseCommand):
+    help = 'Отправляет напоминания о встречах в Mattermost (MEETING_REMINDER_OFFSETS до начала)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно')
+        parser.add_argument('--tick', type=int, default=5, help='Шаг колеса таймеров в секундах')
+        parser.add_argument(
+            '--reload',
+            type=int,
+            default=getattr(settings, 'MEETING_REMINDER_RELOAD', 60),
+            help='Интервал перечитывания предстоящих встреч в секундах',
+        )
+
+    def handle(self, *args, **options):
+        reload_interval = timedelta(seconds=options['reload'])
+        if not options['loop']:
+            # One pass (e.g. from cron): send everything due now
+            now = timezone.now()
+            due = [reminder for reminder in load_reminders(now, reload_interval) if reminder.fire_at <= now]
+            self.report(deliver(due, reload_interval))
+            return
+
+        wheel = TimingWheel(tick=timedelta(seconds=options['tick']))
+        next_reload = timezone.now()
+        while True:
+            now = timezone.now()
+            if now >= next_reload:
+                # Rebuilt from scratch, so rescheduled or cancelled meetings are picked up
+                wheel.clear(now)
+                for reminder in load_reminders(now, reload_interval):
+                    wheel.add(reminder.fire_at, reminder)
+                next_reload = now + reload_interval
+            self.report(deliver(wheel.advance(now), reload_interval))
+            time.sleep(options['tick'])
+
+    def report(self, sent):
+        if sent:
+            self.stdout.write(self.style.SUCCESS(f'Отправлено напоминаний: {sent}'))
@@ -0,0 +1,70 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from meetings.caldav_sync import CalDAVError, CalendarSync
+from meetings.models import CalDAVCalendar
+
+logger = logging.getLogger(__name__)
+
+# A crashed worker's lock expires after this long
+LOCK_TIMEOUT = timedelta(minutes=30)
+
+
+class Command(BaseCommand):
+    help = 'Синхронизирует встречи с календарями CalDAV (инкрементально, по sync-token и ETag)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно')
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=getattr(settings, 'CALDAV_SYNC_INTERVAL', 300),
+            help='Интервал между проходами в секундах',
+        )
+        parser.add_argument('--calendar', type=int, help='Синхронизировать только календарь с этим ID')
+        parser.add_argument('--full', action='store_true', help='Полная пересинхронизация без sync-token')
+
+    def handle(self, *args, **options):
+        while True:
+            calendars = CalDAVCalendar.objects.filter(is_active=True)
+            if options['calendar']:
+                calendars = calendars.filter(pk=options['calendar'])
+            for calendar_id in calendars.values_list('pk', flat=True):
+                if self.claim(calendar_id):
+                    try:
+                        self.sync(CalDAVCalendar.objects.get(pk=calendar_id), options['full'])
+                    finally:
+                        CalDAVCalendar.objects.filter(pk=calendar_id).update(locked_until=None)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def claim(self, calendar_id):
+        """Lock a calendar; the conditional UPDATE keeps concurrent workers apart."""
+        now = timezone.now()
+        return CalDAVCalendar.objects.filter(
+            Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+            pk=calendar_id,
+        ).update(locked_until=now + LOCK_TIMEOUT) == 1
+
+    def sync(self, calendar, full):
+        try:
+            stats = CalendarSync(calendar).run(full=full)
+        except CalDAVError as e:
+            CalDAVCalendar.objects.filter(pk=calendar.pk).update(last_error=str(e))
+            self.stderr.write(self.style.ERROR(f'Календарь «{calendar}»: {e}'))
+            return
+        except Exception as e:
+            # Malformed XML, network or database errors: the other calendars still sync
+            logger.exception('CalDAV sync of calendar %s failed', calendar.pk)
+            CalDAVCalendar.objects.filter(pk=calendar.pk).update(last_error=f'{type(e).__name__}: {e}')
+            self.stderr.write(self.style.ERROR(f'Календарь «{calendar}»: {type(e).__name__}: {e}'))
+            return
+        summary = ', '.join(f'{key}: {value}' for key, value in sorted(stats.items())) or 'без изменений'
+        self.stdout.write(self.style.SUCCESS(f'Календарь «{calendar}»: {summary}'))
@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from meetings.transitions import run
+
+
+class Command(BaseCommand):
+    help = 'Переводит встречи в статусы «Идет» и «Завершена» по времени начала и окончания'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно')
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=getattr(settings, 'MEETING_STATUS_INTERVAL', 60),
+            help='Интервал между проходами в секундах',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            for (old, new), count in run().items():
+                self.stdout.write(self.style.SUCCESS(f'{old} -> {new}: {count}'))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
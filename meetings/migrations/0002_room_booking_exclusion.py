@@ -0,0 +1,70 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:07
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+BOOKED = ('scheduled', 'in_progress', 'completed')
+
+CONSTRAINT_NAME = 'meetings_meeting_room_no_overlap'
+
+# Booked meetings of one room must not overlap. The GiST index behind the
+# constraint also serves overlap lookups in O(log n).
+CREATE_CONSTRAINT = f"""
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+ALTER TABLE meetings_meeting ADD CONSTRAINT {CONSTRAINT_NAME}
+    EXCLUDE USING gist (
+        room_id WITH =,
+        tstzrange(start_time, end_time, '[)') WITH &&
+    )
+    WHERE (room_id IS NOT NULL AND status IN ('scheduled', 'in_progress', 'completed'));
+"""
+
+DROP_CONSTRAINT = f"ALTER TABLE meetings_meeting DROP CONSTRAINT IF EXISTS {CONSTRAINT_NAME};"
+
+
+def double_bookings(Meeting):
+    """Booked meetings overlapping another booking of the same room."""
+    booked = Meeting.objects.filter(room__isnull=False, status__in=BOOKED)
+    return booked.filter(Exists(booked.filter(
+        room=OuterRef('room'), start_time__lt=OuterRef('end_time'), end_time__gt=OuterRef('start_time'),
+    ).exclude(pk=OuterRef('pk'))))
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    # SQLite has no exclusion constraints; Meeting.clean() checks overlaps there
+    if schema_editor.connection.vendor == 'postgresql':
+        # ADD CONSTRAINT fails on existing overlaps: list them and leave the decision to the operator
+        conflicts = list(double_bookings(apps.get_model('meetings', 'Meeting')).order_by(
+            'room_id', 'start_time'
+        ).values_list('pk', 'title', 'room_id', 'start_time', 'end_time')[:50])
+        if conflicts:
+            raise RuntimeError(
+                'Переговорные забронированы дважды, ограничение не может быть добавлено:\n'
+                + '\n'.join(
+                    f'  #{pk} «{title}»: переговорная {room_id}, {start} – {end}'
+                    for pk, title, room_id, start, end in conflicts
+                )
+                + '\nОтмените лишние бронирования или выполните '
+                'python manage.py cancel_double_bookings и повторите миграцию.'
+            )
+        schema_editor.execute(CREATE_CONSTRAINT)
+
+
+def remove_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['room', 'start_time'], name='meetings_me_room_id_3e53f1_idx'),
+        ),
+        migrations.RunPython(add_exclusion_constraint, remove_exclusion_constraint),
+    ]
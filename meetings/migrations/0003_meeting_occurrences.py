@@ -0,0 +1,84 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def materialize_existing(apps, schema_editor):
+    """Create occurrence rows for existing meetings, series from 90 days back."""
+    from meetings import recurrence
+
+    Meeting = apps.get_model('meetings', 'Meeting')
+    MeetingOccurrence = apps.get_model('meetings', 'MeetingOccurrence')
+    history_start = recurrence.window_start() - recurrence.horizon()
+
+    batch = []
+    for meeting in Meeting.objects.order_by('pk').iterator(chunk_size=1000):
+        since, until = recurrence.series_window(meeting, since=history_start)
+        batch.extend(
+            MeetingOccurrence(
+                meeting_id=meeting.pk,
+                room_id=meeting.room_id,
+                original_start=occurrence.original_start,
+                start_time=occurrence.start_time,
+                end_time=occurrence.end_time,
+            )
+            for occurrence in recurrence.expand(meeting, since, until)
+        )
+        if len(batch) >= 1000:
+            MeetingOccurrence.objects.bulk_create(batch)
+            batch = []
+    MeetingOccurrence.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0002_room_booking_exclusion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meeting',
+            name='recurrence_until',
+            field=models.DateField(blank=True, help_text='Последний день повторения; пусто — без окончания', null=True, verbose_name='Повторять до'),
+        ),
+        migrations.CreateModel(
+            name='MeetingOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_start', models.DateTimeField(verbose_name='Начало по расписанию')),
+                ('start_time', models.DateTimeField(verbose_name='Начало')),
+                ('end_time', models.DateTimeField(verbose_name='Окончание')),
+                ('is_exception', models.BooleanField(default=False, verbose_name='Перенесена')),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='meetings.meeting', verbose_name='Встреча')),
+                ('room', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='meetings.meetingroom', verbose_name='Переговорная')),
+            ],
+            options={
+                'verbose_name': 'Повторение встречи',
+                'verbose_name_plural': 'Повторения встреч',
+                'ordering': ['-start_time'],
+                'indexes': [models.Index(fields=['start_time', 'end_time'], name='meetings_me_start_t_db95b9_idx'), models.Index(fields=['room', 'start_time'], name='meetings_me_room_id_c93ae7_idx')],
+                'unique_together': {('meeting', 'original_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='MeetingOccurrenceException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_start', models.DateTimeField(verbose_name='Начало по расписанию')),
+                ('is_cancelled', models.BooleanField(default=False, verbose_name='Отменена')),
+                ('start_time', models.DateTimeField(blank=True, null=True, verbose_name='Новое начало')),
+                ('end_time', models.DateTimeField(blank=True, null=True, verbose_name='Новое окончание')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrence_exceptions', to='meetings.meeting', verbose_name='Встреча')),
+            ],
+            options={
+                'verbose_name': 'Исключение из повторения',
+                'verbose_name_plural': 'Исключения из повторения',
+                'ordering': ['original_start'],
+                'unique_together': {('meeting', 'original_start')},
+            },
+        ),
+        migrations.RunPython(materialize_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0003_meeting_occurrences'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalDAVCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Название')),
+                ('url', models.URLField(help_text='URL коллекции календаря', max_length=500, verbose_name='URL')),
+                ('username', models.CharField(blank=True, max_length=150, verbose_name='Пользователь')),
+                ('password', models.CharField(blank=True, max_length=255, verbose_name='Пароль')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активен')),
+                ('sync_token', models.CharField(blank=True, editable=False, max_length=500, verbose_name='Sync-token')),
+                ('local_watermark', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Локальная отметка')),
+                ('last_synced_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Последняя синхронизация')),
+                ('last_error', models.TextField(blank=True, editable=False, verbose_name='Последняя ошибка')),
+                ('locked_until', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Заблокирован до')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='caldav_calendars', to=settings.AUTH_USER_MODEL, verbose_name='Владелец')),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='caldav_calendars', to='meetings.meetingroom', verbose_name='Переговорная')),
+            ],
+            options={
+                'verbose_name': 'Календарь CalDAV',
+                'verbose_name_plural': 'Календари CalDAV',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CalDAVEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('href', models.CharField(max_length=500, verbose_name='Href')),
+                ('uid', models.CharField(max_length=500, verbose_name='UID')),
+                ('etag', models.CharField(blank=True, max_length=200, verbose_name='ETag')),
+                ('local_updated_at', models.DateTimeField(blank=True, help_text='Meeting.updated_at на момент последней синхронизации', null=True, verbose_name='Версия встречи')),
+                ('calendar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='meetings.caldavcalendar', verbose_name='Календарь')),
+                ('meeting', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='caldav_events', to='meetings.meeting', verbose_name='Встреча')),
+            ],
+            options={
+                'verbose_name': 'Событие CalDAV',
+                'verbose_name_plural': 'События CalDAV',
+                'indexes': [models.Index(fields=['calendar', 'meeting'], name='meetings_ca_calenda_900a06_idx')],
+                'unique_together': {('calendar', 'href')},
+            },
+        ),
+    ]
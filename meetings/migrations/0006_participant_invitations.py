@@ -0,0 +1,49 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0005_calendar_feed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetingInvitationBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_ids', models.JSONField(default=list, verbose_name='Приглашённые')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('sending', 'Отправляется'), ('sent', 'Отправлено'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата отправки')),
+            ],
+            options={
+                'verbose_name': 'Рассылка приглашений',
+                'verbose_name_plural': 'Рассылки приглашений',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='meetingparticipant',
+            unique_together={('meeting', 'user')},
+        ),
+        migrations.AddConstraint(
+            model_name='meetingparticipant',
+            constraint=models.UniqueConstraint(condition=models.Q(('email', ''), _negated=True), fields=('meeting', 'email'), name='meetings_participant_unique_email'),
+        ),
+        migrations.AddField(
+            model_name='meetinginvitationbatch',
+            name='meeting',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invitation_batches', to='meetings.meeting', verbose_name='Встреча'),
+        ),
+        migrations.AddIndex(
+            model_name='meetinginvitationbatch',
+            index=models.Index(fields=['status', 'created_at'], name='meetings_me_status_f6561b_idx'),
+        ),
+    ]
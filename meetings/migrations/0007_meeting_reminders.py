@@ -0,0 +1,31 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0006_participant_invitations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetingReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_start', models.DateTimeField(verbose_name='Начало по расписанию')),
+                ('offset_minutes', models.PositiveIntegerField(verbose_name='За сколько минут')),
+                ('sent_at', models.DateTimeField(blank=True, help_text='Пусто — отправка не завершилась', null=True, verbose_name='Отправлено')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='meetings.meeting', verbose_name='Встреча')),
+            ],
+            options={
+                'verbose_name': 'Напоминание о встрече',
+                'verbose_name_plural': 'Напоминания о встречах',
+                'ordering': ['-original_start'],
+                'unique_together': {('meeting', 'original_start', 'offset_minutes')},
+            },
+        ),
+    ]
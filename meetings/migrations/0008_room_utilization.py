@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0007_meeting_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomUtilization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField(verbose_name='Начало периода')),
+                ('period_end', models.DateField(verbose_name='Конец периода')),
+                ('meetings', models.PositiveIntegerField(default=0, verbose_name='Встреч')),
+                ('booked_hours', models.FloatField(default=0, verbose_name='Забронировано, ч')),
+                ('utilization', models.FloatField(default=0, verbose_name='Загрузка в рабочее время')),
+                ('heatmap', models.JSONField(default=list, verbose_name='Загрузка по дням недели и часам')),
+                ('no_show_ratio', models.FloatField(blank=True, null=True, verbose_name='Доля неявок')),
+                ('avg_attendance', models.FloatField(blank=True, null=True, verbose_name='Средняя посещаемость')),
+                ('fill_ratio', models.FloatField(blank=True, help_text='Средняя посещаемость относительно вместимости', null=True, verbose_name='Заполненность')),
+                ('computed_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата расчёта')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='utilization', to='meetings.meetingroom', verbose_name='Переговорная')),
+            ],
+            options={
+                'verbose_name': 'Загрузка переговорной',
+                'verbose_name_plural': 'Загрузка переговорных',
+                'ordering': ['-period_end', 'room'],
+                'unique_together': {('room', 'period_end')},
+            },
+        ),
+    ]
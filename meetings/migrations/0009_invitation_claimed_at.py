@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0008_room_utilization'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetinginvitationbatch',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взята в отправку'),
+        ),
+    ]
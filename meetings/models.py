@@ -2,12 +2,20 @@
 Meetings app models - Meeting scheduling and management with CalDAV integration.
 Optimized with proper indexing, relationships, and modern Django features.
 """
-from django.db import models
+import secrets
+from bisect import bisect_left
+
+from django.db import models, transaction
+from django.db.models import Q
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
+from django.core.exceptions import ValidationError
 from django.core.validators import EmailValidator, MinLengthValidator
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
+
+from . import recurrence
 
 
 class MeetingStatus(models.TextChoices):
@@ -19,6 +27,15 @@ class MeetingStatus(models.TextChoices):
     CANCELLED = 'cancelled', _('Отменена')
 
 
+# Statuses in which a meeting occupies its room
+BOOKING_STATUSES = [MeetingStatus.SCHEDULED, MeetingStatus.IN_PROGRESS, MeetingStatus.COMPLETED]
+
+
+def max_meeting_duration():
+    """Longest allowed meeting; bounds the range scanned by overlap checks."""
+    return timedelta(hours=getattr(settings, 'MEETING_MAX_DURATION_HOURS', 24))
+
+
 class MeetingRoom(models.Model):
     """Meeting room/Location model."""
     
@@ -104,6 +121,12 @@ class Meeting(models.Model):
         ],
         verbose_name=_('Паттерн повторения')
     )
+    recurrence_until = models.DateField(
+        null=True,
+        blank=True,
+        help_text=_('Последний день повторения; пусто — без окончания'),
+        verbose_name=_('Повторять до')
+    )
     
     meeting_link = models.URLField(
         blank=True,
@@ -129,16 +152,97 @@ class Meeting(models.Model):
             models.Index(fields=['status', 'start_time']),
             models.Index(fields=['organizer', '-start_time']),
             models.Index(fields=['start_time', 'end_time']),
+            models.Index(fields=['room', 'start_time']),
         ]
+        # PostgreSQL additionally enforces EXCLUDE USING gist (room_id WITH =,
+        # tstzrange(start_time, end_time) WITH &&), see migration 0002.
     
     def __str__(self):
         return f"{self.title} ({self.start_time})"
     
+    def find_room_conflicts(self):
+        """
+        Booked occurrences of other meetings clashing with this meeting's room.
+
+        The meeting is expanded over the materialization window (a single
+        meeting has one occurrence), the room's occurrences in that span
+        are loaded with one range query, and overlaps are found by bisecting
+        the sorted candidates.
+        """
+        if not (self.room_id and self.start_time and self.end_time):
+            return []
+        if self.status not in BOOKING_STATUSES:
+            return []
+        
+        since, until = recurrence.series_window(self)
+        exceptions = list(self.occurrence_exceptions.all()) if self.pk else []
+        occurrences = list(recurrence.expand(self, since, until, exceptions))
+        if not occurrences:
+            return []
+        
+        candidates = list(MeetingOccurrence.overlapping(
+            min(o.start_time for o in occurrences),
+            max(o.end_time for o in occurrences),
+            room_id=self.room_id,
+        ).exclude(meeting_id=self.pk).select_related('meeting').order_by('start_time'))
+        starts = [candidate.start_time for candidate in candidates]
+        
+        conflicts = {}
+        for occurrence in occurrences:
+            low = bisect_left(starts, occurrence.start_time - max_meeting_duration())
+            high = bisect_left(starts, occurrence.end_time)
+            for candidate in candidates[low:high]:
+                if candidate.end_time > occurrence.start_time:
+                    conflicts[candidate.pk] = candidate
+        return sorted(conflicts.values(), key=lambda candidate: candidate.start_time)
+    
+    def materialize_occurrences(self, since=None):
+        """
+        Rebuild the occurrence rows of this meeting from ``since`` on.
+
+        Rows before the window (past occurrences of a series) are kept as
+        history; see recurrence.series_window() for the window itself.
+        """
+        since, until = recurrence.series_window(self, since)
+        exceptions = self.occurrence_exceptions.filter(original_start__gte=since, original_start__lt=until)
+        with transaction.atomic():
+            self.occurrences.filter(
+                Q(original_start__gte=since) | Q(original_start__lt=self.start_time)
+            ).delete()
+            MeetingOccurrence.objects.bulk_create([
+                MeetingOccurrence(
+                    meeting=self,
+                    room_id=self.room_id,
+                    original_start=occurrence.original_start,
+                    start_time=occurrence.start_time,
+                    end_time=occurrence.end_time,
+                    is_exception=occurrence.is_exception,
+                )
+                for occurrence in recurrence.expand(self, since, until, exceptions)
+            ])
+    
     def clean(self):
-        """Validate meeting times."""
-        if self.start_time and self.end_time:
-            if self.end_time <= self.start_time:
-                raise ValueError(_('Время окончания должно быть позже времени начала'))
+        """Validate meeting times and room availability."""
+        if not (isinstance(self.start_time, datetime) and isinstance(self.end_time, datetime)):
+            # Missing or unparsable: clean_fields() reports it
+            return
+        if self.end_time <= self.start_time:
+            raise ValidationError({'end_time': _('Время окончания должно быть позже времени начала')})
+        if self.end_time - self.start_time > max_meeting_duration():
+            raise ValidationError({'end_time': _('Встреча не может длиться дольше %(hours)s ч.') % {
+                'hours': int(max_meeting_duration().total_seconds() // 3600),
+            }})
+        
+        conflicts = self.find_room_conflicts()[:10]
+        if conflicts:
+            raise ValidationError({'room': [
+                _('Переговорная занята: «%(title)s» (%(start)s – %(end)s)') % {
+                    'title': occurrence.meeting.title,
+                    'start': timezone.localtime(occurrence.start_time).strftime('%d.%m.%Y %H:%M'),
+                    'end': timezone.localtime(occurrence.end_time).strftime('%H:%M'),
+                }
+                for occurrence in conflicts
+            ]})
     
     def is_upcoming(self):
         """Check if meeting is in the future."""
@@ -154,6 +258,99 @@ class Meeting(models.Model):
         return self.participants.count()
 
 
+class MeetingOccurrence(models.Model):
+    """
+    Materialized occurrence of a meeting.
+
+    Every meeting has its occurrences stored here: one row for a single
+    meeting, and the rows of a rolling window (MEETING_OCCURRENCE_HORIZON_DAYS)
+    for a recurring one. Lists, calendars and conflict checks range-scan
+    this table instead of expanding series on the fly. Rows are derived data,
+    rebuilt by Meeting.materialize_occurrences().
+    """
+    
+    meeting = models.ForeignKey(
+        Meeting,
+        on_delete=models.CASCADE,
+        related_name='occurrences',
+        verbose_name=_('Встреча')
+    )
+    room = models.ForeignKey(
+        MeetingRoom,
+        on_delete=models.SET_NULL,
+        null=True,
+        db_index=False,
+        related_name='+',
+        verbose_name=_('Переговорная')
+    )
+    original_start = models.DateTimeField(verbose_name=_('Начало по расписанию'))
+    start_time = models.DateTimeField(verbose_name=_('Начало'))
+    end_time = models.DateTimeField(verbose_name=_('Окончание'))
+    is_exception = models.BooleanField(default=False, verbose_name=_('Перенесена'))
+    
+    class Meta:
+        unique_together = [['meeting', 'original_start']]
+        ordering = ['-start_time']
+        verbose_name = _('Повторение встречи')
+        verbose_name_plural = _('Повторения встреч')
+        indexes = [
+            models.Index(fields=['start_time', 'end_time']),
+            models.Index(fields=['room', 'start_time']),
+        ]
+    
+    def __str__(self):
+        return f"{self.meeting_id} ({self.start_time})"
+    
+    @classmethod
+    def in_range(cls, start_time, end_time, room_id=None):
+        """
+        Occurrences overlapping [start_time, end_time), whatever the meeting status.
+
+        Meetings cannot be longer than max_meeting_duration(), so only
+        occurrences starting in [start_time - max duration, end_time) can
+        overlap, which keeps the lookup a bounded range scan on start_time
+        (or on (room, start_time) when a room is given).
+        """
+        queryset = cls.objects.filter(
+            start_time__gte=start_time - max_meeting_duration(),
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+        )
+        if room_id is not None:
+            queryset = queryset.filter(room_id=room_id)
+        return queryset
+    
+    @classmethod
+    def overlapping(cls, start_time, end_time, room_id=None):
+        """Occurrences of booked meetings overlapping [start_time, end_time)."""
+        return cls.in_range(start_time, end_time, room_id).filter(meeting__status__in=BOOKING_STATUSES)
+
+
+class MeetingOccurrenceException(models.Model):
+    """Cancellation or rescheduling of a single occurrence of a recurring meeting."""
+    
+    meeting = models.ForeignKey(
+        Meeting,
+        on_delete=models.CASCADE,
+        related_name='occurrence_exceptions',
+        verbose_name=_('Встреча')
+    )
+    original_start = models.DateTimeField(verbose_name=_('Начало по расписанию'))
+    is_cancelled = models.BooleanField(default=False, verbose_name=_('Отменена'))
+    start_time = models.DateTimeField(null=True, blank=True, verbose_name=_('Новое начало'))
+    end_time = models.DateTimeField(null=True, blank=True, verbose_name=_('Новое окончание'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Дата создания'))
+    
+    class Meta:
+        unique_together = [['meeting', 'original_start']]
+        ordering = ['original_start']
+        verbose_name = _('Исключение из повторения')
+        verbose_name_plural = _('Исключения из повторения')
+    
+    def __str__(self):
+        return f"{self.meeting_id} ({self.original_start})"
+
+
 class MeetingParticipant(models.Model):
     """Meeting participants with RSVP status."""
     
@@ -196,7 +393,7 @@ class MeetingParticipant(models.Model):
     )
     
     class Meta:
-        unique_together = [['meeting', 'user'], ['meeting', 'email']]
+        unique_together = [['meeting', 'user']]
         ordering = ['response']
         verbose_name = _('Участник встречи')
         verbose_name_plural = _('Участники встреч')
@@ -204,12 +401,141 @@ class MeetingParticipant(models.Model):
             models.Index(fields=['meeting', 'response']),
             models.Index(fields=['user', 'response']),
         ]
+        constraints = [
+            # Internal participants have no email; only external ones must be unique
+            models.UniqueConstraint(
+                fields=['meeting', 'email'],
+                condition=~Q(email=''),
+                name='meetings_participant_unique_email',
+            ),
+        ]
     
     def __str__(self):
         name = self.user.get_full_name() if self.user else self.email
         return f"{name} - {self.get_response_display()}"
 
 
+class InvitationStatus(models.TextChoices):
+    """Invitation batch status choices."""
+    PENDING = 'pending', _('В очереди')
+    SENDING = 'sending', _('Отправляется')
+    SENT = 'sent', _('Отправлено')
+    FAILED = 'failed', _('Ошибка')
+
+
+class MeetingInvitationBatch(models.Model):
+    """
+    Invitations of newly added participants, sent by a background worker.
+
+    One batch covers every participant added in one change of the list,
+    so inviting a whole department is a single notification job.
+    """
+    
+    meeting = models.ForeignKey(
+        Meeting,
+        on_delete=models.CASCADE,
+        related_name='invitation_batches',
+        verbose_name=_('Встреча')
+    )
+    user_ids = models.JSONField(default=list, verbose_name=_('Приглашённые'))
+    status = models.CharField(
+        max_length=20,
+        choices=InvitationStatus.choices,
+        default=InvitationStatus.PENDING,
+        verbose_name=_('Статус')
+    )
+    error = models.TextField(blank=True, verbose_name=_('Ошибка'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Дата создания'))
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Взята в отправку'))
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Дата отправки'))
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('Рассылка приглашений')
+        verbose_name_plural = _('Рассылки приглашений')
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.meeting.title}: {len(self.user_ids)} ({self.get_status_display()})"
+
+
+class MeetingReminder(models.Model):
+    """
+    Sent-marker of one reminder for one occurrence of a meeting.
+
+    Inserted before the reminder is sent; the unique constraint makes
+    every reminder go out once even with several workers or restarts. A
+    marker left unsent past its lease is taken over (meetings/reminders.py).
+    """
+    
+    meeting = models.ForeignKey(
+        Meeting,
+        on_delete=models.CASCADE,
+        related_name='reminders',
+        verbose_name=_('Встреча')
+    )
+    original_start = models.DateTimeField(verbose_name=_('Начало по расписанию'))
+    offset_minutes = models.PositiveIntegerField(verbose_name=_('За сколько минут'))
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_('Пусто — отправка не завершилась'),
+        verbose_name=_('Отправлено')
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Дата создания'))
+    
+    class Meta:
+        unique_together = [['meeting', 'original_start', 'offset_minutes']]
+        ordering = ['-original_start']
+        verbose_name = _('Напоминание о встрече')
+        verbose_name_plural = _('Напоминания о встречах')
+    
+    def __str__(self):
+        return f"{self.meeting_id} ({self.original_start}, -{self.offset_minutes} мин)"
+
+
+class RoomUtilization(models.Model):
+    """
+    Nightly precomputed utilization of a room over a period.
+
+    ``heatmap`` holds the booked share of each hour as 7 lists (Monday
+    first) of 24 values; ``utilization`` is its mean over working hours.
+    """
+    
+    room = models.ForeignKey(
+        MeetingRoom,
+        on_delete=models.CASCADE,
+        related_name='utilization',
+        verbose_name=_('Переговорная')
+    )
+    period_start = models.DateField(verbose_name=_('Начало периода'))
+    period_end = models.DateField(verbose_name=_('Конец периода'))
+    meetings = models.PositiveIntegerField(default=0, verbose_name=_('Встреч'))
+    booked_hours = models.FloatField(default=0, verbose_name=_('Забронировано, ч'))
+    utilization = models.FloatField(default=0, verbose_name=_('Загрузка в рабочее время'))
+    heatmap = models.JSONField(default=list, verbose_name=_('Загрузка по дням недели и часам'))
+    no_show_ratio = models.FloatField(null=True, blank=True, verbose_name=_('Доля неявок'))
+    avg_attendance = models.FloatField(null=True, blank=True, verbose_name=_('Средняя посещаемость'))
+    fill_ratio = models.FloatField(
+        null=True,
+        blank=True,
+        help_text=_('Средняя посещаемость относительно вместимости'),
+        verbose_name=_('Заполненность')
+    )
+    computed_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Дата расчёта'))
+    
+    class Meta:
+        unique_together = [['room', 'period_end']]
+        ordering = ['-period_end', 'room']
+        verbose_name = _('Загрузка переговорной')
+        verbose_name_plural = _('Загрузка переговорных')
+    
+    def __str__(self):
+        return f"{self.room.name}: {self.period_start} – {self.period_end}"
+
+
 class MeetingAttachment(models.Model):
     """File attachments for meetings."""
     
@@ -238,3 +564,126 @@ class MeetingAttachment(models.Model):
     
     def __str__(self):
         return f"{self.file.name} ({self.meeting.title})"
+
+
+class CalDAVCalendar(models.Model):
+    """
+    Remote CalDAV calendar collection synchronized with portal meetings.
+
+    A calendar bound to a room mirrors the room's bookings; otherwise it
+    mirrors the meetings organized by its owner. ``sync_token`` is the
+    remote watermark (RFC 6578), ``local_watermark`` the local one.
+    """
+    
+    name = models.CharField(max_length=200, verbose_name=_('Название'))
+    url = models.URLField(max_length=500, help_text=_('URL коллекции календаря'), verbose_name=_('URL'))
+    username = models.CharField(max_length=150, blank=True, verbose_name=_('Пользователь'))
+    password = models.CharField(max_length=255, blank=True, verbose_name=_('Пароль'))
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='caldav_calendars',
+        verbose_name=_('Владелец')
+    )
+    room = models.ForeignKey(
+        MeetingRoom,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='caldav_calendars',
+        verbose_name=_('Переговорная')
+    )
+    is_active = models.BooleanField(default=True, verbose_name=_('Активен'))
+    
+    sync_token = models.CharField(max_length=500, blank=True, editable=False, verbose_name=_('Sync-token'))
+    local_watermark = models.DateTimeField(null=True, blank=True, editable=False, verbose_name=_('Локальная отметка'))
+    last_synced_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name=_('Последняя синхронизация'))
+    last_error = models.TextField(blank=True, editable=False, verbose_name=_('Последняя ошибка'))
+    locked_until = models.DateTimeField(null=True, blank=True, editable=False, verbose_name=_('Заблокирован до'))
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = _('Календарь CalDAV')
+        verbose_name_plural = _('Календари CalDAV')
+    
+    def __str__(self):
+        return self.name
+    
+    def local_meetings(self):
+        """Meetings mirrored into this calendar."""
+        if self.room_id:
+            return Meeting.objects.filter(room_id=self.room_id)
+        return Meeting.objects.filter(organizer_id=self.owner_id)
+
+
+class CalDAVEvent(models.Model):
+    """Sync state of one calendar object resource: its href, UID and last seen ETag."""
+    
+    calendar = models.ForeignKey(
+        CalDAVCalendar,
+        on_delete=models.CASCADE,
+        related_name='events',
+        verbose_name=_('Календарь')
+    )
+    meeting = models.ForeignKey(
+        Meeting,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='caldav_events',
+        verbose_name=_('Встреча')
+    )
+    href = models.CharField(max_length=500, verbose_name=_('Href'))
+    uid = models.CharField(max_length=500, verbose_name=_('UID'))
+    etag = models.CharField(max_length=200, blank=True, verbose_name=_('ETag'))
+    local_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_('Meeting.updated_at на момент последней синхронизации'),
+        verbose_name=_('Версия встречи')
+    )
+    
+    class Meta:
+        unique_together = [['calendar', 'href']]
+        verbose_name = _('Событие CalDAV')
+        verbose_name_plural = _('События CalDAV')
+        indexes = [
+            models.Index(fields=['calendar', 'meeting']),
+        ]
+    
+    def __str__(self):
+        return self.href
+
+
+class CalendarFeed(models.Model):
+    """Secret token of a user's iCalendar subscription (``/meetings/feed/<token>.ics``)."""
+    
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='calendar_feed',
+        verbose_name=_('Пользователь')
+    )
+    token = models.CharField(max_length=64, unique=True, verbose_name=_('Токен'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Дата создания'))
+    
+    class Meta:
+        verbose_name = _('Подписка на календарь')
+        verbose_name_plural = _('Подписки на календарь')
+    
+    def __str__(self):
+        return f"{self.user} ({self.created_at:%d.%m.%Y})"
+    
+    @staticmethod
+    def new_token():
+        return secrets.token_urlsafe(32)
+    
+    @classmethod
+    def for_user(cls, user):
+        """The user's feed, created on first use."""
+        feed, _created = cls.objects.get_or_create(user=user, defaults={'token': cls.new_token()})
+        return feed
+    
+    def regenerate(self):
+        """Replace the token; the old subscription URL stops working."""
+        self.token = self.new_token()
+        self.save(update_fields=['token'])
@@ -0,0 +1,69 @@
+"""
+Set-based participant management.
+
+The requested participants are compared with the current ones as sets of
+user ids, and only the difference is written: one bulk INSERT for added
+users, one DELETE for removed ones, plus a single invitation batch for
+everybody added. Callers run it inside the transaction that saves the
+meeting.
+"""
+from django.contrib.auth.models import User
+
+from .models import MeetingInvitationBatch, MeetingParticipant
+
+
+def _user_ids(values):
+    ids = set()
+    for value in values:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def sync_participants(meeting, user_ids, remove_missing=True):
+    """
+    Make the meeting's internal participants match ``user_ids``.
+
+    Unknown and inactive users and the organizer are ignored. With ``remove_missing=False``
+    users are only added (e.g. a department on top of the current list).
+    Returns (added_ids, removed_ids).
+    """
+    wanted = set(User.objects.filter(
+        pk__in=_user_ids(user_ids), is_active=True
+    ).exclude(pk=meeting.organizer_id).values_list('pk', flat=True))
+    current = set(meeting.participants.values_list('user_id', flat=True))
+
+    added = wanted - current
+    removed = current - wanted if remove_missing else set()
+
+    if removed:
+        meeting.participants.filter(user_id__in=removed).delete()
+    if added:
+        MeetingParticipant.objects.bulk_create(
+            [MeetingParticipant(meeting=meeting, user_id=user_id, response='pending') for user_id in sorted(added)],
+            batch_size=500,
+        )
+        MeetingInvitationBatch.objects.create(meeting=meeting, user_ids=sorted(added))
+    return added, removed
+
+
+def department_user_ids(department, include_subdepartments=True):
+    """Users of active employees in a department, optionally with its subdepartments."""
+    from employees.models import Department, Employee
+
+    department_ids = {department.pk}
+    frontier = [department.pk]
+    while include_subdepartments and frontier:
+        # One query per level of the tree rather than one per department
+        frontier = list(Department.objects.filter(
+            parent_id__in=frontier
+        ).exclude(pk__in=department_ids).values_list('pk', flat=True))
+        department_ids.update(frontier)
+
+    return set(Employee.objects.filter(
+        position__department_id__in=department_ids,
+        is_active=True,
+        user__is_active=True,
+    ).values_list('user_id', flat=True))
@@ -0,0 +1,128 @@
+"""
+Recurring meeting expansion.
+
+Occurrences are produced lazily by generators, so a series without an end
+date costs nothing beyond the window that is actually requested. Dates are
+stepped in local wall-clock time: a weekly 10:00 meeting stays at 10:00
+across UTC offset changes. Monthly series keep the day of month, clamped to
+the last day of shorter months.
+
+The expansion only needs ``start_time``, ``end_time``, ``is_recurring``,
+``recurrence_pattern`` and ``recurrence_until`` of a meeting, so it works on
+unsaved instances and on historical models in migrations alike.
+"""
+import calendar
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+Occurrence = namedtuple('Occurrence', 'original_start start_time end_time is_exception')
+
+
+def horizon():
+    """Length of the materialized occurrence window."""
+    return timedelta(days=getattr(settings, 'MEETING_OCCURRENCE_HORIZON_DAYS', 90))
+
+
+def window_start():
+    """Start of the current materialization window: local midnight today."""
+    return datetime.combine(timezone.localdate(), time(0), tzinfo=timezone.get_current_timezone())
+
+
+def _add_months(value, months):
+    month = value.month - 1 + months
+    year = value.year + month // 12
+    month = month % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def is_series(meeting):
+    """Whether the meeting repeats with a known pattern."""
+    return bool(meeting.is_recurring) and meeting.recurrence_pattern in ('daily', 'weekly', 'monthly')
+
+
+def iter_starts(meeting, since=None):
+    """
+    Yield the original start times of a meeting's series in order.
+
+    With ``since`` the generator jumps straight to the occurrences around
+    that moment instead of stepping through the whole history.
+    """
+    if not is_series(meeting):
+        yield meeting.start_time
+        return
+
+    first = timezone.localtime(meeting.start_time)
+    pattern = meeting.recurrence_pattern
+    until = meeting.recurrence_until
+    skip = 0
+    if since is not None and since > first:
+        days = (timezone.localtime(since).date() - first.date()).days
+        if pattern == 'daily':
+            skip = days - 1
+        elif pattern == 'weekly':
+            skip = days // 7 - 1
+        else:
+            since_local = timezone.localtime(since)
+            skip = (since_local.year - first.year) * 12 + since_local.month - first.month - 1
+        skip = max(skip, 0)
+
+    index = skip
+    while True:
+        if pattern == 'daily':
+            start = first + timedelta(days=index)
+        elif pattern == 'weekly':
+            start = first + timedelta(weeks=index)
+        else:
+            start = _add_months(first, index)
+        if until and start.date() > until:
+            return
+        yield start
+        index += 1
+
+
+def is_occurrence(meeting, moment):
+    """Whether ``moment`` is an original start of the meeting's series."""
+    for start in iter_starts(meeting, moment):
+        if start >= moment:
+            return start == moment
+    return False
+
+
+def expand(meeting, since, until, exceptions=()):
+    """
+    Yield occurrences whose original start lies in [since, until).
+
+    ``exceptions`` are MeetingOccurrenceException-like objects: cancelled
+    occurrences are skipped, moved ones get their new start/end.
+    """
+    overrides = {exception.original_start: exception for exception in exceptions}
+    duration = meeting.end_time - meeting.start_time
+    for original in iter_starts(meeting, since):
+        if original >= until:
+            return
+        if original < since:
+            continue
+        exception = overrides.get(original)
+        if exception is None:
+            yield Occurrence(original, original, original + duration, False)
+        elif not exception.is_cancelled:
+            start = exception.start_time or original
+            end = exception.end_time or start + duration
+            yield Occurrence(original, start, end, True)
+
+
+def series_window(meeting, since=None):
+    """
+    The [since, until) range of original starts that should be materialized.
+
+    Single meetings always cover their one occurrence; series cover the
+    rolling window from ``since`` (today by default) over horizon().
+    """
+    if not is_series(meeting):
+        return meeting.start_time, meeting.start_time + timedelta(microseconds=1)
+    since = max(since or window_start(), meeting.start_time)
+    return since, max(window_start(), since) + horizon()
@@ -0,0 +1,191 @@
+"""
+Meeting reminder scheduling.
+
+The worker periodically loads the occurrences starting within the sliding
+horizon (the largest reminder offset plus the reload interval) with one
+query and places every pending reminder on an in-memory timing wheel. Each
+tick then only looks at one bucket of the wheel instead of scanning all
+scheduled reminders.
+
+Delivery is guarded by a MeetingReminder row per (meeting, occurrence,
+offset): the row is inserted before sending, and its unique constraint
+keeps concurrent workers and restarted ones from sending a reminder twice.
+A failed send deletes the row so the reminder is retried on the next load.
+A row still unsent after the lease (twice the reload interval) was left by
+a worker that died while sending: it counts as pending again and the next
+worker takes it over, so a crash can at worst repeat that one reminder.
+"""
+import logging
+import math
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import MeetingOccurrence, MeetingParticipant, MeetingReminder, MeetingStatus
+
+logger = logging.getLogger(__name__)
+
+Reminder = namedtuple('Reminder', 'occurrence offset fire_at')
+
+
+def lease(reload_interval):
+    """How long a claimed but unsent reminder stays with the worker that claimed it."""
+    return 2 * reload_interval
+
+
+def reminder_offsets():
+    """Reminder offsets before the start, largest first."""
+    minutes = getattr(settings, 'MEETING_REMINDER_OFFSETS', [24 * 60, 15])
+    return sorted((timedelta(minutes=value) for value in minutes), reverse=True)
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel.
+
+    Items are hashed into ``size`` buckets by their due tick, so adding is
+    O(1) and advancing by one tick inspects a single bucket. Items due
+    more than one revolution ahead stay in their bucket until their tick.
+    """
+
+    def __init__(self, tick=timedelta(seconds=5), size=720):
+        self.tick = tick.total_seconds()
+        self.size = size
+        self.clear()
+
+    def clear(self, now=None):
+        """Drop all items; ``now`` starts the wheel at that moment."""
+        self.buckets = [[] for _ in range(self.size)]
+        self.cursor = self._tick(now) if now else None
+        self.count = 0
+
+    def _tick(self, moment):
+        return math.floor(moment.timestamp() / self.tick)
+
+    def add(self, when, item):
+        due = self._tick(when)
+        if self.cursor is not None:
+            due = max(due, self.cursor)
+        self.buckets[due % self.size].append((due, item))
+        self.count += 1
+
+    def advance(self, now):
+        """Remove and return the items due up to ``now``."""
+        target = self._tick(now)
+        start = target - self.size + 1 if self.cursor is None else self.cursor
+        fired = []
+        # After a long pause every bucket is visited once, not every missed tick
+        for tick in range(start, min(target, start + self.size - 1) + 1):
+            bucket = self.buckets[tick % self.size]
+            if not bucket:
+                continue
+            due = [entry for entry in bucket if entry[0] <= target]
+            if due:
+                self.buckets[tick % self.size] = [entry for entry in bucket if entry[0] > target]
+                fired.extend(item for _tick, item in due)
+        self.cursor = target + 1
+        self.count -= len(fired)
+        return fired
+
+
+def load_reminders(now, reload_interval):
+    """
+    Reminders due within the horizon that were not sent yet (or whose
+    claim outlived its lease).
+
+    A reminder whose time passed while no worker was running is still sent
+    if the meeting has not started, but only the smallest overdue offset:
+    there is no point in a "tomorrow" reminder ten minutes before the start.
+    """
+    offsets = reminder_offsets()
+    if not offsets:
+        return []
+    occurrences = list(MeetingOccurrence.objects.filter(
+        meeting__status=MeetingStatus.SCHEDULED,
+        start_time__gt=now,
+        start_time__lte=now + offsets[0] + reload_interval,
+    ).select_related('meeting__room', 'meeting__organizer'))
+    if not occurrences:
+        return []
+
+    sent = set(MeetingReminder.objects.filter(
+        meeting_id__in={occurrence.meeting_id for occurrence in occurrences},
+        original_start__gte=min(occurrence.original_start for occurrence in occurrences),
+    ).exclude(
+        sent_at__isnull=True, created_at__lt=now - lease(reload_interval)
+    ).values_list('meeting_id', 'original_start', 'offset_minutes'))
+
+    reminders = []
+    for occurrence in occurrences:
+        overdue = None
+        for offset in offsets:
+            fire_at = occurrence.start_time - offset
+            is_sent = (occurrence.meeting_id, occurrence.original_start, offset // timedelta(minutes=1)) in sent
+            if fire_at <= now:
+                # Offsets go from largest to smallest: the last overdue one wins
+                overdue = None if is_sent else Reminder(occurrence, offset, now)
+            elif not is_sent:
+                reminders.append(Reminder(occurrence, offset, fire_at))
+        if overdue:
+            reminders.append(overdue)
+    return reminders
+
+
+def _claim(reminder, stale_before):
+    key = {
+        'meeting_id': reminder.occurrence.meeting_id,
+        'original_start': reminder.occurrence.original_start,
+        'offset_minutes': reminder.offset // timedelta(minutes=1),
+    }
+    try:
+        with transaction.atomic():
+            return MeetingReminder.objects.create(**key)
+    except IntegrityError:
+        pass
+    # Take over a marker whose lease ran out; the conditional UPDATE lets one worker win
+    if MeetingReminder.objects.filter(**key, sent_at__isnull=True, created_at__lt=stale_before).update(
+        created_at=timezone.now()
+    ):
+        return MeetingReminder.objects.filter(**key).first()
+    return None
+
+
+def deliver(reminders, reload_interval):
+    """Send due reminders once each. Returns the number sent."""
+    from mattermost_integration.models import get_mattermost_client
+
+    stale_before = timezone.now() - lease(reload_interval)
+    claimed = [(reminder, marker) for reminder in reminders if (marker := _claim(reminder, stale_before))]
+    if not claimed:
+        return 0
+
+    participants = {}
+    for participant in MeetingParticipant.objects.filter(
+        meeting_id__in={reminder.occurrence.meeting_id for reminder, _marker in claimed},
+        response='accepted',
+    ).select_related('user'):
+        participants.setdefault(participant.meeting_id, []).append(participant)
+
+    client = get_mattermost_client()
+    sent, failed = [], []
+    for reminder, marker in claimed:
+        occurrence = reminder.occurrence
+        try:
+            ok = client.send_meeting_reminder(
+                occurrence.meeting,
+                participants=participants.get(occurrence.meeting_id, []),
+                start_time=occurrence.start_time,
+                end_time=occurrence.end_time,
+            )
+        except Exception:
+            logger.exception("Meeting reminder %s failed", marker.pk)
+            ok = False
+        (sent if ok else failed).append(marker.pk)
+
+    MeetingReminder.objects.filter(pk__in=sent).update(sent_at=timezone.now())
+    # Released markers are picked up again by the next load
+    MeetingReminder.objects.filter(pk__in=failed).delete()
+    return len(sent)
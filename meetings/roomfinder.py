@@ -0,0 +1,106 @@
+"""
+Room finder: free rooms for a time window and requirements.
+
+Free rooms are selected in one query: the rooms matching the requirements
+anti-joined (NOT EXISTS) against booked occurrences overlapping the window,
+ordered by best fit - the smallest sufficient capacity first, then the
+fewest unrequested extras.
+
+If no room is free, the nearest alternative slots are suggested: the
+bookings of all matching rooms around the requested time are loaded with
+one range query and, per room, the free slot of the same duration closest
+to the requested start is found with the interval helpers of freebusy.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Exists, IntegerField, OuterRef, Value
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .freebusy import SLOT_STEP, _iso, free_gaps, off_hours
+from .models import MeetingOccurrence, MeetingRoom
+
+# Alternatives are searched from SEARCH_BEFORE before to SEARCH_AFTER after the start
+SEARCH_BEFORE = timedelta(days=2)
+SEARCH_AFTER = timedelta(days=7)
+
+
+def matching_rooms(capacity=0, video=False, projector=False):
+    """Active rooms meeting the requirements, best fit first."""
+    rooms = MeetingRoom.objects.filter(is_active=True, capacity__gte=capacity)
+    if video:
+        rooms = rooms.filter(has_video_conf=True)
+    if projector:
+        rooms = rooms.filter(has_projector=True)
+    # Equipment nobody asked for is better left to those who need it
+    extras = Value(0, output_field=IntegerField())
+    if not video:
+        extras += Cast('has_video_conf', IntegerField())
+    if not projector:
+        extras += Cast('has_projector', IntegerField())
+    return rooms.annotate(extras=extras).order_by('capacity', 'extras', 'name')
+
+
+def free_rooms(start, end, capacity=0, video=False, projector=False):
+    """Rooms meeting the requirements with no booking overlapping [start, end)."""
+    busy = MeetingOccurrence.overlapping(start, end).filter(room_id=OuterRef('pk'))
+    return matching_rooms(capacity, video, projector).filter(~Exists(busy))
+
+
+def _nearest_slot(gap_starts, gap_ends, wanted, duration):
+    """Slot start closest to ``wanted`` within the gaps, or None."""
+    lowest = np.ceil(gap_starts / SLOT_STEP) * SLOT_STEP
+    highest = np.floor((gap_ends - duration) / SLOT_STEP) * SLOT_STEP
+    fits = highest >= lowest
+    if not fits.any():
+        return None
+    candidates = np.clip(wanted, lowest[fits], highest[fits])
+    return candidates[np.argmin(np.abs(candidates - wanted))]
+
+
+def alternative_slots(start, end, rooms, limit=5, working_hours=True):
+    """Per room, the free slot of the same duration nearest to ``start``; nearest first."""
+    rooms = list(rooms)
+    if not rooms:
+        return []
+    duration = (end - start).total_seconds()
+    window_start = max(start - SEARCH_BEFORE, timezone.now())
+    window_end = end + SEARCH_AFTER
+
+    busy = {room.pk: ([], []) for room in rooms}
+    for room_id, busy_start, busy_end in MeetingOccurrence.overlapping(window_start, window_end).filter(
+        room_id__in=busy
+    ).values_list('room_id', 'start_time', 'end_time'):
+        busy[room_id][0].append(busy_start.timestamp())
+        busy[room_id][1].append(busy_end.timestamp())
+    closed_starts, closed_ends = off_hours(window_start, window_end) if working_hours else ([], [])
+
+    suggestions = []
+    wanted = start.timestamp()
+    for rank, room in enumerate(rooms):
+        starts, ends = busy[room.pk]
+        gap_starts, gap_ends = free_gaps(
+            np.r_[starts, closed_starts], np.r_[ends, closed_ends],
+            window_start.timestamp(), window_end.timestamp(),
+        )
+        slot = _nearest_slot(gap_starts, gap_ends, wanted, duration)
+        if slot is not None:
+            suggestions.append((abs(slot - wanted), rank, room, slot))
+
+    suggestions.sort(key=lambda item: item[:2])
+    return [
+        {'room': room_dict(room), 'start': _iso(slot), 'end': _iso(slot + duration)}
+        for _distance, _rank, room, slot in suggestions[:limit]
+    ]
+
+
+def room_dict(room):
+    return {
+        'id': room.pk,
+        'name': room.name,
+        'location': room.location,
+        'capacity': room.capacity,
+        'has_video_conf': room.has_video_conf,
+        'has_projector': room.has_projector,
+    }
@@ -0,0 +1,85 @@
+"""
+Signal handlers keeping materialized meeting occurrences in sync.
+
+Occurrences are rebuilt whenever the schedule of a meeting or one of its
+occurrence exceptions changes; status-only saves leave them untouched.
+Exception changes also bump ``Meeting.updated_at``, which the calendar
+feed and the CalDAV push use to detect changed meetings.
+
+``meeting_status_changed`` is sent after status changes that bypass
+``save()`` (the transition worker's bulk UPDATEs) and after manual status
+updates, with the ids of the meetings and the old and new status. Of these
+only cancelling and restoring a meeting changes its iCalendar form: the
+meetings get a new ``updated_at`` (feeds and the CalDAV push pick them up),
+and on cancellation the participants who have not declined are told in
+Mattermost once the transaction commits.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .models import Meeting, MeetingOccurrenceException, MeetingParticipant, MeetingStatus
+
+logger = logging.getLogger(__name__)
+
+meeting_status_changed = Signal()
+
+SCHEDULE_FIELDS = {
+    'start_time', 'end_time', 'room', 'room_id',
+    'is_recurring', 'recurrence_pattern', 'recurrence_until',
+}
+
+
+@receiver(post_save, sender=Meeting)
+def meeting_saved(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields and not SCHEDULE_FIELDS.intersection(update_fields)):
+        return
+    instance.materialize_occurrences()
+
+
+@receiver(meeting_status_changed)
+def status_changed(sender, meeting_ids, old_status, new_status, **kwargs):
+    if MeetingStatus.CANCELLED not in (old_status, new_status):
+        return
+    Meeting.objects.filter(pk__in=meeting_ids).update(updated_at=timezone.now())
+    if new_status == MeetingStatus.CANCELLED:
+        transaction.on_commit(lambda: notify_cancelled(meeting_ids))
+
+
+def notify_cancelled(meeting_ids):
+    from mattermost_integration.models import get_mattermost_client
+
+    users = {}
+    for participant in MeetingParticipant.objects.filter(meeting_id__in=meeting_ids).exclude(
+        response='declined'
+    ).select_related('user'):
+        users.setdefault(participant.meeting_id, []).append(participant.user)
+    client = get_mattermost_client()
+    for meeting in Meeting.objects.filter(pk__in=meeting_ids).select_related('room'):
+        try:
+            client.send_meeting_cancellation(meeting, users.get(meeting.pk, []))
+        except Exception:
+            logger.exception("Cancellation notice for meeting %s failed", meeting.pk)
+
+
+def _exception_changed(exception):
+    Meeting.objects.filter(pk=exception.meeting_id).update(updated_at=timezone.now())
+    exception.meeting.materialize_occurrences()
+
+
+@receiver(post_save, sender=MeetingOccurrenceException)
+def exception_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _exception_changed(instance)
+
+
+@receiver(post_delete, sender=MeetingOccurrenceException)
+def exception_deleted(sender, instance, origin=None, **kwargs):
+    # Only single deletes rebuild: cascades from the meeting need nothing and
+    # bulk (queryset) deletes are followed by an explicit rebuild
+    if origin is not instance:
+        return
+    _exception_changed(instance)
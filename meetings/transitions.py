@@ -0,0 +1,83 @@
+"""
+Automatic meeting status transitions.
+
+Each pass moves meetings whose start or end has passed with set-based
+UPDATEs: scheduled -> in_progress -> completed (a meeting that ended while
+no worker was running goes to completed directly). The candidates of a
+transition are a range scan of the ``(status, start_time)`` index - rows
+already moved no longer carry the old status - so a pass only touches the
+rows that crossed a boundary since the previous one.
+
+Rows are locked with SKIP LOCKED in batches, so concurrent workers split
+the work instead of reporting the same meetings twice, and every batch is
+announced with the ``meeting_status_changed`` signal. ``updated_at`` is
+left alone: iCalendar renders all three statuses as CONFIRMED, so feeds
+and CalDAV copies do not change (signals.py only reacts to cancellations).
+
+A recurring meeting's ``start_time`` is only its first occurrence, so a
+series stays scheduled (its occurrences still get reminders) until its
+last occurrence has ended.
+"""
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Meeting, MeetingOccurrence, MeetingStatus
+from .signals import meeting_status_changed
+
+BATCH_SIZE = 500
+
+Transition = namedtuple('Transition', 'old new')
+
+
+def _candidates(transition, now):
+    """Meetings that should make ``transition`` at ``now``."""
+    meetings = Meeting.objects.filter(status=transition.old)
+    if transition.new == MeetingStatus.IN_PROGRESS:
+        return meetings.filter(is_recurring=False, start_time__lte=now, end_time__gt=now)
+    single = meetings.filter(is_recurring=False, start_time__lt=now, end_time__lte=now)
+    pending = MeetingOccurrence.objects.filter(meeting_id=OuterRef('pk'), end_time__gt=now)
+    finished_series = meetings.filter(
+        is_recurring=True,
+        start_time__lt=now,
+        recurrence_until__lt=timezone.localdate(now),
+    ).filter(~Exists(pending))
+    return single | finished_series
+
+
+def apply(transition, now):
+    """Make ``transition`` for every due meeting; returns the moved ids."""
+    moved = []
+    while True:
+        with transaction.atomic():
+            ids = list(_candidates(transition, now).select_for_update(skip_locked=True).order_by(
+                'start_time'
+            ).values_list('pk', flat=True)[:BATCH_SIZE])
+            if not ids:
+                break
+            Meeting.objects.filter(pk__in=ids, status=transition.old).update(status=transition.new)
+        moved.extend(ids)
+        meeting_status_changed.send(
+            sender=Meeting, meeting_ids=ids, old_status=transition.old, new_status=transition.new
+        )
+        if len(ids) < BATCH_SIZE:
+            break
+    return moved
+
+
+def run(now=None):
+    """One pass over all transitions; returns {(old, new): count}."""
+    now = now or timezone.now()
+    stats = {}
+    for transition in (
+        # Ended before they were seen starting
+        Transition(MeetingStatus.SCHEDULED, MeetingStatus.COMPLETED),
+        Transition(MeetingStatus.SCHEDULED, MeetingStatus.IN_PROGRESS),
+        Transition(MeetingStatus.IN_PROGRESS, MeetingStatus.COMPLETED),
+    ):
+        moved = apply(transition, now)
+        if moved:
+            stats[transition] = len(moved)
+    return stats
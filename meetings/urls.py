@@ -8,7 +8,16 @@ urlpatterns = [
     path('', views.meeting_list, name='list'),
     path('<int:pk>/', views.meeting_detail, name='detail'),
     path('create/', views.create_meeting, name='create'),
+    path('free-slots/', views.free_slots, name='free_slots'),
+    path('calendar/', views.calendar_range, name='calendar'),
+    path('rooms/available/', views.find_rooms, name='find_rooms'),
+    path('rooms/utilization/', views.room_utilization, name='room_utilization'),
+    path('feed/', views.calendar_feed_url, name='calendar_feed_url'),
+    path('feed/<str:token>.ics', views.calendar_feed, name='calendar_feed'),
     path('<int:pk>/edit/', views.edit_meeting, name='edit'),
     path('<int:pk>/rsvp/', views.rsvp, name='rsvp'),
+    path('<int:pk>/join/', views.join_meeting, name='join'),
+    path('<int:pk>/add-department/', views.add_department, name='add_department'),
+    path('<int:pk>/occurrences/', views.occurrence_exception, name='occurrence_exception'),
     path('<int:pk>/update-status/', views.update_status, name='update_status'),
 ]
@@ -0,0 +1,175 @@
+"""
+Room utilization analytics: occupancy heatmaps by weekday and hour,
+no-show ratios and attendance versus capacity.
+
+Booked occurrences of the period are loaded once as NumPy arrays. Occupied
+time per hour is computed without walking minutes or hours of each
+meeting: for a set of intervals, the occupied time before moment ``t`` is
+``sum(t - start) - sum(t - end)`` over the starts and ends before ``t``,
+which sorted prefix sums give for all hour boundaries at once. Differences
+between consecutive boundaries are the occupied seconds of each hour, and
+``bincount`` folds those hours into a 7 x 24 weekday/hour grid.
+
+The results are written nightly to RoomUtilization by the
+``compute_room_utilization`` command, so dashboards only read one row per
+room.
+"""
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .freebusy import merge_intervals
+from .models import (
+    BOOKING_STATUSES, MeetingOccurrence, MeetingParticipant, MeetingRoom, RoomUtilization,
+)
+
+HOUR = 3600.0
+# The Unix epoch is a Thursday
+EPOCH_WEEKDAY = 3
+# Joining this long before the start still counts as attending
+JOIN_GRACE = timedelta(minutes=15)
+
+
+def occupied_seconds(starts, ends, edges):
+    """
+    Occupied seconds between consecutive ``edges`` for disjoint intervals.
+
+    All arrays are Unix seconds; returns an array of len(edges) - 1.
+    """
+    starts, ends = np.sort(starts), np.sort(ends)
+    start_sums = np.r_[0.0, np.cumsum(starts)]
+    end_sums = np.r_[0.0, np.cumsum(ends)]
+    started = np.searchsorted(starts, edges, side='right')
+    ended = np.searchsorted(ends, edges, side='right')
+    covered = (started * edges - start_sums[started]) - (ended * edges - end_sums[ended])
+    return np.diff(covered)
+
+
+def weekly_heatmap(starts, ends, since_ts, until_ts, utc_offset):
+    """
+    Share of each weekday/hour cell that was booked, as a 7 x 24 array.
+
+    ``since_ts`` and ``until_ts`` must be local hour boundaries; the cell of
+    an hour is taken from its local wall-clock time (``utc_offset`` seconds).
+    """
+    edges = np.arange(since_ts, until_ts + 1, HOUR)
+    if edges.size < 2:
+        return np.zeros((7, 24))
+    starts, ends = merge_intervals(np.clip(starts, since_ts, until_ts), np.clip(ends, since_ts, until_ts))
+    per_hour = occupied_seconds(starts, ends, edges)
+
+    local_hours = np.floor((edges[:-1] + utc_offset) / HOUR).astype(np.int64)
+    weekday = (local_hours // 24 + EPOCH_WEEKDAY) % 7
+    cell = weekday * 24 + local_hours % 24
+    booked = np.bincount(cell, weights=per_hour, minlength=7 * 24)
+    hours = np.bincount(cell, minlength=7 * 24)
+    return (booked / np.maximum(hours, 1) / HOUR).reshape(7, 24)
+
+
+def working_mask():
+    """7 x 24 mask of working hours (MEETING_WORKDAY_START..END on weekdays)."""
+    mask = np.zeros((7, 24), dtype=bool)
+    mask[:5, getattr(settings, 'MEETING_WORKDAY_START', 9):getattr(settings, 'MEETING_WORKDAY_END', 18)] = True
+    return mask
+
+
+def load_occurrences(since, until):
+    """Booked occurrences with a room in [since, until) as column arrays."""
+    rows = list(MeetingOccurrence.objects.filter(
+        meeting__status__in=BOOKING_STATUSES,
+        room_id__isnull=False,
+        start_time__lt=until,
+        end_time__gt=since,
+    ).order_by().values_list('room_id', 'meeting_id', 'start_time', 'end_time', 'meeting__is_recurring'))
+    count = len(rows)
+    room, meeting, start, end, recurring = zip(*rows) if rows else ([],) * 5
+    return {
+        'room': np.fromiter(room, dtype=np.int64, count=count),
+        'meeting': np.fromiter(meeting, dtype=np.int64, count=count),
+        'start': np.fromiter((value.timestamp() for value in start), dtype=np.float64, count=count),
+        'end': np.fromiter((value.timestamp() for value in end), dtype=np.float64, count=count),
+        'recurring': np.fromiter(recurring, dtype=bool, count=count),
+    }
+
+
+def attendance(meeting_ids):
+    """
+    Accepted and attended participants per single meeting.
+
+    A participant attended if ``joined_at`` lies within the meeting (or
+    JOIN_GRACE before it); accepting an invitation in advance is not
+    attending. Returns {meeting_id: (accepted, attended)}.
+    """
+    rows = MeetingParticipant.objects.filter(
+        meeting_id__in=meeting_ids, response='accepted'
+    ).values('meeting_id').annotate(
+        accepted=Count('pk'),
+        attended=Count('pk', filter=Q(
+            joined_at__gte=F('meeting__start_time') - JOIN_GRACE,
+            joined_at__lt=F('meeting__end_time'),
+        )),
+    ).order_by()
+    return {row['meeting_id']: (row['accepted'], row['attended']) for row in rows}
+
+
+def compute(days, now=None):
+    """Utilization figures of every active room for the ``days`` full days before today."""
+    now = now or timezone.now()
+    tz = timezone.get_current_timezone()
+    until = datetime.combine(timezone.localdate(now), time(0), tzinfo=tz)
+    since = until - timedelta(days=days)
+    utc_offset = until.utcoffset().total_seconds()
+    columns = load_occurrences(since, until)
+
+    # Attendance is per meeting row, so only single meetings are comparable
+    past_single = ~columns['recurring'] & (columns['end'] <= now.timestamp())
+    counts = attendance(np.unique(columns['meeting'][past_single]).tolist())
+    mask = working_mask()
+
+    results = []
+    for room in MeetingRoom.objects.filter(is_active=True):
+        own = columns['room'] == room.pk
+        heatmap = weekly_heatmap(
+            columns['start'][own], columns['end'][own], since.timestamp(), until.timestamp(), utc_offset
+        )
+        booked_hours = float((
+            np.minimum(columns['end'][own], until.timestamp()) - np.maximum(columns['start'][own], since.timestamp())
+        ).sum()) / HOUR
+
+        tracked = [counts[pk] for pk in columns['meeting'][own & past_single].tolist() if pk in counts]
+        accepted = np.array([pair[0] for pair in tracked], dtype=np.float64)
+        attended = np.array([pair[1] for pair in tracked], dtype=np.float64)
+        results.append(RoomUtilization(
+            room=room,
+            period_start=since.date(),
+            period_end=until.date(),
+            meetings=int(own.sum()),
+            booked_hours=round(booked_hours, 2),
+            utilization=round(float(heatmap[mask].mean()), 4),
+            heatmap=np.round(heatmap, 3).tolist(),
+            no_show_ratio=round(1 - attended.sum() / accepted.sum(), 4) if accepted.sum() else None,
+            avg_attendance=round(float(attended.mean()), 2) if attended.size else None,
+            fill_ratio=round(float(attended.mean()) / room.capacity, 4) if attended.size and room.capacity else None,
+        ))
+    return results
+
+
+def store(results):
+    """Replace the summary rows of the computed period."""
+    if not results:
+        return
+    with transaction.atomic():
+        RoomUtilization.objects.filter(period_end=results[0].period_end).delete()
+        RoomUtilization.objects.bulk_create(results)
+
+
+def latest():
+    """The most recent summary rows, one per room."""
+    period_end = RoomUtilization.objects.order_by('-period_end').values_list('period_end', flat=True).first()
+    if period_end is None:
+        return []
+    return list(RoomUtilization.objects.filter(period_end=period_end).select_related('room'))
@@ -1,68 +1,49 @@
 """Meetings app views with optimized queries."""
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
-from django.db.models import Q, Prefetch
-from django.http import JsonResponse
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date
+from datetime import datetime, timedelta
 
-from .models import Meeting, MeetingRoom, MeetingParticipant, MeetingStatus
+from .models import (
+    Meeting, MeetingRoom, MeetingParticipant, MeetingStatus,
+    MeetingOccurrence, MeetingOccurrenceException, CalendarFeed, BOOKING_STATUSES, max_meeting_duration,
+)
+from .filters import filter_occurrences
+from .participants import department_user_ids, sync_participants
+from .signals import meeting_status_changed
+from . import feed, freebusy, grid, recurrence, roomfinder, utilization
 
 
 @login_required
 def meeting_list(request):
-    """List all meetings with filtering."""
-    queryset = Meeting.objects.select_related(
-        'organizer', 'room'
-    ).prefetch_related('participants__user')
+    """List meeting occurrences with filtering; recurring meetings appear once per occurrence."""
+    queryset = MeetingOccurrence.objects.select_related(
+        'meeting__organizer', 'meeting__room'
+    ).prefetch_related('meeting__participants__user')
 
-    # Filter by status
+    queryset = filter_occurrences(queryset, request.GET)
     status = request.GET.get('status')
-    if status:
-        queryset = queryset.filter(status=status)
-
-    # Filter by date range
     date_filter = request.GET.get('date')
-    now = timezone.now()
-    if date_filter == 'today':
-        queryset = queryset.filter(
-            start_time__date=now.date()
-        )
-    elif date_filter == 'week':
-        queryset = queryset.filter(
-            start_time__gte=now.date(),
-            start_time__lt=now.date() + timedelta(days=7)
-        )
-    elif date_filter == 'month':
-        queryset = queryset.filter(
-            start_time__gte=now.date(),
-            start_time__lt=now.replace(day=28) + timedelta(days=4)
-        )
-    elif date_filter == 'past':
-        queryset = queryset.filter(end_time__lt=now)
-    else:
-        # Default: upcoming meetings
-        queryset = queryset.filter(start_time__gte=now)
-
-    # Search
     search_query = request.GET.get('search', '')
-    if search_query:
-        queryset = queryset.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(organizer__last_name__icontains=search_query)
-        )
 
     paginator = Paginator(queryset, 15)
     page = request.GET.get('page')
-    meetings = paginator.get_page(page)
+    occurrences = paginator.get_page(page)
 
     rooms = MeetingRoom.objects.filter(is_active=True)
 
     context = {
-        'meetings': meetings,
+        'meetings': occurrences,
         'rooms': rooms,
         'statuses': MeetingStatus.choices,
         'selected_status': status,
@@ -108,40 +89,77 @@ def meeting_detail(request, pk):
     return render(request, 'meetings/meeting_detail.html', context)
 
 
+def _local_datetime(value):
+    """Parse a datetime-local form value as local time."""
+    try:
+        parsed = parse_datetime(value or '')
+    except ValueError:
+        return value
+    if parsed and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed or value
+
+
+def _save_booking(meeting, participant_ids=None):
+    """
+    Validate and save a meeting, rejecting room double-bookings.
+
+    With ``participant_ids`` the participant list is updated to match it in
+    the same transaction (only the difference is written). Returns a dict
+    of validation errors, or None on success. On PostgreSQL the exclusion
+    constraint also catches bookings racing past clean().
+    """
+    try:
+        meeting.full_clean()
+        with transaction.atomic():
+            meeting.save()
+            if participant_ids is not None:
+                sync_participants(meeting, participant_ids)
+    except ValidationError as e:
+        return e.message_dict
+    except IntegrityError:
+        try:
+            meeting.clean()
+        except ValidationError as e:
+            return e.message_dict
+        raise
+    return None
+
+
+def _render_form(request, meeting, errors=None):
+    rooms = MeetingRoom.objects.filter(is_active=True)
+    return render(request, 'meetings/meeting_form.html', {
+        'meeting': meeting,
+        'rooms': rooms,
+        'statuses': MeetingStatus.choices,
+        'errors': errors,
+    }, status=400 if errors else 200)
+
+
 @login_required
 def create_meeting(request):
     """Create new meeting."""
     if request.method == 'POST':
-        meeting = Meeting.objects.create(
+        meeting = Meeting(
             title=request.POST.get('title'),
             description=request.POST.get('description'),
             organizer=request.user,
-            room_id=request.POST.get('room'),
-            start_time=request.POST.get('start_time'),
-            end_time=request.POST.get('end_time'),
+            room_id=request.POST.get('room') or None,
+            start_time=_local_datetime(request.POST.get('start_time')),
+            end_time=_local_datetime(request.POST.get('end_time')),
             status=MeetingStatus.SCHEDULED,
             is_recurring=request.POST.get('is_recurring') == 'on',
             recurrence_pattern=request.POST.get('recurrence_pattern', ''),
+            recurrence_until=request.POST.get('recurrence_until') or None,
             meeting_link=request.POST.get('meeting_link', ''),
         )
         
-        # Add participants
-        participant_ids = request.POST.getlist('participants')
-        for user_id in participant_ids:
-            MeetingParticipant.objects.create(
-                meeting=meeting,
-                user_id=user_id,
-                response='pending'
-            )
-        
+        errors = _save_booking(meeting, request.POST.getlist('participants'))
+        if errors:
+            return _render_form(request, None, errors)
         return redirect('meetings:detail', pk=meeting.pk)
     
-    rooms = MeetingRoom.objects.filter(is_active=True)
-    return render(request, 'meetings/meeting_form.html', {
-        'rooms': rooms,
-        'meeting': None,
-        'statuses': MeetingStatus.choices,
-    })
+    return _render_form(request, None)
 
 
 @login_required
@@ -152,22 +170,22 @@ def edit_meeting(request, pk):
     if request.method == 'POST':
         meeting.title = request.POST.get('title')
         meeting.description = request.POST.get('description')
-        meeting.room_id = request.POST.get('room')
-        meeting.start_time = request.POST.get('start_time')
-        meeting.end_time = request.POST.get('end_time')
+        meeting.room_id = request.POST.get('room') or None
+        meeting.start_time = _local_datetime(request.POST.get('start_time'))
+        meeting.end_time = _local_datetime(request.POST.get('end_time'))
         meeting.status = request.POST.get('status', MeetingStatus.SCHEDULED)
         meeting.is_recurring = request.POST.get('is_recurring') == 'on'
         meeting.recurrence_pattern = request.POST.get('recurrence_pattern', '')
+        meeting.recurrence_until = request.POST.get('recurrence_until') or None
         meeting.meeting_link = request.POST.get('meeting_link', '')
-        meeting.save()
+        # The list is replaced only when the form submits it
+        participant_ids = request.POST.getlist('participants') if 'participants' in request.POST else None
+        errors = _save_booking(meeting, participant_ids)
+        if errors:
+            return _render_form(request, meeting, errors)
         return redirect('meetings:detail', pk=meeting.pk)
     
-    rooms = MeetingRoom.objects.filter(is_active=True)
-    return render(request, 'meetings/meeting_form.html', {
-        'meeting': meeting,
-        'rooms': rooms,
-        'statuses': MeetingStatus.choices,
-    })
+    return _render_form(request, meeting)
 
 
 @login_required
@@ -185,13 +203,115 @@ def rsvp(request, pk):
     
     if not created:
         participant.response = response
-        if response == 'accepted':
-            participant.joined_at = timezone.now()
-        participant.save()
+        participant.save(update_fields=['response'])
     
     return JsonResponse({'success': True, 'response': participant.get_response_display()})
 
 
+@login_required
+@require_http_methods(["POST"])
+def join_meeting(request, pk):
+    """Record that the current user joined the meeting; used for attendance analytics."""
+    meeting = get_object_or_404(Meeting, pk=pk)
+    participant, _created = MeetingParticipant.objects.get_or_create(
+        meeting=meeting,
+        user=request.user,
+        defaults={'response': 'accepted'}
+    )
+    participant.response = 'accepted'
+    participant.joined_at = timezone.now()
+    participant.save(update_fields=['response', 'joined_at'])
+    return JsonResponse({'success': True, 'meeting_link': meeting.meeting_link})
+
+
+@login_required
+@require_http_methods(["POST"])
+def add_department(request, pk):
+    """Invite all employees of a department (and its subdepartments) to a meeting."""
+    from employees.models import Department
+
+    meeting = get_object_or_404(Meeting, pk=pk)
+    if meeting.organizer_id != request.user.pk and not request.user.is_staff:
+        return JsonResponse({'success': False, 'error': 'Forbidden'}, status=403)
+    department = get_object_or_404(Department, pk=request.POST.get('department') or 0)
+
+    user_ids = department_user_ids(department, request.POST.get('include_subdepartments', '1') != '0')
+    with transaction.atomic():
+        added, _removed = sync_participants(meeting, user_ids, remove_missing=False)
+    return JsonResponse({'success': True, 'added': len(added)})
+
+
+def _occurrence_conflicts(meeting, original_start, start, end):
+    """Room clashes of one rescheduled occurrence, ignoring its own current row."""
+    if not meeting.room_id:
+        return []
+    return list(MeetingOccurrence.overlapping(start, end, room_id=meeting.room_id).exclude(
+        meeting_id=meeting.pk, original_start=original_start
+    ).select_related('meeting').order_by('start_time')[:10])
+
+
+@login_required
+@require_http_methods(["POST"])
+def occurrence_exception(request, pk):
+    """Cancel, reschedule or restore a single occurrence of a recurring meeting."""
+    meeting = get_object_or_404(Meeting, pk=pk)
+    if meeting.organizer_id != request.user.pk and not request.user.is_staff:
+        return JsonResponse({'success': False, 'error': 'Forbidden'}, status=403)
+    
+    original_start = _local_datetime(request.POST.get('original_start'))
+    if not recurrence.is_series(meeting) or not isinstance(original_start, datetime) \
+            or not recurrence.is_occurrence(meeting, original_start):
+        return JsonResponse({'success': False, 'error': 'Unknown occurrence'}, status=404)
+    
+    action = request.POST.get('action')
+    if action == 'restore':
+        # Deleting one by one so the post_delete signal rebuilds occurrences
+        for exception in meeting.occurrence_exceptions.filter(original_start=original_start):
+            exception.delete()
+        return JsonResponse({'success': True})
+    
+    if action == 'cancel':
+        MeetingOccurrenceException.objects.update_or_create(
+            meeting=meeting,
+            original_start=original_start,
+            defaults={'is_cancelled': True, 'start_time': None, 'end_time': None},
+        )
+        return JsonResponse({'success': True})
+    
+    if action != 'move':
+        return JsonResponse({'success': False, 'error': 'Invalid action'}, status=400)
+    
+    start = _local_datetime(request.POST.get('start_time'))
+    end = _local_datetime(request.POST.get('end_time'))
+    if not isinstance(start, datetime) or not isinstance(end, datetime) \
+            or end <= start or end - start > max_meeting_duration():
+        return JsonResponse({'success': False, 'error': 'Invalid period'}, status=400)
+    
+    conflicts = _occurrence_conflicts(meeting, original_start, start, end) \
+        if meeting.status in BOOKING_STATUSES else []
+    if conflicts:
+        return JsonResponse({
+            'success': False,
+            'error': 'Room is booked',
+            'conflicts': [
+                {
+                    'meeting_id': occurrence.meeting_id,
+                    'title': occurrence.meeting.title,
+                    'start': occurrence.start_time.isoformat(),
+                    'end': occurrence.end_time.isoformat(),
+                }
+                for occurrence in conflicts
+            ],
+        }, status=409)
+    
+    MeetingOccurrenceException.objects.update_or_create(
+        meeting=meeting,
+        original_start=original_start,
+        defaults={'is_cancelled': False, 'start_time': start, 'end_time': end},
+    )
+    return JsonResponse({'success': True})
+
+
 @login_required
 @require_http_methods(["POST"])
 def update_status(request, pk):
@@ -200,8 +320,180 @@ def update_status(request, pk):
     status = request.POST.get('status')
     
     if status in dict(MeetingStatus.choices):
+        old_status = meeting.status
         meeting.status = status
-        meeting.save(update_fields=['status'])
+        meeting.save(update_fields=['status', 'updated_at'])
+        if status != old_status:
+            meeting_status_changed.send(
+                sender=Meeting, meeting_ids=[meeting.pk], old_status=old_status, new_status=status
+            )
         return JsonResponse({'success': True, 'status': meeting.get_status_display()})
     
     return JsonResponse({'success': False}, status=400)
+
+
+@login_required
+@require_http_methods(["GET"])
+def free_slots(request):
+    """Common free slots of several participants (and optionally a room)."""
+    try:
+        user_ids = [int(pk) for pk in request.GET.get('users', '').split(',') if pk] or [request.user.pk]
+        duration = timedelta(minutes=int(request.GET.get('duration', 60)))
+        limit = max(1, min(int(request.GET.get('limit', 5)), freebusy.MAX_SLOTS))
+        room_id = int(request.GET['room']) if request.GET.get('room') else None
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid parameters'}, status=400)
+
+    start = _local_datetime(request.GET.get('start')) if request.GET.get('start') else timezone.now()
+    if not isinstance(start, datetime):
+        return JsonResponse({'success': False, 'error': 'Invalid period'}, status=400)
+    end = _local_datetime(request.GET.get('end')) if request.GET.get('end') else start + timedelta(days=14)
+    if not isinstance(end, datetime) or end <= start or duration <= timedelta(0):
+        return JsonResponse({'success': False, 'error': 'Invalid period'}, status=400)
+    if end - start > timedelta(days=freebusy.MAX_RANGE_DAYS):
+        return JsonResponse({'success': False, 'error': 'Invalid period'}, status=400)
+
+    slots = freebusy.common_free_slots(
+        user_ids, start, end, duration,
+        room_id=room_id,
+        limit=limit,
+        working_hours=request.GET.get('working_hours', '1') != '0',
+    )
+    return JsonResponse({'success': True, 'slots': slots})
+
+
+@login_required
+@require_http_methods(["GET"])
+def find_rooms(request):
+    """
+    Free rooms for [start, end) matching ``capacity``, ``video`` and ``projector``.
+
+    When no room fits, the nearest free slots of matching rooms are suggested.
+    """
+    start = _local_datetime(request.GET.get('start'))
+    end = _local_datetime(request.GET.get('end'))
+    if not isinstance(start, datetime) or not isinstance(end, datetime) \
+            or end <= start or end - start > max_meeting_duration():
+        return JsonResponse({'success': False, 'error': 'Invalid period'}, status=400)
+    try:
+        capacity = int(request.GET.get('capacity') or 0)
+        limit = max(1, min(int(request.GET.get('limit', 5)), freebusy.MAX_SLOTS))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid parameters'}, status=400)
+    requirements = {
+        'capacity': capacity,
+        'video': request.GET.get('video') == '1',
+        'projector': request.GET.get('projector') == '1',
+    }
+
+    rooms = list(roomfinder.free_rooms(start, end, **requirements)[:limit])
+    alternatives = [] if rooms else roomfinder.alternative_slots(
+        start, end, roomfinder.matching_rooms(**requirements),
+        limit=limit,
+        working_hours=request.GET.get('working_hours', '1') != '0',
+    )
+    return JsonResponse({
+        'success': True,
+        'rooms': [roomfinder.room_dict(room) for room in rooms],
+        'alternatives': alternatives,
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def room_utilization(request):
+    """Precomputed room utilization (see compute_room_utilization) for the facilities dashboard."""
+    rows = utilization.latest()
+    return JsonResponse({
+        'success': True,
+        'period': {
+            'start': rows[0].period_start.isoformat(),
+            'end': rows[0].period_end.isoformat(),
+            'computed_at': rows[0].computed_at.isoformat(),
+        } if rows else None,
+        'rooms': [
+            {
+                'room': roomfinder.room_dict(row.room),
+                'meetings': row.meetings,
+                'booked_hours': row.booked_hours,
+                'utilization': row.utilization,
+                'no_show_ratio': row.no_show_ratio,
+                'avg_attendance': row.avg_attendance,
+                'fill_ratio': row.fill_ratio,
+                'heatmap': row.heatmap,
+            }
+            for row in sorted(rows, key=lambda row: row.utilization)
+        ],
+    })
+
+
+def _range_bound(value):
+    """A calendar range bound: a date (local midnight) or a datetime."""
+    try:
+        day = parse_date(value)
+    except ValueError:
+        return None
+    if day:
+        return grid.local_midnight(day)
+    parsed = _local_datetime(value)
+    return parsed if isinstance(parsed, datetime) else None
+
+
+@login_required
+@require_http_methods(["GET"])
+def calendar_range(request):
+    """
+    Meetings of a [start, end) range bucketed by local day, for week and month grids.
+
+    ``start``/``end`` are dates or datetimes (default: the next seven days);
+    ``room``, ``users`` (comma-separated ids) and ``status`` filter.
+    """
+    start = _range_bound(request.GET['start']) if request.GET.get('start') else \
+        grid.local_midnight(timezone.localdate())
+    end = _range_bound(request.GET['end']) if request.GET.get('end') else \
+        start and start + timedelta(days=7)
+    if not start or not end or end <= start or end - start > timedelta(days=grid.MAX_RANGE_DAYS):
+        return JsonResponse({'success': False, 'error': 'Invalid period'}, status=400)
+    try:
+        room_id = int(request.GET['room']) if request.GET.get('room') else None
+        user_ids = [int(pk) for pk in request.GET.get('users', '').split(',') if pk]
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid parameters'}, status=400)
+    statuses = [status for status in request.GET.getlist('status') if status in MeetingStatus.values]
+
+    data = grid.calendar_data(start, end, room_id=room_id, user_ids=user_ids, statuses=statuses)
+    return JsonResponse({'success': True, **data})
+
+
+@require_http_methods(["GET", "HEAD"])
+def calendar_feed(request, token):
+    """
+    iCalendar subscription of a user, authenticated by the secret token in the URL.
+
+    Polls of an unchanged feed are answered with 304 Not Modified.
+    """
+    subscription = get_object_or_404(CalendarFeed.objects.select_related('user'), token=token)
+    user = subscription.user
+    if not user.is_active:
+        return HttpResponse(status=404)
+
+    etag, last_modified = feed.feed_validators(user)
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+    if response is None:
+        response = HttpResponse(feed.render_feed(user, etag), content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="meetings.ics"'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+@require_http_methods(["GET", "POST"])
+def calendar_feed_url(request):
+    """Subscription URL of the current user's feed; POST issues a new token."""
+    subscription = CalendarFeed.for_user(request.user)
+    if request.method == 'POST':
+        subscription.regenerate()
+    url = request.build_absolute_uri(reverse('meetings:calendar_feed', args=[subscription.token]))
+    return JsonResponse({'success': True, 'url': url})
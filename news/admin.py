@@ -1,6 +1,6 @@
 """News admin configuration."""
 from django.contrib import admin
-from .models import News, NewsCategory
+from .models import FeedToken, News, NewsCategory
 
 
 @admin.register(NewsCategory)
@@ -31,3 +31,11 @@ class NewsAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(FeedToken)
+class FeedTokenAdmin(admin.ModelAdmin):
+    list_display = ('user', 'created_at')
+    search_fields = ('user__username', 'user__last_name')
+    raw_id_fields = ('user',)
+    readonly_fields = ('token', 'created_at')
@@ -0,0 +1,97 @@
+"""
+Cached news feed.
+
+The first NEWS_FEED_PAGES pages of the published feed - overall and per
+category - are kept in the cache as ordered id lists with the total
+count, together with the category list. A request for one of them costs
+a cache hit and one ``in_bulk`` of the visible items; the news cards are
+cached as rendered fragments (templates/news/news_list.html).
+
+Every cached entry carries the feed generation in its key. Publishing,
+unpublishing, pinning or editing a news item, or changing a category,
+starts a new generation (signals.py), so all lists and fragments are
+dropped at once and rebuilt on the next request. View counter updates
+leave the feed alone. Entries also expire after NEWS_FEED_CACHE_TIMEOUT,
+which bounds staleness when several processes each keep a local cache.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+
+from .models import News, NewsCategory
+
+PAGE_SIZE = 10
+GENERATION_KEY = 'news:feed:generation'
+
+
+def cached_pages():
+    return getattr(settings, 'NEWS_FEED_PAGES', 3)
+
+
+def timeout():
+    return getattr(settings, 'NEWS_FEED_CACHE_TIMEOUT', 600)
+
+
+def generation():
+    """Current feed generation (starts a new one if it was evicted)."""
+    return cache.get_or_set(GENERATION_KEY, time.time_ns, None)
+
+
+def invalidate():
+    cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+def categories(current=None):
+    key = f'news:feed:{current or generation()}:categories'
+    result = cache.get(key)
+    if result is None:
+        result = list(NewsCategory.objects.all())
+        cache.set(key, result, timeout())
+    return result
+
+
+def _ids(category_slug, current):
+    """{'ids': ids of the cached pages, 'count': number of published items}."""
+    key = f'news:feed:{current}:ids:{category_slug or ""}'
+    result = cache.get(key)
+    if result is None:
+        queryset = News.objects.filter(is_published=True)
+        if category_slug:
+            queryset = queryset.filter(category__slug=category_slug)
+        result = {
+            'ids': list(queryset.values_list('pk', flat=True)[:cached_pages() * PAGE_SIZE]),
+            'count': queryset.count(),
+        }
+        cache.set(key, result, timeout())
+    return result
+
+
+class _CachedIds:
+    """Feed ids for Paginator: the total count with only the first pages at hand."""
+
+    def __init__(self, ids, count):
+        self.ids, self.total = ids, count
+
+    def count(self):
+        return self.total
+
+    def __getitem__(self, index):
+        return self.ids[index]
+
+
+def page(page_number, category_slug=None, current=None):
+    """
+    Paginator page of the feed from the cache, or None if the page is not
+    cached (a deeper page): the caller queries the database then.
+    """
+    current = current or generation()
+    feed = _ids(category_slug, current)
+    paginator = Paginator(_CachedIds(feed['ids'], feed['count']), PAGE_SIZE)
+    news_page = paginator.get_page(page_number)
+    if news_page.number > cached_pages():
+        return None
+    items = News.objects.select_related('author', 'category').in_bulk(list(news_page.object_list))
+    news_page.object_list = [items[pk] for pk in news_page.object_list if pk in items]
+    return news_page
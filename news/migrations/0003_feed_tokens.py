@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_published_at(apps, schema_editor):
+    """Published news without a publication date get their creation date."""
+    News = apps.get_model('news', 'News')
+    News.objects.filter(is_published=True, published_at__isnull=True).update(published_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_content_hashed_uploads'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, unique=True, verbose_name='Токен')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='feed_token', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Токен RSS/Atom',
+                'verbose_name_plural': 'Токены RSS/Atom',
+            },
+        ),
+        migrations.RunPython(fill_published_at, migrations.RunPython.noop),
+    ]
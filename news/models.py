@@ -1,8 +1,15 @@
 """News app for corporate portal - Company announcements and updates."""
+import secrets
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
+from corp_portal import rendering
+from corp_portal.images import ContentHashedImageField
+
 
 class NewsCategory(models.Model):
     """Categories for news organization."""
@@ -28,7 +35,7 @@ class News(models.Model):
     excerpt = models.TextField(blank=True, help_text=_('Краткое описание'), verbose_name=_('Анонс'))
     author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='news_articles', verbose_name=_('Автор'))
     category = models.ForeignKey(NewsCategory, on_delete=models.SET_NULL, null=True, related_name='news', verbose_name=_('Категория'))
-    image = models.ImageField(upload_to='news/', null=True, blank=True, verbose_name=_('Изображение'))
+    image = ContentHashedImageField(upload_to='news/', null=True, blank=True, verbose_name=_('Изображение'))
     
     is_published = models.BooleanField(default=False, verbose_name=_('Опубликовано'))
     is_pinned = models.BooleanField(default=False, help_text=_('Закрепить вверху списка'), verbose_name=_('Закреплено'))
@@ -51,7 +58,53 @@ class News(models.Model):
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        # Feeds and the list are ordered by publication date
+        if self.is_published and self.published_at is None:
+            self.published_at = timezone.now()
+        super().save(*args, **kwargs)
+    
     def increment_views(self):
         """Increment view counter."""
         self.views = models.F('views') + 1
         self.save(update_fields=['views'])
+    
+    @cached_property
+    def rendered(self):
+        """Cached HTML and table of contents of the body (see corp_portal.rendering)."""
+        return rendering.rendered(self)
+
+
+class FeedToken(models.Model):
+    """Secret token letting scripts and feed readers read the RSS/Atom feeds (``?token=``)."""
+    
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_token',
+        verbose_name=_('Пользователь')
+    )
+    token = models.CharField(max_length=64, unique=True, verbose_name=_('Токен'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Дата создания'))
+    
+    class Meta:
+        verbose_name = _('Токен RSS/Atom')
+        verbose_name_plural = _('Токены RSS/Atom')
+    
+    def __str__(self):
+        return f"{self.user} ({self.created_at:%d.%m.%Y})"
+    
+    @staticmethod
+    def new_token():
+        return secrets.token_urlsafe(32)
+    
+    @classmethod
+    def for_user(cls, user):
+        """The user's token, created on first use."""
+        feed_token, _created = cls.objects.get_or_create(user=user, defaults={'token': cls.new_token()})
+        return feed_token
+    
+    def regenerate(self):
+        """Replace the token; feed URLs with the old one stop working."""
+        self.token = self.new_token()
+        self.save(update_fields=['token'])
@@ -0,0 +1,63 @@
+"""
+Signal handlers of news items and categories.
+
+A news body is cached under the item's ``updated_at`` (see
+corp_portal.rendering); every save moves it, so after commit the handler
+only renders the new entry and a rolled back save caches nothing. Saves
+that leave the title and text alone (view counters) are skipped. Related
+content is refreshed after commit when the text, excerpt or publication
+flag may have changed. The cached feed (feed.py) starts a new generation
+when an item enters, leaves or changes in it - pre_save notes whether an
+item being unpublished was in the feed - and when a category changes.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from corp_portal import related, rendering
+
+from . import feed
+from .models import News, NewsCategory
+
+BODY_FIELDS = {'title', 'content'}
+RELATED_FIELDS = BODY_FIELDS | {'excerpt', 'is_published'}
+# Fields shown in or ordering the feed
+FEED_FIELDS = {'title', 'excerpt', 'image', 'author', 'category', 'is_published', 'is_pinned', 'published_at'}
+
+
+def _touches_feed(update_fields):
+    return not update_fields or bool(FEED_FIELDS.intersection(update_fields))
+
+
+@receiver(pre_save, sender=News)
+def news_saving(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Unpublishing must drop the item from the feed
+    instance._was_published = bool(
+        not raw and instance.pk and not instance.is_published and _touches_feed(update_fields)
+        and News.objects.filter(pk=instance.pk, is_published=True).exists()
+    )
+
+
+@receiver(post_save, sender=News)
+def news_saved(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if not update_fields or BODY_FIELDS.intersection(update_fields):
+        transaction.on_commit(lambda: rendering.refresh(instance))
+    if not update_fields or RELATED_FIELDS.intersection(update_fields):
+        transaction.on_commit(lambda: related.update(instance))
+    if _touches_feed(update_fields) and (instance.is_published or getattr(instance, '_was_published', False)):
+        transaction.on_commit(feed.invalidate)
+
+
+@receiver(post_delete, sender=News)
+def news_deleted(sender, instance, **kwargs):
+    rendering.forget(instance)
+    if instance.is_published:
+        transaction.on_commit(feed.invalidate)
+
+
+@receiver(post_save, sender=NewsCategory)
+@receiver(post_delete, sender=NewsCategory)
+def category_changed(sender, instance, **kwargs):
+    transaction.on_commit(feed.invalidate)
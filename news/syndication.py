@@ -0,0 +1,60 @@
+"""RSS and Atom feeds of published news (see corp_portal.syndication)."""
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+
+from corp_portal.syndication import SubscriptionFeed
+
+from .models import News, NewsCategory
+
+
+class NewsFeed(SubscriptionFeed):
+    """Published news, newest first (?category=slug for one category)."""
+
+    feed_type = Rss201rev2Feed
+    description = 'Новости компании'
+    validator_fields = ('published_at', 'updated_at')
+
+    def get_object(self, request):
+        slug = request.GET.get('category')
+        return get_object_or_404(NewsCategory, slug=slug) if slug else None
+
+    def title(self, category):
+        return f'Новости: {category.name}' if category else 'Новости компании'
+
+    def link(self, category):
+        url = reverse('news:list')
+        return f'{url}?category={category.slug}' if category else url
+
+    def feed_items(self, category):
+        # Served by the (is_published, -published_at) index
+        queryset = News.objects.filter(is_published=True, published_at__isnull=False)
+        if category is not None:
+            queryset = queryset.filter(category=category)
+        return queryset.select_related('author', 'category').order_by('-published_at', '-pk')
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt or item.rendered['html']
+
+    def item_link(self, item):
+        return reverse('news:detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.published_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username if item.author else None
+
+    def item_categories(self, item):
+        return [item.category.name] if item.category else []
+
+
+class NewsAtomFeed(NewsFeed):
+    feed_type = Atom1Feed
+    subtitle = NewsFeed.description
@@ -1,10 +1,13 @@
 """News app URLs."""
 from django.urls import path
-from . import views
+from . import syndication, views
 
 app_name = 'news'
 
 urlpatterns = [
     path('', views.news_list, name='list'),
     path('<int:pk>/', views.news_detail, name='detail'),
+    path('feeds/', views.feed_urls, name='feed_urls'),
+    path('feeds/rss/', syndication.NewsFeed(), name='rss'),
+    path('feeds/atom/', syndication.NewsAtomFeed(), name='atom'),
 ]
@@ -3,37 +3,50 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.db.models import Q
-from .models import News, NewsCategory
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
+
+from corp_portal import related
+
+from . import feed
+from .models import FeedToken, News
 
 
 @login_required
 def news_list(request):
     """List all published news."""
-    queryset = News.objects.select_related('author', 'category').filter(is_published=True)
-    
-    # Category filter
     category_slug = request.GET.get('category')
-    if category_slug:
-        queryset = queryset.filter(category__slug=category_slug)
-    
-    # Search
     search_query = request.GET.get('search', '')
-    if search_query:
-        queryset = queryset.filter(
-            Q(title__icontains=search_query) |
-            Q(content__icontains=search_query)
-        )
-    
-    paginator = Paginator(queryset, 10)
     page = request.GET.get('page')
-    news_items = paginator.get_page(page)
-    categories = NewsCategory.objects.all()
-    
+    generation = feed.generation()
+
+    # The first pages come from the cached feed
+    news_items = None if search_query else feed.page(page, category_slug, generation)
+    if news_items is None:
+        queryset = News.objects.select_related('author', 'category').filter(is_published=True)
+
+        # Category filter
+        if category_slug:
+            queryset = queryset.filter(category__slug=category_slug)
+
+        # Search
+        if search_query:
+            queryset = queryset.filter(
+                Q(title__icontains=search_query) |
+                Q(content__icontains=search_query)
+            )
+
+        paginator = Paginator(queryset, feed.PAGE_SIZE)
+        news_items = paginator.get_page(page)
+
     context = {
         'news_items': news_items,
-        'categories': categories,
+        'categories': feed.categories(generation),
         'selected_category': category_slug,
         'search_query': search_query,
+        'feed_generation': generation,
+        'feed_timeout': feed.timeout(),
     }
     return render(request, 'news/news_list.html', context)
 
@@ -48,8 +61,8 @@ def news_detail(request, pk):
     )
     news_item.increment_views()
     
-    # Related news
-    related_news = News.objects.filter(
+    # Related news: precomputed by similarity, the same category until computed
+    related_news = related.related_items(news_item, 3, kind='news') or News.objects.filter(
         category=news_item.category,
         is_published=True
     ).exclude(pk=news_item.pk)[:3]
@@ -59,3 +72,18 @@ def news_detail(request, pk):
         'related_news': related_news,
     }
     return render(request, 'news/news_detail.html', context)
+
+
+@login_required
+@require_http_methods(["GET", "POST"])
+def feed_urls(request):
+    """RSS/Atom URLs with the current user's feed token; POST issues a new token."""
+    feed_token = FeedToken.for_user(request.user)
+    if request.method == 'POST':
+        feed_token.regenerate()
+    return JsonResponse({'success': True, 'feeds': {
+        name: request.build_absolute_uri(reverse(url_name)) + f'?token={feed_token.token}'
+        for name, url_name in [
+            ('news_rss', 'news:rss'), ('news_atom', 'news:atom'), ('wiki_rss', 'wiki:rss'), ('wiki_atom', 'wiki:atom'),
+        ]
+    }})
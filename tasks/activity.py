@@ -0,0 +1,154 @@
+"""
+Task activity log queries: per-task timelines and time-in-status.
+
+Status events are read with one ordered query over the
+(task, field, created_at) index and turned into NumPy arrays; durations are
+differences between consecutive events of the same task, summed per status
+with ``bincount``.
+"""
+import numpy as np
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .models import STATUS_CODES, Priority, Task, TaskEvent, TaskEventField, TaskStatus
+
+HOUR = 3600.0
+OPEN_STATUSES = [STATUS_CODES[s] for s in (TaskStatus.NEW, TaskStatus.IN_PROGRESS, TaskStatus.REVIEW)]
+STATUS_LABELS = dict(TaskStatus.choices)
+PRIORITY_LABELS = dict(Priority.choices)
+
+
+def load_status_history(tasks):
+    """
+    Load creation/completion times, current status and status events of ``tasks``.
+
+    Returns a dict of NumPy arrays; events are sorted by (task, time).
+    """
+    task_rows = list(tasks.order_by('pk').values_list('pk', 'created_at', 'status', 'completed_at'))
+    event_rows = list(TaskEvent.objects.filter(
+        field=TaskEventField.STATUS,
+        task__in=tasks.values('pk'),
+    ).order_by('task_id', 'created_at', 'pk').values_list(
+        'task_id', 'created_at', 'old_value', 'new_value'
+    ))
+
+    def column(rows, index, dtype, convert=lambda value: value):
+        return np.fromiter((convert(row[index]) for row in rows), dtype=dtype, count=len(rows))
+
+    def timestamp(value):
+        return value.timestamp() if value else np.nan
+
+    def code(value):
+        return value or 0
+
+    return {
+        'task_ids': column(task_rows, 0, np.int64),
+        'task_created': column(task_rows, 1, np.float64, timestamp),
+        'task_status': column(task_rows, 2, np.int16, lambda value: STATUS_CODES.get(value, 0)),
+        'task_completed': column(task_rows, 3, np.float64, timestamp),
+        'event_task': column(event_rows, 0, np.int64),
+        'event_time': column(event_rows, 1, np.float64, timestamp),
+        'event_old': column(event_rows, 2, np.int16, code),
+        'event_new': column(event_rows, 3, np.int16, code),
+    }
+
+
+def time_in_status(history, now_ts):
+    """
+    Total seconds spent in each status code, summed over all tasks.
+
+    Every event closes the interval of its ``old_value`` status that began at
+    the previous event of the same task (or at task creation). Tasks still
+    open also accumulate time in their current status up to ``now_ts``.
+    """
+    size = max(STATUS_CODES.values()) + 1
+    if not history['task_ids'].size:
+        return np.zeros(size)
+
+    task_index = np.searchsorted(history['task_ids'], history['event_task'])
+    event_time = history['event_time']
+
+    starts = np.empty_like(event_time)
+    if event_time.size:
+        starts[0] = history['task_created'][task_index[0]]
+        first_of_task = np.r_[True, task_index[1:] != task_index[:-1]]
+        starts[1:] = event_time[:-1]
+        starts[first_of_task] = history['task_created'][task_index[first_of_task]]
+    totals = np.bincount(
+        history['event_old'], weights=event_time - starts, minlength=size
+    )
+
+    # The current status of open tasks, since their last event
+    last_change = history['task_created'].copy()
+    if event_time.size:
+        last_of_task = np.r_[task_index[1:] != task_index[:-1], True]
+        last_change[task_index[last_of_task]] = event_time[last_of_task]
+    is_open = np.isin(history['task_status'], OPEN_STATUSES)
+    totals += np.bincount(
+        history['task_status'][is_open],
+        weights=now_ts - last_change[is_open],
+        minlength=size,
+    )
+    return totals
+
+
+def cycle_times(history):
+    """
+    Seconds from first entering "in progress" to completion, per task.
+
+    Tasks that were never moved to "in progress" are skipped.
+    """
+    mask = history['event_new'] == STATUS_CODES[TaskStatus.IN_PROGRESS]
+    started_tasks, first = np.unique(history['event_task'][mask], return_index=True)
+    started_at = history['event_time'][mask][first]
+    completed = history['task_completed'][np.searchsorted(history['task_ids'], started_tasks)]
+    cycle = completed - started_at
+    return cycle[~np.isnan(cycle) & (cycle >= 0)]
+
+
+def hours_by_status(totals):
+    """Convert time_in_status() totals into {status: hours}."""
+    return {
+        status: round(float(totals[code]) / HOUR, 2)
+        for status, code in STATUS_CODES.items()
+        if totals[code]
+    }
+
+
+def task_timeline(task):
+    """Decoded activity log of one task with time spent in each status."""
+    events = list(task.events.all())
+    user_ids = {
+        value for event in events if event.field == TaskEventField.ASSIGNEE
+        for value in (event.old_value, event.new_value) if value
+    }
+    users = User.objects.in_bulk(user_ids)
+
+    def display(field, value):
+        value = TaskEvent.decode(field, value)
+        if value is None:
+            return None
+        if field == TaskEventField.STATUS:
+            return str(STATUS_LABELS.get(value, value))
+        if field == TaskEventField.PRIORITY:
+            return str(PRIORITY_LABELS.get(value, value))
+        user = users.get(value)
+        return (user.get_full_name() or user.username) if user else str(value)
+
+    history = load_status_history(Task.objects.filter(pk=task.pk))
+    return {
+        'events': [
+            {
+                'field': TaskEventField(event.field).name.lower(),
+                'old': TaskEvent.decode(event.field, event.old_value),
+                'new': TaskEvent.decode(event.field, event.new_value),
+                'old_display': display(event.field, event.old_value),
+                'new_display': display(event.field, event.new_value),
+                'at': event.created_at.isoformat(),
+            }
+            for event in events
+        ],
+        'time_in_status_hours': hours_by_status(
+            time_in_status(history, timezone.now().timestamp())
+        ),
+    }
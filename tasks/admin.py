@@ -1,11 +1,11 @@
 """Tasks app admin configuration."""
 from django.contrib import admin
-from .models import Task, TaskComment, TaskAttachment
+from .models import Task, TaskComment, TaskAttachment, TaskEvent
 
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'assignee', 'status', 'priority', 'due_date', 'created_at')
+    list_display = ('title', 'author', 'assignee', 'status', 'priority', 'due_date', 'comment_count', 'attachment_count', 'created_at')
     list_filter = ('status', 'priority', 'due_date', 'created_at')
     search_fields = ('title', 'description', 'tags')
     raw_id_fields = ('author', 'assignee', 'parent_task')
@@ -27,3 +27,11 @@ class TaskAttachmentAdmin(admin.ModelAdmin):
     list_filter = ('uploaded_at',)
     raw_id_fields = ('task', 'uploaded_by')
     date_hierarchy = 'uploaded_at'
+
+
+@admin.register(TaskEvent)
+class TaskEventAdmin(admin.ModelAdmin):
+    list_display = ('task', 'field', 'old_value', 'new_value', 'created_at')
+    list_filter = ('field', 'created_at')
+    raw_id_fields = ('task',)
+    date_hierarchy = 'created_at'
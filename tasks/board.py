@@ -0,0 +1,147 @@
+"""
+Kanban board queries for tasks.
+
+Columns are built from a single windowed query: ROW_NUMBER() partitioned by
+status limits every column to its top N cards, and COUNT() over the same
+partition gives exact per-column totals. Further pages of one column are
+fetched with a keyset cursor over (created_at, id), which matches the
+(status, -created_at) index.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import Task, TaskEvent, TaskStatus
+from .pagination import NEWEST_FIRST, encode_cursor, keyset_page
+
+DEFAULT_COLUMN_SIZE = 20
+MAX_COLUMN_SIZE = 100
+
+CARD_FIELDS = (
+    'id',
+    'title',
+    'status',
+    'priority',
+    'due_date',
+    'progress',
+    'created_at',
+    'comment_count',
+    'attachment_count',
+    'assignee_id',
+    'assignee__username',
+    'assignee__first_name',
+    'assignee__last_name',
+)
+
+
+def clamp_column_size(value, default=DEFAULT_COLUMN_SIZE):
+    """Parse a requested column size and keep it within sane bounds."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_COLUMN_SIZE))
+
+
+def serialize_card(row):
+    """Convert a values() row into the JSON shape used by the board."""
+    assignee = None
+    if row['assignee_id']:
+        full_name = f"{row['assignee__first_name']} {row['assignee__last_name']}".strip()
+        assignee = {
+            'id': row['assignee_id'],
+            'username': row['assignee__username'],
+            'name': full_name or row['assignee__username'],
+        }
+    due_date = row['due_date']
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'priority': row['priority'],
+        'due_date': due_date.isoformat() if due_date else None,
+        'is_overdue': bool(
+            due_date and row['status'] != TaskStatus.DONE and due_date < timezone.now()
+        ),
+        'progress': row['progress'],
+        'comment_count': row['comment_count'],
+        'attachment_count': row['attachment_count'],
+        'assignee': assignee,
+    }
+
+
+def build_board(queryset, per_column=DEFAULT_COLUMN_SIZE):
+    """
+    Return every status column with its top ``per_column`` cards.
+
+    The whole board is fetched in one query regardless of how many tasks
+    each column holds.
+    """
+    rows = queryset.annotate(
+        column_row=Window(
+            RowNumber(),
+            partition_by=[F('status')],
+            order_by=NEWEST_FIRST,
+        ),
+        column_total=Window(Count('id'), partition_by=[F('status')]),
+    ).filter(column_row__lte=per_column).order_by('status', 'column_row').values(
+        *CARD_FIELDS, 'column_total'
+    )
+
+    columns = {
+        value: {'status': value, 'label': str(label), 'count': 0, 'cards': [], 'next_cursor': None}
+        for value, label in TaskStatus.choices
+    }
+    last_rows = {}
+    for row in rows:
+        column = columns.get(row['status'])
+        if column is None:
+            continue
+        column['count'] = row['column_total']
+        column['cards'].append(serialize_card(row))
+        last_rows[row['status']] = row
+
+    for status, column in columns.items():
+        if column['count'] > len(column['cards']):
+            last = last_rows[status]
+            column['next_cursor'] = encode_cursor(last['created_at'], last['id'])
+
+    return list(columns.values())
+
+
+def column_page(queryset, status, cursor=None, limit=DEFAULT_COLUMN_SIZE):
+    """Return the next page of cards of a single column after ``cursor``."""
+    rows, next_cursor = keyset_page(
+        queryset.filter(status=status).values(*CARD_FIELDS), cursor=cursor, limit=limit
+    )
+
+    return {
+        'status': status,
+        'cards': [serialize_card(row) for row in rows],
+        'next_cursor': next_cursor,
+    }
+
+
+def move_task(task_id, status, expected_status=None):
+    """
+    Move a card to another column with a single atomic UPDATE.
+
+    The update only applies while the task is still in ``expected_status``
+    (the current column if not given), so concurrent moves cannot silently
+    overwrite each other; the transition is logged in the same transaction.
+    Returns True if a row was updated.
+    """
+    now = timezone.now()
+    changes = {'status': status, 'updated_at': now}
+    if status == TaskStatus.DONE:
+        changes.update(completed_at=now, progress=100)
+
+    with transaction.atomic():
+        if not expected_status:
+            expected_status = Task.objects.filter(pk=task_id).values_list('status', flat=True).first()
+            if expected_status is None:
+                return False
+        updated = Task.objects.filter(pk=task_id, status=expected_status).update(**changes)
+        if updated:
+            TaskEvent.log_changes(task_id, {'status': expected_status}, {'status': status}, timestamp=now)
+    return updated == 1
@@ -0,0 +1,49 @@
+"""Task list export definition."""
+from django.utils.translation import gettext_lazy as _
+
+from exports.datasets import ExportDataset, full_name
+from .filters import filter_tasks, sort_tasks
+from .models import Task, TaskStatus, Priority
+
+STATUS_LABELS = dict(TaskStatus.choices)
+PRIORITY_LABELS = dict(Priority.choices)
+
+
+def _queryset(params, user):
+    queryset = filter_tasks(Task.objects.all(), params, user)
+    return sort_tasks(queryset, params.get('sort', '-created_at'))
+
+
+def _row(values):
+    (pk, title, status, priority, assignee_last, assignee_first,
+     author_last, author_first, due_date, completed_at, created_at) = values
+    return [
+        pk,
+        title,
+        str(STATUS_LABELS.get(status, status)),
+        str(PRIORITY_LABELS.get(priority, priority)),
+        full_name(assignee_last, assignee_first),
+        full_name(author_last, author_first),
+        due_date,
+        completed_at,
+        created_at,
+    ]
+
+
+TASKS = ExportDataset(
+    name='tasks',
+    title=_('Задачи'),
+    headers=[
+        'ID', _('Название'), _('Статус'), _('Приоритет'), _('Исполнитель'),
+        _('Автор'), _('Срок выполнения'), _('Дата завершения'), _('Дата создания'),
+    ],
+    fields=[
+        'id', 'title', 'status', 'priority',
+        'assignee__last_name', 'assignee__first_name',
+        'author__last_name', 'author__first_name',
+        'due_date', 'completed_at', 'created_at',
+    ],
+    get_queryset=_queryset,
+    format_row=_row,
+    widths=[1, 6, 2, 2, 3, 3, 2, 2, 2],
+)
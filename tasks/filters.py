@@ -0,0 +1,45 @@
+"""Query-string filters shared by the task list, board and exports."""
+from django.db.models import Q
+
+
+def filter_tasks(queryset, params, user, by_status=True):
+    """Apply the task list filters from ``params`` (request.GET) to a queryset."""
+    # Filter by status
+    status = params.get('status')
+    if status and by_status:
+        queryset = queryset.filter(status=status)
+
+    # Filter by priority
+    priority = params.get('priority')
+    if priority:
+        queryset = queryset.filter(priority=priority)
+
+    # Filter by assignee
+    assignee_id = params.get('assignee')
+    if assignee_id:
+        queryset = queryset.filter(assignee_id=assignee_id)
+    else:
+        # Show only tasks assigned to current user or created by user
+        queryset = queryset.filter(
+            Q(assignee=user) | Q(author=user)
+        )
+
+    # Search
+    search_query = params.get('search', '')
+    if search_query:
+        queryset = queryset.filter(
+            Q(title__icontains=search_query) |
+            Q(description__icontains=search_query) |
+            Q(tags__icontains=search_query)
+        )
+
+    return queryset
+
+
+def sort_tasks(queryset, sort_by):
+    """Order tasks by one of the sort keys offered on the task list."""
+    if sort_by in ['due_date', 'priority', 'status', 'created_at']:
+        return queryset.order_by(sort_by)
+    elif sort_by == '-due_date':
+        return queryset.order_by('-due_date')
+    return queryset.order_by('-created_at')
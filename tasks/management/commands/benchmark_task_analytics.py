@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from tasks.analytics import compute_metrics, to_columns
+from tasks.models import STATUS_CODES
+
+DAY = 24 * 3600.0
+
+
+def _nullable(values):
+    return [None if np.isnan(value) else value for value in values.tolist()]
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время загрузки колонок и расчета аналитики задач на синтетическом наборе данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1_000_000, help='Количество синтетических задач')
+        parser.add_argument('--days', type=int, default=90, help='Длина периода в днях')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество прогонов')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        size = options['size']
+        rng = np.random.default_rng(options['seed'])
+        now = time.time()
+        since = now - options['days'] * DAY
+
+        created = now - rng.uniform(0, 2 * options['days'] * DAY, size)
+        status = rng.choice(list(STATUS_CODES.values()), size).astype(np.int8)
+        lead = rng.lognormal(mean=np.log(3 * DAY), sigma=1.0, size=size)
+        completed = np.where(
+            status == STATUS_CODES['done'], np.minimum(created + lead, now), np.nan
+        )
+        due = np.where(rng.random(size) < 0.7, created + rng.uniform(DAY, 30 * DAY, size), np.nan)
+        department = rng.integers(0, 50, size)
+        # Rows as load_columns() gets them from values_list: None for missing values
+        names = {code: name for name, code in STATUS_CODES.items()}
+        rows = list(zip(
+            created.tolist(),
+            _nullable(completed),
+            _nullable(due),
+            [names[code] for code in status.tolist()],
+            rng.integers(1, 2000, size).tolist(),
+            [value or None for value in department.tolist()],
+        ))
+
+        load_timings, timings = [], []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            columns = to_columns(rows)
+            loaded = time.perf_counter()
+            metrics = compute_metrics(columns, since, now, utc_offset=3 * 3600.0)
+            load_timings.append((loaded - started) * 1000)
+            timings.append((time.perf_counter() - loaded) * 1000)
+
+        self.stdout.write(f"Задач: {size}, период: {options['days']} дн.")
+        self.stdout.write(
+            f"Загрузка колонок: min {min(load_timings):.1f} мс, median {np.median(load_timings):.1f} мс"
+        )
+        self.stdout.write(f"Время расчета: min {min(timings):.1f} мс, median {np.median(timings):.1f} мс")
+        self.stdout.write(self.style.SUCCESS(
+            f"Lead time p50/p95: {metrics['lead_time_hours']['p50']} / "
+            f"{metrics['lead_time_hours']['p95']} ч"
+        ))
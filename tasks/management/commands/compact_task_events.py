@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from settings.models import SystemSetting
+from tasks.models import TaskEvent, TaskStatus
+
+# SystemSetting holding the creation time up to which events were merged
+WATERMARK_KEY = 'task_events_compacted_until'
+# Covers events committed after the run started but stamped before it
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+class Command(BaseCommand):
+    help = 'Сжимает журнал событий задач: удаляет устаревшие записи и схлопывает быстрые переключения'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=settings.TASK_EVENT_RETENTION_DAYS,
+            help='Удалять историю закрытых задач, не изменявшихся дольше этого срока',
+        )
+        parser.add_argument(
+            '--merge-seconds',
+            type=int,
+            default=60,
+            help='Изменения одного поля с интервалом меньше этого схлопываются в одно',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, что будет сделано')
+
+    def handle(self, *args, **options):
+        expired = self.purge_expired(options)
+        merged = self.merge_flapping(options)
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} устаревших событий: {expired}, схлопнутых событий: {merged}'
+        ))
+
+    def purge_expired(self, options):
+        """
+        Drop the history of tasks closed longer than the retention period.
+
+        Status-only saves do not touch ``updated_at``, so a task counts as
+        closed since its completion and its newest event, whichever is later.
+        """
+        cutoff = timezone.now() - timedelta(days=options['retention_days'])
+        expired = TaskEvent.objects.filter(
+            task__status__in=[TaskStatus.DONE, TaskStatus.CANCELLED],
+            task__updated_at__lt=cutoff,
+        ).exclude(
+            task__completed_at__gte=cutoff,
+        ).exclude(
+            Exists(TaskEvent.objects.filter(task_id=OuterRef('task_id'), created_at__gte=cutoff)),
+        ).values_list('pk', flat=True)
+
+        total = 0
+        while True:
+            batch = list(expired[:options['batch_size']])
+            if not batch:
+                return total
+            total += len(batch)
+            if options['dry_run']:
+                return expired.count()
+            TaskEvent.objects.filter(pk__in=batch).delete()
+
+    def merge_flapping(self, options):
+        """
+        Collapse runs of changes of one field made within ``merge_seconds``.
+
+        A run A→B→C becomes a single A→C event at the time of the first
+        change; a run that ends where it started (A→B→A) is removed entirely.
+        Only events since the previous run (less one window, for runs across
+        it) are read, ``batch_size`` tasks at a time, each batch written
+        before the next is read.
+        """
+        window = timedelta(seconds=options['merge_seconds'])
+        started = timezone.now()
+        events = TaskEvent.objects.order_by()
+        watermark = SystemSetting.get_value(WATERMARK_KEY)
+        if watermark:
+            events = events.filter(created_at__gte=parse_datetime(watermark) - window)
+        task_ids = events.values_list('task_id', flat=True).distinct().order_by('task_id')
+
+        merged, last_task = 0, None
+        while True:
+            page = task_ids.filter(task_id__gt=last_task) if last_task is not None else task_ids
+            batch = list(page[:options['batch_size']])
+            if not batch:
+                break
+            last_task = batch[-1]
+            to_update, to_delete = [], []
+            merged += self.collapse_runs(
+                events.filter(task_id__in=batch).order_by('task_id', 'field', 'created_at', 'pk').values_list(
+                    'pk', 'task_id', 'field', 'old_value', 'new_value', 'created_at'
+                ),
+                window, to_update, to_delete,
+            )
+            if not options['dry_run']:
+                with transaction.atomic():
+                    TaskEvent.objects.bulk_update(to_update, ['new_value'])
+                    TaskEvent.objects.filter(pk__in=to_delete).delete()
+
+        if not options['dry_run']:
+            SystemSetting.set_value(
+                WATERMARK_KEY, (started - WATERMARK_OVERLAP).isoformat(), 'Журнал задач схлопнут до этого времени'
+            )
+        return merged
+
+    def collapse_runs(self, events, window, to_update, to_delete):
+        """Fill ``to_update``/``to_delete`` for the runs in ``events``. Returns the number of merged events."""
+        merged = 0
+        run = []
+
+        def close_run():
+            nonlocal merged
+            if len(run) > 1:
+                first, last = run[0], run[-1]
+                if first[3] == last[4]:
+                    to_delete.extend(event[0] for event in run)
+                else:
+                    to_delete.extend(event[0] for event in run[1:])
+                    to_update.append(TaskEvent(pk=first[0], new_value=last[4]))
+                merged += len(run) - 1
+
+        for event in events:
+            if run and (event[1], event[2]) == (run[-1][1], run[-1][2]) and event[5] - run[-1][5] <= window:
+                run.append(event)
+                continue
+            close_run()
+            run = [event]
+        close_run()
+        return merged
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:03
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count_subquery(model):
+    counts = model.objects.filter(task=OuterRef('pk')).order_by().values('task').annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskComment = apps.get_model('tasks', 'TaskComment')
+    TaskAttachment = apps.get_model('tasks', 'TaskAttachment')
+    Task.objects.update(
+        comment_count=_count_subquery(TaskComment),
+        attachment_count=_count_subquery(TaskAttachment),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='attachment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Вложения'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментарии'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.PositiveSmallIntegerField(choices=[(1, 'Статус'), (2, 'Исполнитель'), (3, 'Приоритет')], verbose_name='Поле')),
+                ('old_value', models.IntegerField(blank=True, null=True, verbose_name='Старое значение')),
+                ('new_value', models.IntegerField(blank=True, null=True, verbose_name='Новое значение')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время')),
+                ('task', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='tasks.task', verbose_name='Задача')),
+            ],
+            options={
+                'verbose_name': 'Событие задачи',
+                'verbose_name_plural': 'События задач',
+                'ordering': ['task', 'created_at'],
+                'indexes': [models.Index(fields=['task', 'field', 'created_at'], name='tasks_taske_task_id_ddd3e4_idx'), models.Index(fields=['created_at'], name='tasks_taske_created_6015cf_idx')],
+            },
+        ),
+    ]
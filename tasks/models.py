@@ -2,7 +2,7 @@
 Tasks app models - Task management and tracking.
 Optimized with proper indexing, relationships, and modern Django features.
 """
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -87,6 +87,9 @@ class Task(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(100)],
         verbose_name=_('Прогресс (%)')
     )
+    # Denormalized counters kept up to date by tasks.signals
+    comment_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Комментарии'))
+    attachment_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Вложения'))
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Дата создания'))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Дата обновления'))
     
@@ -112,10 +115,13 @@ class Task(models.Model):
     
     def complete(self):
         """Mark task as completed."""
+        before = TaskEvent.snapshot(self)
         self.status = TaskStatus.DONE
         self.completed_at = timezone.now()
         self.progress = 100
-        self.save(update_fields=['status', 'completed_at', 'progress'])
+        with transaction.atomic():
+            self.save(update_fields=['status', 'completed_at', 'progress'])
+            TaskEvent.log_changes(self.pk, before, {'status': self.status})
 
 
 class TaskComment(models.Model):
@@ -177,3 +183,121 @@ class TaskAttachment(models.Model):
     
     def __str__(self):
         return f"{self.file.name} ({self.task.title})"
+
+
+class TaskEventField(models.IntegerChoices):
+    """Task fields whose changes are recorded in the activity log."""
+    STATUS = 1, _('Статус')
+    ASSIGNEE = 2, _('Исполнитель')
+    PRIORITY = 3, _('Приоритет')
+
+
+# Codes stored in TaskEvent: never renumber, give a new value the next free code
+STATUS_CODES = {
+    TaskStatus.NEW: 1,
+    TaskStatus.IN_PROGRESS: 2,
+    TaskStatus.REVIEW: 3,
+    TaskStatus.DONE: 4,
+    TaskStatus.CANCELLED: 5,
+}
+PRIORITY_CODES = {
+    Priority.LOW: 1,
+    Priority.MEDIUM: 2,
+    Priority.HIGH: 3,
+    Priority.CRITICAL: 4,
+}
+STATUS_BY_CODE = {code: value for value, code in STATUS_CODES.items()}
+PRIORITY_BY_CODE = {code: value for value, code in PRIORITY_CODES.items()}
+
+
+class TaskEvent(models.Model):
+    """
+    Append-only log of task field transitions.
+
+    Rows are kept compact: the field is a small integer code and old/new
+    values are stored as integers (status/priority codes or a user id).
+    """
+
+    TRACKED_FIELDS = {
+        'status': TaskEventField.STATUS,
+        'assignee_id': TaskEventField.ASSIGNEE,
+        'priority': TaskEventField.PRIORITY,
+    }
+
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='events',
+        db_index=False,
+        verbose_name=_('Задача')
+    )
+    field = models.PositiveSmallIntegerField(choices=TaskEventField.choices, verbose_name=_('Поле'))
+    old_value = models.IntegerField(null=True, blank=True, verbose_name=_('Старое значение'))
+    new_value = models.IntegerField(null=True, blank=True, verbose_name=_('Новое значение'))
+    created_at = models.DateTimeField(default=timezone.now, verbose_name=_('Время'))
+
+    class Meta:
+        ordering = ['task', 'created_at']
+        verbose_name = _('Событие задачи')
+        verbose_name_plural = _('События задач')
+        indexes = [
+            models.Index(fields=['task', 'field', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"#{self.task_id} {self.get_field_display()}: {self.old_value} → {self.new_value}"
+
+    @classmethod
+    def encode(cls, field, value):
+        """Encode a raw field value into the integer stored in the log."""
+        if value in (None, ''):
+            return None
+        if field == TaskEventField.STATUS:
+            return STATUS_CODES.get(value)
+        if field == TaskEventField.PRIORITY:
+            return PRIORITY_CODES.get(value)
+        return int(value)
+
+    @classmethod
+    def decode(cls, field, value):
+        """Decode a stored integer back into the raw field value."""
+        if value is None:
+            return None
+        if field == TaskEventField.STATUS:
+            return STATUS_BY_CODE.get(value)
+        if field == TaskEventField.PRIORITY:
+            return PRIORITY_BY_CODE.get(value)
+        return value
+
+    @classmethod
+    def snapshot(cls, task):
+        """Current values of the tracked fields of ``task``."""
+        return {name: getattr(task, name) for name in cls.TRACKED_FIELDS}
+
+    @classmethod
+    def log_changes(cls, task_id, before, after, timestamp=None):
+        """
+        Record the differences between two snapshots with one bulk INSERT.
+
+        Call inside the transaction that saves the task so the log and the
+        task never disagree.
+        """
+        timestamp = timestamp or timezone.now()
+        events = []
+        for name, field in cls.TRACKED_FIELDS.items():
+            if name not in after:
+                continue
+            old_value = cls.encode(field, before.get(name))
+            new_value = cls.encode(field, after[name])
+            if old_value != new_value:
+                events.append(cls(
+                    task_id=task_id,
+                    field=field,
+                    old_value=old_value,
+                    new_value=new_value,
+                    created_at=timestamp,
+                ))
+        if events:
+            cls.objects.bulk_create(events)
+        return events
@@ -0,0 +1,63 @@
+"""
+Keyset (cursor) pagination over ``(created_at, id)`` in descending order.
+
+Cursors are opaque URL-safe strings; unlike OFFSET pagination the cost of a
+page does not grow with its depth, and rows inserted meanwhile do not shift
+pages.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import F, Q
+
+NEWEST_FIRST = (F('created_at').desc(), F('id').desc())
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded."""
+
+
+def encode_cursor(created_at, pk):
+    """Encode the position of the last row shown."""
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor() into (created_at, id)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(str(e)) from e
+
+
+def older_than(queryset, cursor):
+    """Restrict a queryset to rows that come after ``cursor`` (newest first)."""
+    if not cursor:
+        return queryset
+    created_at, pk = decode_cursor(cursor)
+    return queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+
+def keyset_page(queryset, cursor=None, limit=20):
+    """
+    Return ``(rows, next_cursor)`` for one page of ``queryset``, newest first.
+
+    ``queryset`` may be a values() queryset; rows must expose ``created_at``
+    and ``id`` either as attributes or as keys.
+    """
+    rows = list(older_than(queryset, cursor).order_by(*NEWEST_FIRST)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last['created_at'], last['id'])
+        else:
+            next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
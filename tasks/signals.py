@@ -0,0 +1,42 @@
+"""
+Signal handlers keeping Task.comment_count and Task.attachment_count in sync.
+
+Counters are changed with ``F()`` expressions in a single UPDATE, so
+concurrent comments never lose increments.
+"""
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Task, TaskAttachment, TaskComment
+
+
+def _adjust(task_id, field, delta):
+    if delta > 0:
+        value = F(field) + delta
+    else:
+        value = Greatest(F(field) + delta, 0)
+    Task.objects.filter(pk=task_id).update(**{field: value})
+
+
+@receiver(post_save, sender=TaskComment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        _adjust(instance.task_id, 'comment_count', 1)
+
+
+@receiver(post_delete, sender=TaskComment)
+def comment_deleted(sender, instance, **kwargs):
+    _adjust(instance.task_id, 'comment_count', -1)
+
+
+@receiver(post_save, sender=TaskAttachment)
+def attachment_created(sender, instance, created, **kwargs):
+    if created:
+        _adjust(instance.task_id, 'attachment_count', 1)
+
+
+@receiver(post_delete, sender=TaskAttachment)
+def attachment_deleted(sender, instance, **kwargs):
+    _adjust(instance.task_id, 'attachment_count', -1)
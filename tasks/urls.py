@@ -9,5 +9,11 @@ urlpatterns = [
     path('<int:pk>/', views.task_detail, name='detail'),
     path('create/', views.create_task, name='create'),
     path('<int:pk>/edit/', views.edit_task, name='edit'),
+    path('<int:pk>/comments/', views.task_comments, name='comments'),
+    path('<int:pk>/timeline/', views.task_timeline, name='timeline'),
     path('<int:pk>/update-status/', views.update_status, name='update_status'),
+    path('board/', views.board, name='board'),
+    path('board/<str:status>/', views.board_column, name='board_column'),
+    path('<int:pk>/move/', views.board_move, name='board_move'),
+    path('analytics/', views.analytics_report, name='analytics'),
 ]
@@ -2,58 +2,34 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.db.models import Q, Count, Prefetch
+from django.db.models import Count, Prefetch
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
+from django.db import transaction
 from django.utils import timezone
 
-from .models import Task, TaskStatus, Priority, TaskComment, TaskAttachment
+from .models import Task, TaskStatus, Priority, TaskComment, TaskAttachment, TaskEvent
+from .filters import filter_tasks, sort_tasks
+from .pagination import InvalidCursor, keyset_page
+from . import activity, analytics, board as kanban
+
+COMMENTS_PAGE_SIZE = 20
 
 
 @login_required
 def task_list(request):
     """List all tasks with filtering and pagination."""
-    queryset = Task.objects.select_related(
+    queryset = filter_tasks(Task.objects.select_related(
         'author', 'assignee', 'parent_task'
-    ).prefetch_related('subtasks')
+    ).prefetch_related('subtasks'), request.GET, request.user)
 
-    # Filter by status
     status = request.GET.get('status')
-    if status:
-        queryset = queryset.filter(status=status)
-
-    # Filter by priority
     priority = request.GET.get('priority')
-    if priority:
-        queryset = queryset.filter(priority=priority)
-
-    # Filter by assignee
-    assignee_id = request.GET.get('assignee')
-    if assignee_id:
-        queryset = queryset.filter(assignee_id=assignee_id)
-    else:
-        # Show only tasks assigned to current user or created by user
-        queryset = queryset.filter(
-            Q(assignee=request.user) | Q(author=request.user)
-        )
-
-    # Search
     search_query = request.GET.get('search', '')
-    if search_query:
-        queryset = queryset.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(tags__icontains=search_query)
-        )
 
     # Sort
     sort_by = request.GET.get('sort', '-created_at')
-    if sort_by in ['due_date', 'priority', 'status', 'created_at']:
-        queryset = queryset.order_by(sort_by)
-    elif sort_by == '-due_date':
-        queryset = queryset.order_by('-due_date')
-    else:
-        queryset = queryset.order_by('-created_at')
+    queryset = sort_tasks(queryset, sort_by)
 
     paginator = Paginator(queryset, 20)
     page = request.GET.get('page')
@@ -73,13 +49,12 @@ def task_list(request):
 
 @login_required
 def task_detail(request, pk):
-    """Task detail view."""
+    """Task detail view with the latest page of comments."""
     task = get_object_or_404(
         Task.objects.select_related(
             'author', 'assignee', 'parent_task'
         ).prefetch_related(
             'subtasks',
-            'comments__author',
             'attachments'
         ),
         pk=pk
@@ -87,21 +62,64 @@ def task_detail(request, pk):
 
     # Add comment
     if request.method == 'POST' and request.POST.get('comment'):
-        TaskComment.objects.create(
-            task=task,
-            author=request.user,
-            content=request.POST.get('comment')
-        )
+        with transaction.atomic():
+            TaskComment.objects.create(
+                task=task,
+                author=request.user,
+                content=request.POST.get('comment')
+            )
         return redirect('tasks:detail', pk=pk)
 
+    comments, older_comments_cursor = keyset_page(
+        task.comments.select_related('author'), limit=COMMENTS_PAGE_SIZE
+    )
+
     context = {
         'task': task,
+        'comments': comments[::-1],
+        'older_comments_cursor': older_comments_cursor,
         'statuses': TaskStatus.choices,
         'priorities': Priority.choices,
     }
     return render(request, 'tasks/task_detail.html', context)
 
 
+@login_required
+@require_http_methods(["GET"])
+def task_comments(request, pk):
+    """Load older comments of a task ("load older" button)."""
+    task = get_object_or_404(Task, pk=pk)
+    try:
+        comments, next_cursor = keyset_page(
+            task.comments.select_related('author'),
+            cursor=request.GET.get('before'),
+            limit=COMMENTS_PAGE_SIZE,
+        )
+    except InvalidCursor:
+        return JsonResponse({'success': False, 'error': 'Invalid cursor'}, status=400)
+
+    return JsonResponse({
+        'comments': [
+            {
+                'id': comment.pk,
+                'author': comment.author.get_full_name() or comment.author.username,
+                'content': comment.content,
+                'created_at': comment.created_at.isoformat(),
+            }
+            for comment in reversed(comments)
+        ],
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def task_timeline(request, pk):
+    """Status, assignee and priority history of a task."""
+    task = get_object_or_404(Task, pk=pk)
+    return JsonResponse(activity.task_timeline(task))
+
+
 @login_required
 @require_http_methods(["POST"])
 def update_status(request, pk):
@@ -110,11 +128,14 @@ def update_status(request, pk):
     
     status = request.POST.get('status')
     if status in dict(TaskStatus.choices):
+        before = TaskEvent.snapshot(task)
         task.status = status
         if status == TaskStatus.DONE:
             task.completed_at = timezone.now()
             task.progress = 100
-        task.save(update_fields=['status', 'completed_at', 'progress'])
+        with transaction.atomic():
+            task.save(update_fields=['status', 'completed_at', 'progress'])
+            TaskEvent.log_changes(task.pk, before, {'status': status})
         return JsonResponse({'success': True, 'status': task.get_status_display()})
     
     return JsonResponse({'success': False}, status=400)
@@ -147,16 +168,79 @@ def edit_task(request, pk):
     task = get_object_or_404(Task, pk=pk)
     
     if request.method == 'POST':
+        before = TaskEvent.snapshot(task)
         task.title = request.POST.get('title')
         task.description = request.POST.get('description')
         task.assignee_id = request.POST.get('assignee')
         task.priority = request.POST.get('priority', Priority.MEDIUM)
         task.due_date = request.POST.get('due_date') or None
         task.parent_task_id = request.POST.get('parent_task') or None
-        task.save()
+        with transaction.atomic():
+            task.save()
+            TaskEvent.log_changes(task.pk, before, TaskEvent.snapshot(task))
         return redirect('tasks:detail', pk=task.pk)
     
     return render(request, 'tasks/task_form.html', {
         'task': task,
         'priorities': Priority.choices,
     })
+
+
+@login_required
+@require_http_methods(["GET"])
+def board(request):
+    """Kanban board: top cards of every status column with exact counts."""
+    queryset = filter_tasks(Task.objects.all(), request.GET, request.user, by_status=False)
+    per_column = kanban.clamp_column_size(request.GET.get('limit'))
+    return JsonResponse({
+        'columns': kanban.build_board(queryset, per_column=per_column),
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def board_column(request, status):
+    """Load more cards for a single board column using a keyset cursor."""
+    if status not in dict(TaskStatus.choices):
+        return JsonResponse({'success': False, 'error': 'Unknown status'}, status=404)
+
+    queryset = filter_tasks(Task.objects.all(), request.GET, request.user, by_status=False)
+    limit = kanban.clamp_column_size(request.GET.get('limit'))
+    try:
+        page = kanban.column_page(
+            queryset, status, cursor=request.GET.get('cursor'), limit=limit
+        )
+    except InvalidCursor:
+        return JsonResponse({'success': False, 'error': 'Invalid cursor'}, status=400)
+    return JsonResponse(page)
+
+
+@login_required
+@require_http_methods(["POST"])
+def board_move(request, pk):
+    """Move a card to another column (drag-and-drop)."""
+    status = request.POST.get('status')
+    if status not in dict(TaskStatus.choices):
+        return JsonResponse({'success': False}, status=400)
+
+    expected_status = request.POST.get('from_status') or None
+    if kanban.move_task(pk, status, expected_status=expected_status):
+        return JsonResponse({'success': True, 'status': status})
+
+    current_status = Task.objects.filter(pk=pk).values_list('status', flat=True).first()
+    if current_status is None:
+        return JsonResponse({'success': False, 'error': 'Task not found'}, status=404)
+    # The card was moved by someone else in the meantime
+    return JsonResponse({'success': False, 'status': current_status}, status=409)
+
+
+@login_required
+@require_http_methods(["GET"])
+def analytics_report(request):
+    """Task flow analytics for dashboard charts."""
+    try:
+        days = int(request.GET.get('days', 90))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid period'}, status=400)
+    days = max(1, min(days, 730))
+    return JsonResponse(analytics.get_report(days))
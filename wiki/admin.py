@@ -1,6 +1,7 @@
 """Wiki app admin configuration."""
 from django.contrib import admin
-from .models import WikiArticle, WikiCategory, WikiAttachment
+from .models import WikiArticle, WikiCategory, WikiAttachment, WikiLink, WikiRevision
+from . import revisions
 
 
 @admin.register(WikiCategory)
@@ -22,6 +23,11 @@ class WikiArticleAdmin(admin.ModelAdmin):
     date_hierarchy = 'updated_at'
     ordering = ('-updated_at',)
     filter_horizontal = ()
+    readonly_fields = ('version',)
+    
+    def save_model(self, request, obj, form, change):
+        # Goes through the revision store so admin edits stay in the history
+        revisions.save_article(obj, request.user)
 
 
 @admin.register(WikiAttachment)
@@ -30,3 +36,20 @@ class WikiAttachmentAdmin(admin.ModelAdmin):
     list_filter = ('uploaded_at',)
     raw_id_fields = ('article', 'uploaded_by')
     date_hierarchy = 'uploaded_at'
+
+
+@admin.register(WikiRevision)
+class WikiRevisionAdmin(admin.ModelAdmin):
+    list_display = ('article', 'version', 'title', 'is_snapshot', 'size', 'author', 'created_at')
+    list_filter = ('is_snapshot', 'created_at')
+    raw_id_fields = ('article', 'author')
+    exclude = ('data',)
+    readonly_fields = ('article', 'version', 'title', 'is_snapshot', 'size', 'author', 'comment', 'created_at')
+
+
+@admin.register(WikiLink)
+class WikiLinkAdmin(admin.ModelAdmin):
+    list_display = ('source', 'target_slug', 'target')
+    list_filter = (('target', admin.EmptyFieldListFilter),)
+    search_fields = ('target_slug', 'source__title')
+    raw_id_fields = ('source', 'target')
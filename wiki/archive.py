@@ -0,0 +1,279 @@
+"""
+Wiki import/export as a ZIP archive of Markdown files.
+
+Layout of an archive::
+
+    categories.json                 categories, parents before children
+    articles/<slug>.md              front matter + Markdown body
+    attachments/<slug>/<file>       attachment files
+
+The front matter is a block of ``key: value`` lines between ``---``
+markers, every value JSON-encoded (so it is valid YAML as well).
+
+Export streams the archive: zipfile writes to a sink that is drained after
+every entry, attachments are copied chunk by chunk, and articles are read
+with an iterator, so neither the archive nor the article set is ever held in
+memory.
+
+Import creates articles with ``bulk_create`` in batches. Slugs taken by
+existing articles (or repeated in the archive) get a numeric suffix and
+links inside the archive are rewritten to match; parent articles are
+linked by slug afterwards. The per-save work - tree paths, first revisions,
+the link graph and related content - is done once for the whole batch at
+the end.
+"""
+import json
+import os
+import posixpath
+import zipfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.text import slugify
+
+from corp_portal import related
+
+from . import links, revisions
+from .models import WikiArticle, WikiAttachment, WikiCategory
+
+FRONT_MATTER = ('title', 'slug', 'category', 'parent', 'excerpt', 'is_published', 'is_featured', 'attachments')
+BATCH_SIZE = 500
+COPY_CHUNK = 64 * 1024
+SLUG_LENGTH = WikiArticle._meta.get_field('slug').max_length
+
+
+class ArchiveError(Exception):
+    """The uploaded file is not a wiki archive."""
+
+
+class _Sink:
+    """Write-only, non-seekable file for zipfile that hands out what was written."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _front_matter(values):
+    lines = ['---']
+    lines.extend(f'{key}: {json.dumps(values[key], ensure_ascii=False)}' for key in FRONT_MATTER if key in values)
+    lines.append('---')
+    return '\n'.join(lines) + '\n'
+
+
+def parse_markdown(text):
+    """(front matter dict, body) of an exported article."""
+    if not text.startswith('---\n'):
+        return {}, text
+    header, separator, body = text[4:].partition('\n---\n')
+    if not separator:
+        return {}, text
+    values = {}
+    for line in header.splitlines():
+        key, _colon, value = line.partition(':')
+        if key.strip() in FRONT_MATTER:
+            try:
+                values[key.strip()] = json.loads(value)
+            except ValueError:
+                values[key.strip()] = value.strip()
+    return values, body
+
+
+def _attachment_name(article, attachment):
+    return posixpath.join('attachments', article.slug, os.path.basename(attachment.file.name))
+
+
+def export_articles(category=None):
+    """Articles of an export: all, or those of a category and its subcategories."""
+    articles = WikiArticle.objects.select_related('category', 'parent_article').prefetch_related('attachments')
+    if category is not None:
+        articles = articles.filter(category__path__startswith=category.path)
+    return articles.order_by('path')
+
+
+def stream_zip(articles):
+    """Yield the archive of ``articles`` piece by piece."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        categories = [
+            {'name': name, 'slug': slug, 'description': description, 'icon': icon, 'parent': parent}
+            for name, slug, description, icon, parent in WikiCategory.objects.order_by('path').values_list(
+                'name', 'slug', 'description', 'icon', 'parent__slug'
+            )
+        ]
+        archive.writestr('categories.json', json.dumps(categories, ensure_ascii=False, indent=2))
+        yield sink.drain()
+
+        for article in articles.iterator(chunk_size=200):
+            attachments = list(article.attachments.all())
+            archive.writestr(f'articles/{article.slug}.md', _front_matter({
+                'title': article.title,
+                'slug': article.slug,
+                'category': article.category.slug if article.category else None,
+                'parent': article.parent_article.slug if article.parent_article else None,
+                'excerpt': article.excerpt,
+                'is_published': article.is_published,
+                'is_featured': article.is_featured,
+                'attachments': [_attachment_name(article, attachment) for attachment in attachments],
+            }) + article.content)
+            yield sink.drain()
+
+            for attachment in attachments:
+                try:
+                    source = attachment.file.open('rb')
+                except (FileNotFoundError, OSError):
+                    continue
+                with source, archive.open(_attachment_name(article, attachment), 'w') as target:
+                    for chunk in source.chunks(COPY_CHUNK):
+                        target.write(chunk)
+                        yield sink.drain()
+    yield sink.drain()
+
+
+def write_zip(articles, fileobj):
+    """Write the archive of ``articles`` to a file. Returns the number of bytes."""
+    size = 0
+    for chunk in stream_zip(articles):
+        fileobj.write(chunk)
+        size += len(chunk)
+    return size
+
+
+def _import_categories(archive):
+    """Create missing categories. Returns {slug: category id}."""
+    try:
+        rows = json.loads(archive.read('categories.json'))
+    except KeyError:
+        rows = []
+    known = dict(WikiCategory.objects.values_list('slug', 'pk'))
+    for row in rows:
+        if row.get('slug') and row['slug'] not in known:
+            category = WikiCategory(
+                name=row.get('name') or row['slug'],
+                slug=row['slug'],
+                description=row.get('description') or '',
+                icon=row.get('icon') or '',
+                parent_id=known.get(row.get('parent')),
+            )
+            if WikiCategory.objects.filter(name=category.name).exists():
+                category.name = f"{category.name} ({category.slug})"
+            # Few rows: saved one by one, which keeps their paths
+            category.save()
+            known[category.slug] = category.pk
+    return known
+
+
+def _free_slug(slug, taken):
+    candidate, number = slug, 2
+    while candidate in taken:
+        candidate = f'{slug}-{number}'
+        number += 1
+    taken.add(candidate)
+    return candidate
+
+
+def import_zip(fileobj, author=None, skip_existing=False):
+    """
+    Import an archive made by stream_zip().
+
+    Articles whose slug is taken are renamed (``slug-2``...), or skipped
+    with ``skip_existing``. Returns a dict of counts.
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(str(e)) from e
+    names = set(archive.namelist())
+    pages = []
+    for name in sorted(names):
+        if name.startswith('articles/') and name.endswith('.md'):
+            values, body = parse_markdown(archive.read(name).decode('utf-8'))
+            values.setdefault('slug', posixpath.basename(name)[:-3])
+            pages.append((values, body))
+    if not pages and 'categories.json' not in names:
+        raise ArchiveError('В архиве нет статей wiki')
+
+    stats = {'created': 0, 'renamed': 0, 'skipped': 0, 'attachments': 0}
+    with transaction.atomic():
+        categories = _import_categories(archive)
+        taken = set(WikiArticle.objects.values_list('slug', flat=True))
+
+        renamed, new_pages = {}, []
+        for values, body in pages:
+            original = str(values['slug'])
+            slug = slugify(original)[:SLUG_LENGTH - 4] or 'page'
+            if slug in taken and skip_existing:
+                stats['skipped'] += 1
+                continue
+            new_slug = _free_slug(slug, taken)
+            if new_slug != original:
+                renamed[original] = new_slug
+                stats['renamed'] += 1
+            new_pages.append((values, body, new_slug))
+
+        articles = []
+        for values, body, slug in new_pages:
+            articles.append(WikiArticle(
+                title=str(values.get('title') or slug)[:300],
+                slug=slug,
+                # Links between imported pages follow their new slugs
+                content=links.replace_slugs(body, renamed),
+                excerpt=values.get('excerpt') or '',
+                author=author,
+                category_id=categories.get(values.get('category')),
+                is_published=bool(values.get('is_published')),
+                is_featured=bool(values.get('is_featured')),
+                version=1,
+            ))
+        # bulk_create skips save(), signals included: the indexes are built below
+        articles = WikiArticle.objects.bulk_create(articles, batch_size=BATCH_SIZE)
+        if any(article.pk is None for article in articles):
+            # Backends that do not return ids from a bulk insert
+            ids = dict(WikiArticle.objects.filter(
+                slug__in=[article.slug for article in articles]
+            ).values_list('slug', 'pk'))
+            for article in articles:
+                article.pk = ids[article.slug]
+        stats['created'] = len(articles)
+
+        slugs = dict(WikiArticle.objects.filter(
+            slug__in={renamed.get(values.get('parent'), values.get('parent')) for values, _body, _slug in new_pages}
+        ).values_list('slug', 'pk'))
+        with_parent = []
+        for article, (values, _body, _slug) in zip(articles, new_pages):
+            parent = values.get('parent')
+            parent_id = slugs.get(renamed.get(parent, parent)) if parent else None
+            if parent_id and parent_id != article.pk:
+                article.parent_article_id = parent_id
+                with_parent.append(article)
+        WikiArticle.objects.bulk_update(with_parent, ['parent_article'], batch_size=BATCH_SIZE)
+
+        attachments, upload_to = [], WikiAttachment._meta.get_field('file').upload_to
+        for article, (values, _body, _slug) in zip(articles, new_pages):
+            for name in values.get('attachments') or []:
+                if name in names:
+                    with archive.open(name) as source:
+                        stored = default_storage.save(
+                            posixpath.join(upload_to, posixpath.basename(name)), File(source)
+                        )
+                    attachments.append(WikiAttachment(article=article, file=stored, uploaded_by=author))
+        WikiAttachment.objects.bulk_create(attachments, batch_size=BATCH_SIZE)
+        stats['attachments'] = len(attachments)
+
+        WikiArticle.rebuild_paths()
+        revisions.create_initial(articles, author, comment='Импорт')
+        links.index(articles)
+    related.rebuild()
+    return stats
@@ -0,0 +1,110 @@
+"""
+Link graph of wiki articles.
+
+Links to other articles (``/wiki/<slug>/`` in Markdown links, reference
+definitions, autolinks or HTML ``href``) are extracted whenever an
+article's text or slug is saved and stored as WikiLink edges, indexed on
+both ends. An edge keeps the slug as written and the article it resolves
+to; an edge whose slug matches no article is broken. Edges are resolved
+and broken by set-based UPDATEs when articles are created, renamed or
+deleted, so backlinks, orphan and broken-link reports are single queries.
+
+On a slug change the referring articles can have their links rewritten in
+bulk (``rewrite``); each rewrite is saved as a normal revision.
+"""
+import re
+
+from django.db.models import Exists, OuterRef, Subquery
+
+from .models import WikiArticle, WikiLink
+
+# Link destinations: "](", "]: ", "<" (autolink) or href="..."; the host is optional
+LINK_PREFIX = r'''(?P<prefix>\]\(\s*|\]:\s*|<|href=["'])(?P<site>https?://[^/\s)"'>]+)?/wiki/'''
+LINK_RE = re.compile(LINK_PREFIX + r'(?P<slug>[-\w]+)(?=[/)"\'\s>#?]|$)')
+# Paths under /wiki/ that are not articles
+RESERVED_SLUGS = {'create', 'reports', 'export', 'import', 'feeds'}
+
+
+def extract_slugs(text):
+    """Slugs of the wiki articles linked from ``text``."""
+    return {match['slug'] for match in LINK_RE.finditer(text or '')} - RESERVED_SLUGS
+
+
+def update(article):
+    """Re-index the outgoing links of ``article`` and resolve links to its slug."""
+    slugs = extract_slugs(article.content) - {article.slug}
+    current = set(article.outgoing_links.values_list('target_slug', flat=True))
+    article.outgoing_links.filter(target_slug__in=current - slugs).delete()
+    if slugs - current:
+        targets = dict(WikiArticle.objects.filter(slug__in=slugs - current).values_list('slug', 'pk'))
+        WikiLink.objects.bulk_create([
+            WikiLink(source=article, target_slug=slug, target_id=targets.get(slug))
+            for slug in sorted(slugs - current)
+        ])
+    # After a rename, links to the old slug break and links to the new one resolve
+    WikiLink.objects.filter(target=article).exclude(target_slug=article.slug).update(target=None)
+    WikiLink.objects.filter(target_slug=article.slug, target__isnull=True).update(target=article)
+
+
+def index(articles):
+    """Bulk variant of update() for newly created articles (e.g. an import)."""
+    wanted = {article.pk: extract_slugs(article.content) - {article.slug} for article in articles}
+    targets = dict(WikiArticle.objects.filter(
+        slug__in=set().union(*wanted.values())
+    ).values_list('slug', 'pk')) if wanted else {}
+    WikiLink.objects.bulk_create([
+        WikiLink(source_id=pk, target_slug=slug, target_id=targets.get(slug))
+        for pk, slugs in wanted.items() for slug in sorted(slugs)
+    ], batch_size=500)
+    WikiLink.objects.filter(
+        target_slug__in=[article.slug for article in articles], target__isnull=True
+    ).update(target=Subquery(WikiArticle.objects.filter(slug=OuterRef('target_slug')).values('pk')[:1]))
+
+
+def replace_slug(text, old_slug, new_slug):
+    """``text`` with its links to ``old_slug`` pointing at ``new_slug``."""
+    pattern = re.compile(LINK_PREFIX + re.escape(old_slug) + r'(?=[/)"\'\s>#?]|$)')
+    return pattern.sub(lambda match: f"{match['prefix']}{match['site'] or ''}/wiki/{new_slug}", text)
+
+
+def replace_slugs(text, renamed):
+    """``text`` with every link to a key of ``renamed`` pointing at its value, in one pass."""
+    if not renamed:
+        return text
+    return LINK_RE.sub(
+        lambda match: f"{match['prefix']}{match['site'] or ''}/wiki/{renamed.get(match['slug'], match['slug'])}", text
+    )
+
+
+def rewrite(old_slug, new_slug, author=None):
+    """Point every link to ``old_slug`` at ``new_slug``. Returns the number of articles changed."""
+    from .revisions import save_article
+
+    changed = 0
+    sources = WikiArticle.objects.filter(
+        pk__in=WikiLink.objects.filter(target_slug=old_slug).values('source_id')
+    )
+    for source in sources:
+        source.content = replace_slug(source.content, old_slug, new_slug)
+        if save_article(source, author, comment=f'Ссылки: {old_slug} → {new_slug}'):
+            changed += 1
+    return changed
+
+
+def backlinks(article):
+    """Articles linking to ``article`` (what links here)."""
+    return WikiArticle.objects.filter(
+        pk__in=WikiLink.objects.filter(target=article).values('source_id')
+    ).order_by('title')
+
+
+def orphans():
+    """Published articles no other article links to."""
+    return WikiArticle.objects.filter(is_published=True).filter(
+        ~Exists(WikiLink.objects.filter(target=OuterRef('pk')))
+    ).order_by('title')
+
+
+def broken_links():
+    """Links whose slug matches no article."""
+    return WikiLink.objects.filter(target__isnull=True).select_related('source').order_by('source__title', 'target_slug')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from wiki.archive import export_articles, write_zip
+from wiki.models import WikiCategory
+
+
+class Command(BaseCommand):
+    help = 'Выгружает статьи wiki с вложениями в ZIP-архив Markdown-файлов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Путь к создаваемому архиву')
+        parser.add_argument('--category', help='Слаг категории: только она и её подкатегории')
+
+    def handle(self, *args, **options):
+        category = None
+        if options['category']:
+            category = WikiCategory.objects.filter(slug=options['category']).first()
+            if category is None:
+                raise CommandError(f"Категория {options['category']} не найдена")
+        articles = export_articles(category)
+        with open(options['output'], 'wb') as output:
+            size = write_zip(articles, output)
+        self.stdout.write(self.style.SUCCESS(
+            f"Статей: {articles.count()}, размер архива: {size} байт"
+        ))
@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from wiki.archive import ArchiveError, import_zip
+
+
+class Command(BaseCommand):
+    help = 'Загружает статьи wiki из ZIP-архива, созданного export_wiki'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archive', help='Путь к архиву')
+        parser.add_argument(
+            '--on-conflict', choices=['rename', 'skip'], default='rename',
+            help='Статьи с занятым слагом: переименовать (slug-2) или пропустить',
+        )
+        parser.add_argument('--author', help='Имя пользователя, от которого создаются статьи')
+
+    def handle(self, *args, **options):
+        author = None
+        if options['author']:
+            author = User.objects.filter(username=options['author']).first()
+            if author is None:
+                raise CommandError(f"Пользователь {options['author']} не найден")
+        try:
+            with open(options['archive'], 'rb') as archive:
+                stats = import_zip(archive, author, skip_existing=options['on_conflict'] == 'skip')
+        except (OSError, ArchiveError) as e:
+            raise CommandError(str(e)) from e
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано статей: {stats['created']}, переименовано: {stats['renamed']}, "
+            f"пропущено: {stats['skipped']}, вложений: {stats['attachments']}"
+        ))
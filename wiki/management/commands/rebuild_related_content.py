@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from corp_portal.related import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает похожие статьи и новости (запускать еженощно)'
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Обработано материалов: {count}'))
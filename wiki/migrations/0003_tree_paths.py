@@ -0,0 +1,57 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:38
+
+from django.db import migrations, models
+
+
+def _fill_paths(model, parent_field):
+    """Set paths level by level: one query per tree level, bulk updates per level."""
+    frontier = {}
+    level = model.objects.filter(**{f'{parent_field}__isnull': True})
+    depth = 0
+    while True:
+        nodes = list(level.only('pk', f'{parent_field}_id'))
+        if not nodes:
+            break
+        for node in nodes:
+            node.path = f"{frontier.get(getattr(node, f'{parent_field}_id'), '')}{node.pk}/"
+            node.depth = depth
+        model.objects.bulk_update(nodes, ['path', 'depth'], batch_size=500)
+        frontier = {node.pk: node.path for node in nodes}
+        level = model.objects.filter(**{f'{parent_field}_id__in': list(frontier)})
+        depth += 1
+
+
+def fill_paths(apps, schema_editor):
+    _fill_paths(apps.get_model('wiki', 'WikiCategory'), 'parent')
+    _fill_paths(apps.get_model('wiki', 'WikiArticle'), 'parent_article')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0002_revisions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wikiarticle',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Глубина'),
+        ),
+        migrations.AddField(
+            model_name='wikiarticle',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255, verbose_name='Путь'),
+        ),
+        migrations.AddField(
+            model_name='wikicategory',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Глубина'),
+        ),
+        migrations.AddField(
+            model_name='wikicategory',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255, verbose_name='Путь'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
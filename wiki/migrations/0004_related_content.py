@@ -0,0 +1,46 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0001_initial'),
+        ('wiki', '0003_tree_paths'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentVector',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('terms', models.JSONField(default=dict, verbose_name='Термины')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('article', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='content_vector', to='wiki.wikiarticle', verbose_name='Статья')),
+                ('news', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='content_vector', to='news.news', verbose_name='Новость')),
+            ],
+            options={
+                'verbose_name': 'Вектор текста',
+                'verbose_name_plural': 'Векторы текстов',
+            },
+        ),
+        migrations.CreateModel(
+            name='RelatedContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Сходство')),
+                ('article', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='related_content', to='wiki.wikiarticle', verbose_name='Статья')),
+                ('news', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='related_content', to='news.news', verbose_name='Новость')),
+                ('related_article', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='wiki.wikiarticle', verbose_name='Похожая статья')),
+                ('related_news', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='news.news', verbose_name='Похожая новость')),
+            ],
+            options={
+                'verbose_name': 'Похожий материал',
+                'verbose_name_plural': 'Похожие материалы',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['article', '-score'], name='wiki_relate_article_87b91e_idx'), models.Index(fields=['news', '-score'], name='wiki_relate_news_id_ea9564_idx')],
+            },
+        ),
+    ]
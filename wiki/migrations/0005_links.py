@@ -0,0 +1,48 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_links(apps, schema_editor):
+    """Extract the links of existing articles."""
+    from wiki.links import extract_slugs
+
+    WikiArticle = apps.get_model('wiki', 'WikiArticle')
+    WikiLink = apps.get_model('wiki', 'WikiLink')
+    articles = dict(WikiArticle.objects.values_list('slug', 'pk'))
+    batch = []
+    for pk, slug, content in WikiArticle.objects.values_list('pk', 'slug', 'content').iterator(chunk_size=500):
+        batch.extend(
+            WikiLink(source_id=pk, target_slug=target, target_id=articles.get(target))
+            for target in sorted(extract_slugs(content) - {slug})
+        )
+        if len(batch) >= 1000:
+            WikiLink.objects.bulk_create(batch)
+            batch = []
+    WikiLink.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0004_related_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WikiLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target_slug', models.SlugField(verbose_name='Слаг ссылки')),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outgoing_links', to='wiki.wikiarticle', verbose_name='Откуда')),
+                ('target', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='incoming_links', to='wiki.wikiarticle', verbose_name='Куда')),
+            ],
+            options={
+                'verbose_name': 'Ссылка',
+                'verbose_name_plural': 'Ссылки',
+                'unique_together': {('source', 'target_slug')},
+            },
+        ),
+        migrations.RunPython(index_links, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.14 on 2026-10-19 19:20
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_terms(apps, schema_editor):
+    """Document frequencies of the existing vectors."""
+    ContentVector = apps.get_model('wiki', 'ContentVector')
+    TermFrequency = apps.get_model('wiki', 'TermFrequency')
+    df = Counter()
+    for vector_terms in ContentVector.objects.values_list('terms', flat=True).iterator(chunk_size=500):
+        df.update(term for term in vector_terms if len(term) <= 100)
+    TermFrequency.objects.bulk_create(
+        [TermFrequency(term=term, documents=count) for term, count in df.items()], batch_size=1000
+    )
+
+
+def add_terms_index(apps, schema_editor):
+    # Candidate lookups (terms ?| array[...]); SQLite scans the table instead
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX wiki_contentvector_terms_gin ON wiki_contentvector USING gin (terms)'
+        )
+
+
+def remove_terms_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS wiki_contentvector_terms_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0005_links'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermFrequency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100, unique=True, verbose_name='Термин')),
+                ('documents', models.PositiveIntegerField(default=0, verbose_name='Документов')),
+            ],
+            options={
+                'verbose_name': 'Частота термина',
+                'verbose_name_plural': 'Частоты терминов',
+            },
+        ),
+        migrations.RunPython(count_terms, migrations.RunPython.noop),
+        migrations.RunPython(add_terms_index, remove_terms_index),
+    ]
@@ -2,13 +2,133 @@
 Wiki app models - Knowledge base and documentation.
 Optimized with proper indexing, full-text search support, and versioning.
 """
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Func, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Concat, Substr
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinLengthValidator
 
+from corp_portal import related, rendering
 
-class WikiCategory(models.Model):
+
+class TreeNode(models.Model):
+    """
+    Tree node with a maintained materialized path.
+
+    ``path`` lists the pks from the root down to the node itself, each
+    followed by "/" (e.g. "3/17/42/"), so ancestors are read by pk from the
+    path and a subtree is one indexed prefix match. Moving a node rewrites
+    the paths of its whole subtree with a single UPDATE.
+    """
+    
+    # Name of the parent ForeignKey in the concrete model
+    parent_field = 'parent'
+    
+    path = models.CharField(max_length=255, blank=True, editable=False, db_index=True, verbose_name=_('Путь'))
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name=_('Глубина'))
+    
+    class Meta:
+        abstract = True
+    
+    def ancestor_ids(self):
+        return [int(pk) for pk in self.path.split('/')[:-2]]
+    
+    def ancestors(self, include_self=False):
+        """Ancestors from the root down (one query)."""
+        ids = self.ancestor_ids() + ([self.pk] if include_self else [])
+        return type(self).objects.filter(pk__in=ids).order_by('depth')
+    
+    def descendants(self, include_self=False):
+        """The whole subtree below the node (one query)."""
+        queryset = type(self).objects.filter(path__startswith=self.path)
+        return queryset if include_self else queryset.exclude(pk=self.pk)
+    
+    def clean(self):
+        super().clean()
+        parent_id = getattr(self, f'{self.parent_field}_id')
+        if self.pk and parent_id and str(self.pk) in self._path_of(parent_id).split('/'):
+            raise ValidationError({self.parent_field: _('Нельзя переместить элемент внутрь самого себя')})
+    
+    def _path_of(self, pk):
+        return type(self).objects.filter(pk=pk).values_list('path', flat=True).first() or ''
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        parent_id = getattr(self, f'{self.parent_field}_id')
+        if update_fields is not None and self.parent_field not in update_fields \
+                and f'{self.parent_field}_id' not in update_fields:
+            return super().save(*args, **kwargs)
+        
+        with transaction.atomic():
+            paths = dict(type(self).objects.filter(
+                pk__in=[pk for pk in (self.pk, parent_id) if pk]
+            ).values_list('pk', 'path'))
+            old_path = paths.get(self.pk, '')
+            parent_path = paths.get(parent_id, '')
+            if old_path and parent_path.startswith(old_path):
+                raise ValidationError({self.parent_field: _('Нельзя переместить элемент внутрь самого себя')})
+            super().save(*args, **kwargs)
+            
+            new_path = f'{parent_path}{self.pk}/'
+            depth = new_path.count('/') - 1
+            if new_path == old_path:
+                return
+            if old_path:
+                # The node and all its descendants move in one statement
+                type(self).objects.filter(path__startswith=old_path).update(
+                    path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+                    depth=F('depth') + (depth - (old_path.count('/') - 1)),
+                )
+            else:
+                type(self).objects.filter(pk=self.pk).update(path=new_path, depth=depth)
+            self.path, self.depth = new_path, depth
+    
+    @classmethod
+    def rebuild_paths(cls):
+        """Recompute all paths, one tree level per query (after bulk inserts)."""
+        parents = {}
+        level = cls.objects.filter(**{f'{cls.parent_field}__isnull': True})
+        depth = 0
+        while True:
+            nodes = list(level.only('pk', f'{cls.parent_field}_id', 'path', 'depth'))
+            if not nodes:
+                break
+            changed = []
+            for node in nodes:
+                path = f"{parents.get(getattr(node, f'{cls.parent_field}_id'), '')}{node.pk}/"
+                if (node.path, node.depth) != (path, depth):
+                    node.path, node.depth = path, depth
+                    changed.append(node)
+            cls.objects.bulk_update(changed, ['path', 'depth'], batch_size=500)
+            parents = {node.pk: node.path for node in nodes}
+            level = cls.objects.filter(**{f'{cls.parent_field}_id__in': list(parents)})
+            depth += 1
+
+
+def build_tree(nodes, sort_key=None):
+    """
+    Nest nodes (dicts with 'id' and 'path') loaded flat, e.g. a subtree.
+
+    Each node gets a 'children' list; nodes whose parent is not among
+    ``nodes`` become roots. Returns the roots.
+    """
+    by_id = {node['id']: dict(node, children=[]) for node in nodes}
+    roots = []
+    for node in by_id.values():
+        parent_ids = node['path'].split('/')[:-2]
+        parent = by_id.get(int(parent_ids[-1])) if parent_ids else None
+        (parent['children'] if parent else roots).append(node)
+    if sort_key:
+        for node in by_id.values():
+            node['children'].sort(key=sort_key)
+        roots.sort(key=sort_key)
+    return roots
+
+
+class WikiCategory(TreeNode):
     """Categories for organizing wiki articles."""
     
     name = models.CharField(max_length=200, unique=True, verbose_name=_('Название'))
@@ -41,11 +161,27 @@ class WikiCategory(models.Model):
     
     def __str__(self):
         return self.name
+    
+    @classmethod
+    def with_article_counts(cls):
+        """
+        Categories with ``article_count`` (own published articles) and
+        ``total_article_count`` (including subcategories), in one query.
+        """
+        subtree_articles = WikiArticle.objects.filter(
+            is_published=True, category__path__startswith=OuterRef('path')
+        ).order_by().annotate(count=Func(F('pk'), function='COUNT')).values('count')
+        return cls.objects.annotate(
+            article_count=Count('articles', filter=Q(articles__is_published=True)),
+            total_article_count=Coalesce(Subquery(subtree_articles), 0),
+        )
 
 
-class WikiArticle(models.Model):
+class WikiArticle(TreeNode):
     """Wiki article model with versioning support."""
     
+    parent_field = 'parent_article'
+    
     title = models.CharField(
         max_length=300,
         verbose_name=_('Заголовок'),
@@ -113,8 +249,19 @@ class WikiArticle(models.Model):
         self.views = models.F('views') + 1
         self.save(update_fields=['views'])
     
+    @cached_property
+    def rendered(self):
+        """Cached HTML and table of contents of the body (see corp_portal.rendering)."""
+        return rendering.rendered(self)
+    
     def get_related_articles(self, limit=3):
-        """Get related articles from the same category."""
+        """
+        Most similar published articles (see corp_portal.related), falling
+        back to the same category while similarities are not computed yet.
+        """
+        similar = related.related_items(self, limit, kind='article')
+        if similar:
+            return similar
         if self.category:
             return WikiArticle.objects.filter(
                 category=self.category,
@@ -123,6 +270,179 @@ class WikiArticle(models.Model):
         return WikiArticle.objects.none()
 
 
+class WikiRevision(models.Model):
+    """
+    One stored version of an article.
+
+    ``data`` is zlib-compressed: the full text for snapshots, otherwise a
+    line delta against the previous revision (see wiki.revisions).
+    """
+    
+    article = models.ForeignKey(
+        WikiArticle,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+        verbose_name=_('Статья')
+    )
+    version = models.PositiveIntegerField(verbose_name=_('Версия'))
+    title = models.CharField(max_length=300, verbose_name=_('Заголовок'))
+    is_snapshot = models.BooleanField(default=False, verbose_name=_('Полная копия'))
+    data = models.BinaryField(verbose_name=_('Данные'))
+    size = models.PositiveIntegerField(default=0, help_text=_('Длина текста версии'), verbose_name=_('Размер'))
+    author = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='wiki_revisions',
+        verbose_name=_('Автор')
+    )
+    comment = models.CharField(max_length=300, blank=True, verbose_name=_('Комментарий'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Дата создания'))
+    
+    class Meta:
+        ordering = ['article', '-version']
+        unique_together = ['article', 'version']
+        verbose_name = _('Версия статьи')
+        verbose_name_plural = _('Версии статей')
+    
+    def __str__(self):
+        return f"{self.title} v{self.version}"
+
+
+class WikiLink(models.Model):
+    """Link from one article to another by slug; ``target`` is empty while the link is broken."""
+    
+    source = models.ForeignKey(
+        WikiArticle,
+        on_delete=models.CASCADE,
+        related_name='outgoing_links',
+        verbose_name=_('Откуда')
+    )
+    target_slug = models.SlugField(db_index=True, verbose_name=_('Слаг ссылки'))
+    target = models.ForeignKey(
+        WikiArticle,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='incoming_links',
+        verbose_name=_('Куда')
+    )
+    
+    class Meta:
+        unique_together = ['source', 'target_slug']
+        verbose_name = _('Ссылка')
+        verbose_name_plural = _('Ссылки')
+    
+    def __str__(self):
+        return f"{self.source} → {self.target_slug}"
+
+
+class ContentVector(models.Model):
+    """Stemmed term counts of a wiki article or news item, for similarity search."""
+    
+    article = models.OneToOneField(
+        WikiArticle,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='content_vector',
+        verbose_name=_('Статья')
+    )
+    news = models.OneToOneField(
+        'news.News',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='content_vector',
+        verbose_name=_('Новость')
+    )
+    terms = models.JSONField(default=dict, verbose_name=_('Термины'))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Дата обновления'))
+    
+    class Meta:
+        verbose_name = _('Вектор текста')
+        verbose_name_plural = _('Векторы текстов')
+    
+    def __str__(self):
+        return str(self.article or self.news)
+
+
+class TermFrequency(models.Model):
+    """
+    Number of stored ContentVectors containing a term (document frequency).
+
+    Kept up to date approximately on every save and recounted exactly by
+    ``rebuild_related_content``.
+    """
+
+    term = models.CharField(max_length=100, unique=True, verbose_name=_('Термин'))
+    documents = models.PositiveIntegerField(default=0, verbose_name=_('Документов'))
+
+    class Meta:
+        verbose_name = _('Частота термина')
+        verbose_name_plural = _('Частоты терминов')
+
+    def __str__(self):
+        return f'{self.term}: {self.documents}'
+
+
+class RelatedContent(models.Model):
+    """
+    Precomputed similar document of a wiki article or news item.
+
+    Exactly one of ``article``/``news`` is the source and one of
+    ``related_article``/``related_news`` the neighbour; a source keeps its
+    top WIKI_RELATED_LIMIT neighbours by ``score``.
+    """
+    
+    article = models.ForeignKey(
+        WikiArticle,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='related_content',
+        verbose_name=_('Статья')
+    )
+    news = models.ForeignKey(
+        'news.News',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='related_content',
+        verbose_name=_('Новость')
+    )
+    related_article = models.ForeignKey(
+        WikiArticle,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('Похожая статья')
+    )
+    related_news = models.ForeignKey(
+        'news.News',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('Похожая новость')
+    )
+    score = models.FloatField(verbose_name=_('Сходство'))
+    
+    class Meta:
+        ordering = ['-score']
+        verbose_name = _('Похожий материал')
+        verbose_name_plural = _('Похожие материалы')
+        indexes = [
+            models.Index(fields=['article', '-score']),
+            models.Index(fields=['news', '-score']),
+        ]
+    
+    def __str__(self):
+        return f"{self.article or self.news} → {self.related_article or self.related_news}"
+
+
 class WikiAttachment(models.Model):
     """File attachments for wiki articles."""
     
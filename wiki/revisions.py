@@ -0,0 +1,180 @@
+"""
+Article revision history with delta-compressed storage.
+
+Every saved version is stored as a WikiRevision. Most revisions hold only
+a line delta against the previous one: runs of lines copied from the
+previous text as ``[start, end]`` pairs, and inserted text as strings,
+zlib-compressed JSON. So an edit costs storage proportional to what
+changed, not to the size of the page. Every WIKI_SNAPSHOT_INTERVAL
+versions (or when the delta would not be smaller) a full compressed copy
+is stored instead, so rebuilding any version applies at most
+WIKI_SNAPSHOT_INTERVAL - 1 deltas to the nearest earlier snapshot.
+
+Articles edited before revisions were tracked get a snapshot of their
+current text as the base on their first tracked edit.
+"""
+import difflib
+import json
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import WikiArticle, WikiRevision
+
+
+def snapshot_interval():
+    return max(1, getattr(settings, 'WIKI_SNAPSHOT_INTERVAL', 20))
+
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode(), 9)
+
+
+def _unpack(data):
+    return json.loads(zlib.decompress(bytes(data)).decode())
+
+
+def make_delta(old, new):
+    """Delta turning text ``old`` into ``new``."""
+    old_lines, new_lines = old.splitlines(keepends=True), new.splitlines(keepends=True)
+    delta = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append([i1, i2])
+        elif j2 > j1:
+            delta.append(''.join(new_lines[j1:j2]))
+    return delta
+
+
+def apply_delta(old, delta):
+    old_lines = old.splitlines(keepends=True)
+    return ''.join(item if isinstance(item, str) else ''.join(old_lines[item[0]:item[1]]) for item in delta)
+
+
+def _store(article, base, author, comment):
+    """Store the article's current version; ``base`` is the previous version's text."""
+    if base is None:
+        is_snapshot = True
+    else:
+        last_snapshot = article.revisions.filter(is_snapshot=True).order_by('-version').values_list(
+            'version', flat=True
+        ).first() or 0
+        is_snapshot = article.version - last_snapshot >= snapshot_interval()
+
+    data = _pack(article.content)
+    if not is_snapshot:
+        delta = _pack(make_delta(base, article.content))
+        # A rewrite of most of the page is cheaper to keep in full
+        is_snapshot = len(delta) >= len(data)
+        data = data if is_snapshot else delta
+
+    return WikiRevision.objects.create(
+        article=article,
+        version=article.version,
+        title=article.title,
+        is_snapshot=is_snapshot,
+        data=data,
+        size=len(article.content),
+        author=author,
+        comment=comment,
+    )
+
+
+def save_article(article, author=None, comment=''):
+    """
+    Save ``article`` and record a new version if its title or text changed.
+
+    Returns the new WikiRevision, or None if only other fields changed.
+    """
+    with transaction.atomic():
+        if article.pk is None:
+            article.version = 1
+            article.save()
+            return _store(article, None, author, comment)
+
+        current = WikiArticle.objects.select_for_update().filter(pk=article.pk).values(
+            'title', 'content', 'version'
+        ).get()
+        if current['title'] == article.title and current['content'] == article.content:
+            article.version = current['version']
+            article.save()
+            return None
+
+        latest = article.revisions.order_by('-version').values_list('version', flat=True).first()
+        if latest != current['version']:
+            # Untracked base version: keep it as a snapshot first
+            WikiRevision.objects.create(
+                article=article,
+                version=current['version'],
+                title=current['title'],
+                is_snapshot=True,
+                data=_pack(current['content']),
+                size=len(current['content']),
+            )
+        article.version = current['version'] + 1
+        article.save()
+        return _store(article, current['content'], author, comment)
+
+
+def create_initial(articles, author=None, comment=''):
+    """Snapshots of bulk-created articles (e.g. an import) as their first version."""
+    return WikiRevision.objects.bulk_create([
+        WikiRevision(
+            article=article,
+            version=article.version,
+            title=article.title,
+            is_snapshot=True,
+            data=_pack(article.content),
+            size=len(article.content),
+            author=author,
+            comment=comment,
+        )
+        for article in articles
+    ], batch_size=500)
+
+
+def text_at(article, version):
+    """(title, content) of a stored version; raises WikiRevision.DoesNotExist."""
+    base = article.revisions.filter(version__lte=version, is_snapshot=True).order_by('-version').values_list(
+        'version', flat=True
+    ).first()
+    if base is None:
+        raise WikiRevision.DoesNotExist(f"No snapshot for version {version}")
+    chain = list(article.revisions.filter(version__gte=base, version__lte=version).order_by('version').values_list(
+        'version', 'title', 'is_snapshot', 'data'
+    ))
+    if chain[-1][0] != version:
+        raise WikiRevision.DoesNotExist(f"Version {version} is not stored")
+
+    text = ''
+    for _version, _title, is_snapshot, data in chain:
+        text = _unpack(data) if is_snapshot else apply_delta(text, _unpack(data))
+    return chain[-1][1], text
+
+
+def history(article):
+    """Stored versions of the article, newest first, without their data."""
+    return article.revisions.order_by('-version').values(
+        'version', 'title', 'size', 'comment', 'created_at', 'is_snapshot',
+        'author__username', 'author__first_name', 'author__last_name',
+    )
+
+
+def diff(article, old_version, new_version):
+    """Unified diff between two stored versions."""
+    old_title, old_text = text_at(article, old_version)
+    new_title, new_text = text_at(article, new_version)
+    return ''.join(difflib.unified_diff(
+        old_text.splitlines(keepends=True),
+        new_text.splitlines(keepends=True),
+        fromfile=f'v{old_version}: {old_title}',
+        tofile=f'v{new_version}: {new_title}',
+    ))
+
+
+def restore(article, version, author=None):
+    """Make a stored version the current one (as a new version)."""
+    article.title, article.content = text_at(article, version)
+    return save_article(article, author, comment=f'Восстановлена версия {version}')
@@ -0,0 +1,41 @@
+"""
+Signal handlers of wiki articles.
+
+An article body is cached under the article version (see
+corp_portal.rendering). The new version is rendered after the transaction
+commits, so a rolled back edit never leaves HTML cached under a version
+number the next edit will take again. Saves that leave the title and text
+alone (view counters) are skipped. Related content is refreshed after
+commit when the text, excerpt or publication flag may have changed; the
+link graph (links.py) is updated within the saving transaction, as it only
+touches the database.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from corp_portal import related, rendering
+
+from . import links
+from .models import WikiArticle
+
+BODY_FIELDS = {'title', 'content'}
+LINK_FIELDS = {'slug', 'content'}
+RELATED_FIELDS = BODY_FIELDS | {'excerpt', 'is_published'}
+
+
+@receiver(post_save, sender=WikiArticle)
+def article_saved(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if not update_fields or BODY_FIELDS.intersection(update_fields):
+        transaction.on_commit(lambda: rendering.refresh(instance))
+    if not update_fields or RELATED_FIELDS.intersection(update_fields):
+        transaction.on_commit(lambda: related.update(instance))
+    if not update_fields or LINK_FIELDS.intersection(update_fields):
+        links.update(instance)
+
+
+@receiver(post_delete, sender=WikiArticle)
+def article_deleted(sender, instance, **kwargs):
+    rendering.forget(instance)
@@ -0,0 +1,65 @@
+"""RSS and Atom feeds of recently updated wiki articles (see corp_portal.syndication)."""
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+
+from corp_portal.syndication import SubscriptionFeed
+
+from .models import WikiArticle, WikiCategory
+
+
+class WikiFeed(SubscriptionFeed):
+    """Published articles, last updated first (?category=slug for a category and its subcategories)."""
+
+    feed_type = Rss201rev2Feed
+    description = 'Обновления базы знаний'
+
+    def get_object(self, request):
+        slug = request.GET.get('category')
+        return get_object_or_404(WikiCategory, slug=slug) if slug else None
+
+    def title(self, category):
+        return f'База знаний: {category.name}' if category else 'База знаний'
+
+    def link(self, category):
+        url = reverse('wiki:list')
+        return f'{url}?category={category.slug}' if category else url
+
+    def feed_items(self, category):
+        # Served by the (is_published, -updated_at) index
+        queryset = WikiArticle.objects.filter(is_published=True)
+        if category is not None:
+            queryset = queryset.filter(category__path__startswith=category.path)
+        return queryset.select_related('author', 'category').order_by('-updated_at', '-pk')
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt or item.rendered['html']
+
+    def item_link(self, item):
+        return reverse('wiki:detail', args=[item.slug])
+
+    def item_guid(self, item):
+        # One entry per version, so readers show edits as updates
+        return f"{self.item_link(item)}#v{item.version}"
+
+    item_guid_is_permalink = False
+
+    def item_pubdate(self, item):
+        return item.updated_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username if item.author else None
+
+    def item_categories(self, item):
+        return [item.category.name] if item.category else []
+
+
+class WikiAtomFeed(WikiFeed):
+    feed_type = Atom1Feed
+    subtitle = WikiFeed.description
@@ -1,13 +1,25 @@
 """Wiki app URLs."""
 from django.urls import path
-from . import views
+from . import syndication, views
 
 app_name = 'wiki'
 
 urlpatterns = [
     path('', views.article_list, name='list'),
+    path('reports/orphans/', views.orphan_report, name='orphan_report'),
+    path('reports/broken-links/', views.broken_link_report, name='broken_link_report'),
+    path('export/', views.export_archive, name='export'),
+    path('import/', views.import_archive, name='import'),
+    path('feeds/rss/', syndication.WikiFeed(), name='rss'),
+    path('feeds/atom/', syndication.WikiAtomFeed(), name='atom'),
     path('<slug:slug>/', views.article_detail, name='detail'),
     path('create/', views.create_article, name='create'),
     path('<slug:slug>/edit/', views.edit_article, name='edit'),
     path('<slug:slug>/upload/', views.upload_attachment, name='upload_attachment'),
+    path('<slug:slug>/history/', views.article_history, name='history'),
+    path('<slug:slug>/history/<int:version>/', views.article_revision, name='revision'),
+    path('<slug:slug>/history/<int:version>/restore/', views.restore_revision, name='restore'),
+    path('<slug:slug>/diff/', views.article_diff, name='diff'),
+    path('<slug:slug>/navigation/', views.article_navigation, name='navigation'),
+    path('<slug:slug>/backlinks/', views.article_backlinks, name='backlinks'),
 ]
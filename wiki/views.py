@@ -1,12 +1,16 @@
 """Wiki app views with optimized queries."""
 from django.shortcuts import render, get_object_or_404, redirect
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
 from django.db.models import Q
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 
-from .models import WikiArticle, WikiCategory, WikiAttachment
+from corp_portal import related
+
+from .models import WikiArticle, WikiCategory, WikiAttachment, WikiRevision, build_tree
+from . import archive, links, revisions
 
 
 @login_required
@@ -38,7 +42,7 @@ def article_list(request):
     page = request.GET.get('page')
     articles = paginator.get_page(page)
 
-    categories = WikiCategory.objects.all()
+    categories = WikiCategory.with_article_counts().order_by('path')
 
     context = {
         'articles': articles,
@@ -66,10 +70,16 @@ def article_detail(request, slug):
     article.increment_views()
 
     related_articles = article.get_related_articles()
+    related_news = related.related_items(article, 3, kind='news')
 
     context = {
         'article': article,
+        'backlinks': links.backlinks(article).filter(is_published=True).only('title', 'slug'),
         'related_articles': related_articles,
+        'related_news': related_news,
+        'breadcrumbs': article.ancestors().filter(is_published=True).only('title', 'slug'),
+        'category_breadcrumbs': article.category.ancestors(include_self=True) if article.category else [],
+        'page_tree': _page_tree(article),
     }
     return render(request, 'wiki/article_detail.html', context)
 
@@ -78,7 +88,7 @@ def article_detail(request, slug):
 def create_article(request):
     """Create new wiki article."""
     if request.method == 'POST':
-        article = WikiArticle.objects.create(
+        article = WikiArticle(
             title=request.POST.get('title'),
             slug=request.POST.get('slug'),
             content=request.POST.get('content'),
@@ -89,6 +99,7 @@ def create_article(request):
             is_published=request.POST.get('is_published') == 'on',
             is_featured=request.POST.get('is_featured') == 'on',
         )
+        revisions.save_article(article, request.user, request.POST.get('comment', ''))
         return redirect('wiki:detail', slug=article.slug)
     
     categories = WikiCategory.objects.all()
@@ -104,6 +115,7 @@ def edit_article(request, slug):
     article = get_object_or_404(WikiArticle, slug=slug)
     
     if request.method == 'POST':
+        old_slug = article.slug
         article.title = request.POST.get('title')
         article.slug = request.POST.get('slug')
         article.content = request.POST.get('content')
@@ -112,8 +124,16 @@ def edit_article(request, slug):
         article.parent_article_id = request.POST.get('parent_article') or None
         article.is_published = request.POST.get('is_published') == 'on'
         article.is_featured = request.POST.get('is_featured') == 'on'
-        article.version += 1
-        article.save()
+        try:
+            revisions.save_article(article, request.user, request.POST.get('comment', ''))
+        except ValidationError as e:
+            return render(request, 'wiki/article_form.html', {
+                'article': article,
+                'categories': WikiCategory.objects.all(),
+                'errors': e.messages,
+            }, status=400)
+        if article.slug != old_slug and request.POST.get('rewrite_links') == 'on':
+            links.rewrite(old_slug, article.slug, request.user)
         return redirect('wiki:detail', slug=article.slug)
     
     categories = WikiCategory.objects.all()
@@ -142,3 +162,159 @@ def upload_attachment(request, slug):
         })
     
     return JsonResponse({'success': False}, status=400)
+
+
+def _page_tree(article):
+    """Nested published pages of the tree the article belongs to (one query)."""
+    root_path = article.path.split('/', 1)[0] + '/'
+    pages = WikiArticle.objects.filter(path__startswith=root_path, is_published=True).values(
+        'id', 'path', 'title', 'slug'
+    )
+    return build_tree(pages, sort_key=lambda page: page['title'].lower())
+
+
+@login_required
+@require_http_methods(["GET"])
+def article_navigation(request, slug):
+    """Breadcrumbs and the page tree around an article, for the sidebar."""
+    article = get_object_or_404(WikiArticle, slug=slug, is_published=True)
+    return JsonResponse({
+        'success': True,
+        'breadcrumbs': list(article.ancestors().filter(is_published=True).values('title', 'slug')),
+        'category_breadcrumbs': list(article.category.ancestors(include_self=True).values('name', 'slug')) if article.category else [],
+        'tree': _page_tree(article),
+    })
+
+
+def _article_refs(articles):
+    return [{'title': article.title, 'slug': article.slug} for article in articles.only('title', 'slug')]
+
+
+@login_required
+@require_http_methods(["GET"])
+def article_backlinks(request, slug):
+    """Articles linking to this one (what links here)."""
+    article = get_object_or_404(WikiArticle, slug=slug)
+    return JsonResponse({'success': True, 'backlinks': _article_refs(links.backlinks(article))})
+
+
+@login_required
+@require_http_methods(["GET"])
+def orphan_report(request):
+    """Published articles nothing links to."""
+    return JsonResponse({'success': True, 'articles': _article_refs(links.orphans())})
+
+
+@login_required
+@require_http_methods(["GET"])
+def broken_link_report(request):
+    """Links to articles that do not exist (any more)."""
+    return JsonResponse({'success': True, 'links': [
+        {'source': {'title': link.source.title, 'slug': link.source.slug}, 'slug': link.target_slug}
+        for link in links.broken_links()
+    ]})
+
+
+def _author_name(row):
+    name = ' '.join(filter(None, [row['author__first_name'], row['author__last_name']]))
+    return name or row['author__username'] or ''
+
+
+@login_required
+@require_http_methods(["GET"])
+def article_history(request, slug):
+    """Stored versions of an article, newest first."""
+    article = get_object_or_404(WikiArticle, slug=slug)
+    paginator = Paginator(revisions.history(article), 50)
+    page = paginator.get_page(request.GET.get('page'))
+    return JsonResponse({
+        'success': True,
+        'version': article.version,
+        'revisions': [
+            {
+                'version': row['version'],
+                'title': row['title'],
+                'size': row['size'],
+                'comment': row['comment'],
+                'author': _author_name(row),
+                'created_at': row['created_at'].isoformat(),
+            }
+            for row in page
+        ],
+        'page': page.number,
+        'num_pages': paginator.num_pages,
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def article_revision(request, slug, version):
+    """Title and text of one stored version."""
+    article = get_object_or_404(WikiArticle, slug=slug)
+    try:
+        title, content = revisions.text_at(article, version)
+    except WikiRevision.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Version not found'}, status=404)
+    return JsonResponse({'success': True, 'version': version, 'title': title, 'content': content})
+
+
+@login_required
+@require_http_methods(["GET"])
+def article_diff(request, slug):
+    """Unified diff between two versions (?from=&to=, by default the last edit)."""
+    article = get_object_or_404(WikiArticle, slug=slug)
+    try:
+        new_version = int(request.GET.get('to', article.version))
+        old_version = int(request.GET.get('from', new_version - 1))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid version'}, status=400)
+    try:
+        diff = revisions.diff(article, old_version, new_version)
+    except WikiRevision.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Version not found'}, status=404)
+    return JsonResponse({'success': True, 'from': old_version, 'to': new_version, 'diff': diff})
+
+
+@login_required
+@require_http_methods(["POST"])
+def restore_revision(request, slug, version):
+    """Make an older version current again."""
+    article = get_object_or_404(WikiArticle, slug=slug)
+    try:
+        revisions.restore(article, version, request.user)
+    except WikiRevision.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Version not found'}, status=404)
+    return JsonResponse({'success': True, 'version': article.version})
+
+
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+@require_http_methods(["GET"])
+def export_archive(request):
+    """All articles, or one category (?category=slug), as a streamed ZIP archive."""
+    category = None
+    if request.GET.get('category'):
+        category = get_object_or_404(WikiCategory, slug=request.GET['category'])
+    response = StreamingHttpResponse(
+        archive.stream_zip(archive.export_articles(category)), content_type='application/zip'
+    )
+    filename = f"wiki-{category.slug}.zip" if category else 'wiki.zip'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+@require_http_methods(["POST"])
+def import_archive(request):
+    """Import an archive made by the export (?on_conflict=rename|skip)."""
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'success': False, 'error': 'No file provided'}, status=400)
+    try:
+        stats = archive.import_zip(
+            upload, request.user, skip_existing=request.POST.get('on_conflict') == 'skip'
+        )
+    except archive.ArchiveError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **stats})